@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+from backend import app_settings
+import hmac
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class ReloadRequest(BaseModel):
+    # version directory under INDEX_VERSIONS_DIR (default: the one CURRENT points to)
+    version: Optional[str] = None
+
+
+def _authorize(request: Request, token: Optional[str]) -> None:
+    """ADMIN_TOKEN via X-Admin-Token; without a configured token only localhost is allowed."""
+    expected = getattr(app_settings, "ADMIN_TOKEN", None)
+    if expected:
+        if not token or not hmac.compare_digest(token, expected):
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+    elif request.client is None or request.client.host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are local-only without ADMIN_TOKEN")
+
+
+def _manager(request: Request):
+    manager = getattr(request.app.state, "pipelines", None)
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Query pipeline not initialized")
+    return manager
+
+
+@router.get("/index")
+def index_status(request: Request, x_admin_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Serving index version, in-flight requests and versions still draining."""
+    _authorize(request, x_admin_token)
+    return _manager(request).status()
+
+
+@router.post("/reload")
+async def reload_index(
+    payload: ReloadRequest,
+    request: Request,
+    x_admin_token: Optional[str] = Header(None),
+) -> Dict[str, Any]:
+    """Load, validate and atomically swap in an index version.
+
+    Requests already running finish on the previous version, which is
+    released once they drain. Invalid versions are rejected with 409 and
+    the current one keeps serving. An explicit version must be a directory
+    name under INDEX_VERSIONS_DIR (400 otherwise) and also becomes CURRENT,
+    so it survives restarts.
+    """
+    from backend.core.index_versions import check_version_name, set_current
+
+    _authorize(request, x_admin_token)
+    manager = _manager(request)
+    if payload.version is not None:
+        try:
+            check_version_name(payload.version)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        status = await manager.reload(payload.version)
+        root = getattr(app_settings, "INDEX_VERSIONS_DIR", None)
+        if payload.version and root:
+            set_current(root, payload.version)
+        return status
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        # IndexValidationError and bad version requests
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception:
+        logger.exception("Unhandled error in reload_index")
+        raise HTTPException(status_code=500, detail="Index reload failed")
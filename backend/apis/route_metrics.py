@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict, Tuple
+from backend.core.metrics import REGISTRY, REQUEST_SECONDS, end_request, start_request
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# cache name -> (hits key, misses key, size key) in QueryPipeline.stats()
+_CACHES = {
+    "embedding": ("embedding_hits", "embedding_misses", "embedding_size"),
+    "result": ("result_hits", "result_misses", "result_size"),
+    "answer": ("answer_hits", "answer_misses", "answer_size"),
+    "code": ("code_hits", "code_misses", "code_index_size"),
+}
+
+
+class TimingMiddleware:
+    """Collects per-stage timings for each HTTP request.
+
+    Adds a Server-Timing header (`embed;dur=3.10, faiss;dur=0.42, ...,
+    total;dur=5.02`, in ms) and observes the request latency. The header
+    goes out with the response start, so streamed responses only carry
+    what ran before the first byte; the full breakdown is in their final
+    `done` event.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+                # route template, not the raw path, keeps label cardinality bounded
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                REQUEST_SECONDS.observe(timings.elapsed(), path=route, status=message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+
+
+def _pipeline_gauges(request: Request) -> Dict[str, Tuple[str, Dict[str, float]]]:
+    """Point-in-time values of the serving pipeline (caches are per index version)."""
+    pipeline = getattr(request.app.state, "pipeline", None)
+    if pipeline is None:
+        return {}
+    stats: Dict[str, Any] = pipeline.stats()
+    ratios, sizes = {}, {}
+    for name, (hits_key, misses_key, size_key) in _CACHES.items():
+        if hits_key not in stats:
+            continue
+        lookups = stats[hits_key] + stats[misses_key]
+        ratios[name] = stats[hits_key] / lookups if lookups else 0.0
+        sizes[name] = stats[size_key]
+    gauges = {
+        "warehouse_searches": ("Searches served by the current index version", {"": stats["searches"]}),
+        "warehouse_cache_hit_ratio": ("Hit ratio per cache since the index version was loaded", ratios),
+        "warehouse_cache_entries": ("Entries per cache", sizes),
+    }
+    manager = getattr(request.app.state, "pipelines", None)
+    if manager is not None:
+        status = manager.status()
+        gauges["warehouse_in_flight_requests"] = ("Requests leasing the current pipeline", {"": status["in_flight"]})
+        gauges["warehouse_index_reloads"] = ("Successful index reloads since startup", {"": status["reloads"]})
+    if "llm_active" in stats:
+        gauges["warehouse_llm_in_flight"] = ("LLM calls holding an admission slot", {"": stats["llm_active"]})
+        gauges["warehouse_llm_queue_depth"] = ("Requests waiting for an LLM slot", {"": stats["llm_queue_depth"]})
+    return gauges
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Prometheus metrics: stage/request latency histograms, LLM tokens, cache hit ratios."""
+    return PlainTextResponse(REGISTRY.render(_pipeline_gauges(request)), media_type=CONTENT_TYPE)
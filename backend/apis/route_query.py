@@ -1,9 +1,17 @@
 from fastapi import APIRouter, HTTPException, Request
-from typing import Dict, List, Optional
+from fastapi.responses import StreamingResponse
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Union
 from pydantic import BaseModel
 from backend import app_settings
+from backend.clients.transport import LLMTimeoutError
+from backend.core.metrics import current_timings
+from backend.core.retrieval.query_processor import InvalidQuery
+import json
 import logging 
 
+if TYPE_CHECKING:
+    from backend.core.pipeline import LLMAnswer
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -12,20 +20,98 @@ router = APIRouter()
 class QueryRequest(BaseModel):
     query: str
     top_k: Optional[int] = None
+    # attribute filters, e.g. {"Αποθήκη": "A1", "Κατηγορία": ["Βίδες", "Παξιμάδια"]}
+    filters: Optional[Dict[str, Union[str, List[str]]]] = None
+    # needs a stock column: STOCK_COLUMN, or one detected by name (e.g. "Απόθεμα")
+    in_stock: Optional[bool] = None
+
+
+class SearchRequest(QueryRequest):
+    # metadata fields to return (None = SEARCH_FIELDS, or every field if that is unset too)
+    fields: Optional[List[str]] = None
 
 
 class SearchResult(BaseModel):
     index: int
-    metadata: Dict
+    id: Optional[str] = None
+    # higher is better; the scale depends on score_kind:
+    #   cosine  dense inner product of normalized embeddings (-1..1)
+    #   rrf     reciprocal rank fusion of dense and BM25 ranks (hybrid search)
+    #   code    exact product-code match, no score
+    score: Optional[float] = None
+    score_kind: str
+    # only the requested fields; missing ones are left out
+    metadata: Dict[str, Any]
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
 
 
 class QueryResponse(BaseModel):
     nl_response: Optional[str] = None
+    # answered from retrieval only because the LLM was saturated
+    degraded: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+    top_k: Optional[int] = None
+    generate: bool = False
+    filters: Optional[Dict[str, Union[str, List[str]]]] = None
+    # needs a stock column: STOCK_COLUMN, or one detected by name (e.g. "Απόθεμα")
+    in_stock: Optional[bool] = None
+
+
+class BatchQueryItem(BaseModel):
+    query: str
+    results: List[Dict]
+    nl_response: Optional[str] = None
+    degraded: bool = False
+
+
+class BatchQueryResponse(BaseModel):
+    items: List[BatchQueryItem]
+
+
+def _acquire(request: Request):
+    """Lease the serving pipeline (None before startup); a hot reload never swaps it mid-request."""
+    manager = getattr(request.app.state, "pipelines", None)
+    if manager is None:
+        return getattr(request.app.state, "pipeline", None)
+    return manager.acquire()
+
+
+def _release(request: Request, pipeline) -> None:
+    manager = getattr(request.app.state, "pipelines", None)
+    if manager is not None and pipeline is not None:
+        manager.release(pipeline)
+
+
+def _served(request: Request) -> None:
+    """Record the first served query for the cold-start log (see /ready)."""
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is not None:
+        readiness.first_query()
+
+
+def _request_filters(payload, pipeline) -> Optional[Dict[str, Any]]:
+    """Merge `filters` and `in_stock` and check them against the attribute index."""
+    filters = dict(payload.filters or {})
+    if payload.in_stock is not None:
+        filters["in_stock"] = "true" if payload.in_stock else "false"
+    if not filters:
+        return None
+    try:
+        pipeline.resolve_filters(filters)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return filters
 
 
 @router.post("/query", response_model=QueryResponse)
-def query_endpoint(payload: QueryRequest, request: Request) -> QueryResponse:
-    pipeline = getattr(request.app.state, "pipeline", None)
+async def query_endpoint(payload: QueryRequest, request: Request) -> QueryResponse:
+    pipeline = _acquire(request)
 
     try:
         if pipeline is None:
@@ -37,20 +123,258 @@ def query_endpoint(payload: QueryRequest, request: Request) -> QueryResponse:
         if effective_top_k <= 0:
             raise HTTPException(status_code=400, detail="top_k must be a positive integer")
 
-        response = pipeline.search_with_llm(
+        answer = await pipeline.asearch_with_llm(
             query=payload.query,
-            top_k=effective_top_k
+            top_k=effective_top_k,
+            filters=_request_filters(payload, pipeline)
         )
-        return QueryResponse(nl_response=response)
+        _served(request)
+        return QueryResponse(nl_response=answer.text, degraded=answer.degraded)
 
     except HTTPException as he:
         logger.exception(f"HTTP error during query processing: {he.status_code} - {he.detail}")
         raise he
 
+    except InvalidQuery as iq:
+        raise HTTPException(status_code=400, detail=str(iq))
+
+    except LLMTimeoutError as te:
+        logger.warning(f"Query timed out: {te}")
+        raise HTTPException(status_code=504, detail="LLM did not answer within the request time budget")
+
     except Exception as e:
         logger.exception("Unhandled error in query_endpoint")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    finally:
+        _release(request, pipeline)
+
+
+def _project(results: List[Dict], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """SearchResult dicts with only `fields` of each row's metadata."""
+    items = []
+    for result in results:
+        entry = result["metadata"]
+        metadata = entry.get("metadata", {})
+        if fields is not None:
+            metadata = {name: metadata[name] for name in fields if name in metadata}
+        kind = result["score_kind"]
+        items.append({
+            "index": result["index"],
+            "id": entry.get("id"),
+            # the raw retrieval score; its meaning depends on score_kind
+            "score": None if kind == "code" else result["distance"],
+            "score_kind": kind,
+            "metadata": metadata,
+        })
+    return items
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search_endpoint(payload: SearchRequest, request: Request) -> Dict[str, Any]:
+    """Retrieval only: the top items without an LLM answer.
+
+    For clients that render the items themselves (scanner terminals).
+    `fields` projects each item's metadata to shrink the payload. The
+    plain dict returned here is validated against SearchResponse and
+    serialized by pydantic-core (FastAPI's response-model fast path,
+    which a custom response class would turn off).
+    """
+    pipeline = _acquire(request)
+
+    try:
+        if pipeline is None:
+            logger.error("Query pipeline not initialized")
+            raise HTTPException(status_code=503, detail="Query pipeline not initialized")
+
+        effective_top_k = payload.top_k if payload.top_k is not None else app_settings.DEFAULT_TOP_K
+
+        if effective_top_k <= 0:
+            raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+
+        results = await pipeline.asearch(
+            query=payload.query,
+            top_k=effective_top_k,
+            filters=_request_filters(payload, pipeline)
+        )
+        fields = payload.fields if payload.fields is not None else getattr(app_settings, "SEARCH_FIELDS", None)
+        _served(request)
+        return {"results": _project(results, fields)}
+
+    except HTTPException as he:
+        logger.exception(f"HTTP error during search: {he.status_code} - {he.detail}")
+        raise he
+
+    except InvalidQuery as iq:
+        raise HTTPException(status_code=400, detail=str(iq))
+
+    except Exception as e:
+        logger.exception("Unhandled error in search_endpoint")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    finally:
+        _release(request, pipeline)
+
+
+@router.post("/query/batch", response_model=BatchQueryResponse)
+async def query_batch_endpoint(payload: BatchQueryRequest, request: Request) -> BatchQueryResponse:
+    """Retrieve results for many queries with a single encode + FAISS search.
+
+    LLM answers are generated only when `generate` is true, with at most
+    LLM_BATCH_CONCURRENCY calls in flight.
+    """
+    pipeline = _acquire(request)
+
+    try:
+        if pipeline is None:
+            logger.error("Query pipeline not initialized")
+            raise HTTPException(status_code=503, detail="Query pipeline not initialized")
+
+        effective_top_k = payload.top_k if payload.top_k is not None else app_settings.DEFAULT_TOP_K
+
+        if effective_top_k <= 0:
+            raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+
+        max_queries = getattr(app_settings, "MAX_BATCH_QUERIES", 1000)
+        if len(payload.queries) > max_queries:
+            raise HTTPException(status_code=400, detail=f"At most {max_queries} queries per batch")
+
+        if not payload.queries:
+            return BatchQueryResponse(items=[])
+
+        results = await pipeline.asearch_many(
+            payload.queries, top_k=effective_top_k, filters=_request_filters(payload, pipeline)
+        )
+
+        answers: List[Optional["LLMAnswer"]] = [None] * len(results)
+        if payload.generate:
+            answers = await pipeline.agenerate_many(
+                payload.queries,
+                results,
+                max_concurrency=getattr(app_settings, "LLM_BATCH_CONCURRENCY", 8),
+            )
+
+        _served(request)
+        return BatchQueryResponse(items=[
+            BatchQueryItem(
+                query=q,
+                results=r,
+                nl_response=a.text if a is not None else None,
+                degraded=a is not None and a.degraded,
+            )
+            for q, r, a in zip(payload.queries, results, answers)
+        ])
+
+    except HTTPException as he:
+        logger.exception(f"HTTP error during batch query processing: {he.status_code} - {he.detail}")
+        raise he
+
+    except InvalidQuery as iq:
+        raise HTTPException(status_code=400, detail=str(iq))
+
+    except LLMTimeoutError as te:
+        logger.warning(f"Batch query timed out: {te}")
+        raise HTTPException(status_code=504, detail="LLM did not answer within the request time budget")
+
+    except Exception as e:
+        logger.exception("Unhandled error in query_batch_endpoint")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    finally:
+        _release(request, pipeline)
+
+
+class _LeasedStreamingResponse(StreamingResponse):
+    """StreamingResponse that calls `release` however the response ends.
+
+    Releasing inside the body generator is not enough: a client that
+    disconnects before the first chunk means the generator never runs (and
+    Starlette skips background tasks on disconnect).
+    """
+
+    def __init__(self, content, release: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def _sse(event: str, data: Any) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/query/stream")
+async def query_stream_endpoint(payload: QueryRequest, request: Request) -> StreamingResponse:
+    """Stream the answer as server-sent events.
+
+    Events: `results` (retrieved items, sent before generation starts),
+    `delta` ({"text": ...} per chunk), then `done` (per-stage `timings`
+    in ms) or `error`. When the LLM is saturated, `degraded` ({"reason"})
+    comes before a single delta holding the retrieval-only answer. The
+    pipeline lease is held until the stream ends.
+    """
+    pipeline = _acquire(request)
+    if pipeline is None:
+        logger.error("Query pipeline not initialized")
+        raise HTTPException(status_code=503, detail="Query pipeline not initialized")
+
+    try:
+        effective_top_k = payload.top_k if payload.top_k is not None else app_settings.DEFAULT_TOP_K
+        if effective_top_k <= 0:
+            raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+
+        filters = _request_filters(payload, pipeline)
+    except HTTPException:
+        _release(request, pipeline)
+        raise
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in pipeline.astream_with_llm(
+                query=payload.query,
+                top_k=effective_top_k,
+                filters=filters
+            ):
+                if event == "delta":
+                    data = {"text": data}
+                yield _sse(event, data)
+            timings = current_timings()
+            yield _sse("done", {"timings": timings.breakdown()} if timings is not None else {})
+            _served(request)
+        except InvalidQuery as iq:
+            yield _sse("error", {"detail": str(iq)})
+        except LLMTimeoutError as te:
+            logger.warning(f"Stream timed out: {te}")
+            yield _sse("error", {"detail": "LLM did not answer within the request time budget"})
+        except Exception:
+            logger.exception("Unhandled error in query_stream_endpoint")
+            yield _sse("error", {"detail": "Internal server error"})
+
+    return _LeasedStreamingResponse(
+        events(),
+        release=lambda: _release(request, pipeline),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+def stats_endpoint(request: Request) -> Dict[str, Any]:
+    """Fast-path and cache counters (code lookups, hit rates) of the serving pipeline."""
+    pipeline = _acquire(request)
+    try:
+        if pipeline is None:
+            raise HTTPException(status_code=503, detail="Query pipeline not initialized")
+        return pipeline.stats()
+    finally:
+        _release(request, pipeline)
+
+
 @router.get("/health")
 def health_check():
     """Health check endpoint."""
@@ -0,0 +1,188 @@
+"""Synthetic Greek warehouse catalogs for benchmarks (10k to 5M rows).
+
+A catalog directory looks like a real build, so the server and every
+benchmark load it through the normal resource loaders:
+    metadata.jsonl      {"id": "SKU0000001", "metadata": {...}} per row
+    embeddings.npy      float32 (rows, dim), unit norm
+    index.faiss         built like the build pipeline (index_type, search_params.json)
+    lexical.bm25/       BM25 index (optional)
+    context.cols/       precomputed LLM context strings
+    catalog.json        rows, dim, seed, index type; a matching one is reused
+Vectors are clustered by product family instead of encoded with the model:
+retrieval latency depends on the index shape, not on what the vectors mean,
+and generating 5M real embeddings would dwarf the benchmark itself. Every
+chunk is seeded, so the same arguments always give the same files.
+"""
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import faiss  # type: ignore
+import numpy as np
+
+from backend.build_index.faiss_index import factory_string, save_search_params
+from backend.core.generation.context_store import ContextStore
+from backend.core.resource_loader import CONTEXT_STORE_DIR, EMBEDDINGS_FILE, LEXICAL_INDEX_DIR
+from backend.core.retrieval.lexical_index import BM25Index
+from backend.core.retrieval.metadata_store import ColumnarMetadataStore
+from backend.core.retrieval.vector_search import apply_search_params
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MANIFEST = "catalog.json"
+CHUNK_ROWS = 100_000
+
+FAMILIES = [
+    ("Βίδα", ["inox", "γαλβανιζέ", "ορειχάλκινη"], ["M6", "M8", "M10", "M12"]),
+    ("Παξιμάδι", ["inox", "ασφαλείας", "πεταλούδα"], ["M6", "M8", "M10"]),
+    ("Ροδέλα", ["επίπεδη", "γκρόβερ", "οδοντωτή"], ["8mm", "10mm", "12mm"]),
+    ("Ρακόρ", ["ορειχάλκινο", "PVC", "χαλκού"], ["1/2\"", "3/4\"", "1\""]),
+    ("Σωλήνας", ["PEX", "πολυπροπυλενίου", "χαλκοσωλήνας"], ["16mm", "20mm", "25mm"]),
+    ("Βάνα", ["σφαιρική", "γωνιακή", "αντεπιστροφής"], ["1/2\"", "3/4\"", "1\""]),
+    ("Φίλτρο", ["νερού", "λαδιού", "αέρα"], ["10\"", "20\""]),
+    ("Τσιμούχα", ["NBR", "Viton", "σιλικόνης"], ["20x35", "25x40", "30x47"]),
+    ("Καλώδιο", ["ΝΥΜ", "ΝΥΑ", "ευέλικτο"], ["3x1.5", "3x2.5", "5x6"]),
+    ("Ρουλεμάν", ["σφαιρικό", "κωνικό", "βελονοειδές"], ["6204", "6305", "30205"]),
+    ("Παλέτα", ["ξύλινη", "πλαστική", "EUR"], ["80x120", "100x120"]),
+    ("Κόλλα", ["σιλικόνη", "εποξική", "θερμοσιλικόνη"], ["280ml", "50ml"]),
+]
+BRANDS = ["Bosch", "Makita", "Liebherr", "Geberit", "Grundfos", "SKF", "Würth", "Fischer", "3M", "Legrand"]
+WAREHOUSES = ["A1", "A2", "B1", "B2", "Γ1"]
+
+
+def _rows(rows: int, seed: int, start: int = 0) -> Iterator[Dict]:
+    """Catalog rows [start, rows); row i depends only on (seed, i)."""
+    for i in range(start, rows):
+        rnd = random.Random(seed * 1_000_003 + i)
+        family, kinds, sizes = FAMILIES[i % len(FAMILIES)]
+        code = f"SKU{i:07d}"
+        brand = rnd.choice(BRANDS)
+        yield {
+            "id": code,
+            "metadata": {
+                "Κωδικός": code,
+                "Περιγραφή": f"{family} {rnd.choice(kinds)} {rnd.choice(sizes)} {brand}",
+                "Κατηγορία": family,
+                "Μάρκα": brand,
+                "Αποθήκη": rnd.choice(WAREHOUSES),
+                "Ράφι": f"{rnd.choice('ΑΒΓΔ')}{rnd.randint(1, 40):02d}",
+                "Απόθεμα": str(rnd.choice([0, rnd.randint(1, 500)])),
+                "Τιμή": f"{rnd.uniform(0.1, 900):.2f}",
+            },
+        }
+
+
+def sample_queries(n: int, seed: int = 0) -> List[str]:
+    """Free-text queries shaped like warehouse searches (family, type, size, brand)."""
+    rnd = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        family, kinds, sizes = rnd.choice(FAMILIES)
+        parts = [family, rnd.choice(kinds)]
+        if rnd.random() < 0.5:
+            parts.append(rnd.choice(sizes))
+        if rnd.random() < 0.3:
+            parts.append(rnd.choice(BRANDS))
+        queries.append(" ".join(parts))
+    return queries
+
+
+def _vectors(start: int, stop: int, dim: int, seed: int) -> np.ndarray:
+    """Unit vectors around one centroid per product family (plus per-brand offsets)."""
+    centroids = np.random.default_rng(seed).normal(size=(len(FAMILIES) * len(BRANDS), dim)).astype("float32")
+    rng = np.random.default_rng([seed, start])
+    ids = np.arange(start, stop)
+    cluster = (ids % len(FAMILIES)) * len(BRANDS) + rng.integers(0, len(BRANDS), len(ids))
+    x = centroids[cluster] + rng.normal(scale=0.8, size=(len(ids), dim)).astype("float32")
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x
+
+
+def _manifest(rows: int, dim: int, seed: int, index_type: str, lexical: bool) -> Dict:
+    return {"rows": rows, "dim": dim, "seed": seed, "index_type": index_type, "lexical": lexical, "contexts": True}
+
+
+def build_catalog(
+    out_dir: Path,
+    rows: int,
+    dim: int,
+    seed: int = 0,
+    index_type: str = "auto",
+    lexical: bool = True,
+    max_train_points: int = 256_000,
+) -> Path:
+    """Generate a catalog build (reused when catalog.json already matches).
+
+    Args:
+        out_dir: Catalog directory
+        rows: Number of products
+        dim: Vector dimension (must match the serving model for HTTP runs)
+        seed: Seed for metadata and vectors
+        index_type: One of backend.build_index.faiss_index.INDEX_TYPES
+        lexical: Also build the BM25 index (needed for hybrid search)
+        max_train_points: Training sample cap for IVF/PQ quantizers
+
+    Returns:
+        Path of index.faiss
+    """
+    out_dir = Path(out_dir)
+    manifest = _manifest(rows, dim, seed, index_type, lexical)
+    index_path = out_dir / "index.faiss"
+    existing = out_dir / CATALOG_MANIFEST
+    if existing.exists() and json.loads(existing.read_text(encoding="utf-8")) == manifest and index_path.exists():
+        logger.info(f"Reusing catalog {out_dir}")
+        return index_path
+    out_dir.mkdir(parents=True, exist_ok=True)
+    existing.unlink(missing_ok=True)
+
+    t0 = time.perf_counter()
+    with (out_dir / "metadata.jsonl").open("w", encoding="utf-8") as f:
+        for entry in _rows(rows, seed):
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    # embeddings are written chunk by chunk into an on-disk array, so 5M rows never sit in RAM twice
+    embeddings = np.lib.format.open_memmap(out_dir / EMBEDDINGS_FILE, mode="w+", dtype="float32", shape=(rows, dim))
+    for start in range(0, rows, CHUNK_ROWS):
+        stop = min(rows, start + CHUNK_ROWS)
+        embeddings[start:stop] = _vectors(start, stop, dim, seed)
+    embeddings.flush()
+    logger.info(f"Generated {rows} rows in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    spec, search_params = factory_string(index_type, dim, rows, {})
+    index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        sample = np.random.default_rng(seed).choice(rows, min(rows, max_train_points), replace=False)
+        index.train(np.ascontiguousarray(embeddings[np.sort(sample)]))
+    for start in range(0, rows, CHUNK_ROWS):
+        index.add(np.ascontiguousarray(embeddings[start:start + CHUNK_ROWS]))
+    apply_search_params(index, search_params)
+    faiss.write_index(index, str(index_path))
+    save_search_params(out_dir, search_params)
+    logger.info(f"Built {spec} over {rows} vectors in {time.perf_counter() - t0:.1f}s")
+    del embeddings, index
+
+    if lexical:
+        t0 = time.perf_counter()
+        BM25Index.from_jsonl(out_dir / "metadata.jsonl").save(out_dir / LEXICAL_INDEX_DIR)
+        logger.info(f"Built BM25 index in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    ContextStore.build(ColumnarMetadataStore.from_jsonl(out_dir / "metadata.jsonl")).save(out_dir / CONTEXT_STORE_DIR)
+    logger.info(f"Built context store in {time.perf_counter() - t0:.1f}s")
+
+    existing.write_text(json.dumps(manifest), encoding="utf-8")
+    return index_path
+
+
+def catalog_dir(root: Path, rows: int, dim: int, seed: int, index_type: str) -> Path:
+    """Default location of a catalog under `root`."""
+    return Path(root) / f"catalog-{rows}-d{dim}-{index_type}-s{seed}"
+
+
+def read_catalog(out_dir: Path) -> Optional[Dict]:
+    p = Path(out_dir) / CATALOG_MANIFEST
+    return json.loads(p.read_text(encoding="utf-8")) if p.exists() else None
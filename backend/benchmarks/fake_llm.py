@@ -0,0 +1,60 @@
+"""In-process fake LLM client with configurable latency."""
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+from backend.clients.base_llm_client import BaseLLMClient
+
+
+class FakeLLMClient(BaseLLMClient):
+    """Answers after a fixed latency (plus jitter) without any network.
+
+    Args:
+        latency_ms: Time to the full answer
+        jitter_ms: Uniform +/- jitter added to every call
+        answer: Returned text (streamed word by word, spread over the latency)
+        seed: Jitter seed
+    """
+
+    model = "fake-llm"
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        answer: str = "Το προϊόν βρίσκεται στην αποθήκη A1, ράφι Β12.",
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.answer = answer
+        self._rnd = random.Random(seed)
+        self.calls = 0
+
+    def _delay_s(self) -> float:
+        self.calls += 1
+        jitter = self._rnd.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        time.sleep(self._delay_s())
+        return self.answer
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        await asyncio.sleep(self._delay_s())
+        return self.answer
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        words = self.answer.split(" ")
+        step = self._delay_s() / len(words)
+        for i, word in enumerate(words):
+            time.sleep(step)
+            yield word if i == 0 else " " + word
+
+    async def agenerate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        words = self.answer.split(" ")
+        step = self._delay_s() / len(words)
+        for i, word in enumerate(words):
+            await asyncio.sleep(step)
+            yield word if i == 0 else " " + word
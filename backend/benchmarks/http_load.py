@@ -0,0 +1,158 @@
+"""HTTP load driver for /query and /search (closed loop, fixed concurrency).
+
+By default the app is started in-process on a catalog directory with the
+LLM replaced by FakeLLMClient, so the numbers cover the real request path
+(FastAPI, executor, retrieval, prompt) without network or API cost. Point
+`url` at a running server instead to measure a deployment (pair it with
+backend.scripts.fake_llm_server for a fake upstream there). In-process,
+the driver shares the interpreter with the server: compare such runs with
+each other, and use the Server-Timing `total` for server-side latency.
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from backend.benchmarks.fake_llm import FakeLLMClient
+from backend.benchmarks.report import summarize
+
+logger = logging.getLogger(__name__)
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """'embed;dur=3.1, faiss;dur=0.4' -> {"embed": 3.1, "faiss": 0.4} (ms)."""
+    stages: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, rest = part.strip().partition(";")
+        if rest.startswith("dur="):
+            stages[name] = float(rest[4:])
+    return stages
+
+
+@contextmanager
+def serve_in_process(
+    catalog: Path,
+    llm: FakeLLMClient,
+    port: int = 8765,
+    caches: bool = False,
+    settings: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """Run backend.server on `catalog` in a background thread; yields the base URL.
+
+    Retrieval and answer caches are off unless `caches` is set, so repeated
+    benchmark queries measure the uncached path. `settings` overrides any
+    other app_settings value for the run.
+    """
+    import uvicorn
+    from backend import app_settings
+
+    overrides = {
+        "FAISS_INDEX_FILE": Path(catalog) / "index.faiss",
+        "META_DATA_FILE": Path(catalog) / "metadata.jsonl",
+        "INDEX_VERSIONS_DIR": None,
+        "INDEX_RELOAD_POLL_S": 0,
+        "INDEX_VERIFY_CHECKSUMS": False,
+        # server.started then also means the pipeline is loaded
+        "STARTUP_BACKGROUND": False,
+    }
+    if not caches:
+        overrides.update({"RETRIEVAL_CACHE_SIZE": 0, "ANSWER_CACHE_SIZE": 0})
+    overrides.update(settings or {})
+    for name, value in overrides.items():
+        setattr(app_settings, name, value)
+
+    from backend.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 600
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("In-process server failed to start")
+        time.sleep(0.05)
+    app.state.pipeline.llm_client = llm
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+
+async def _drive(
+    url: str,
+    queries: List[str],
+    concurrency: int,
+    requests: int,
+    top_k: int,
+    warmup: int,
+    payload: Dict[str, Any],
+) -> Tuple[List[float], List[Dict[str, float]], int, float]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=300.0, limits=limits) as client:
+        async def one(i: int) -> Tuple[float, Dict[str, float], bool]:
+            t0 = time.perf_counter()
+            r = await client.post(url, json={"query": queries[i % len(queries)], "top_k": top_k, **payload})
+            return time.perf_counter() - t0, parse_server_timing(r.headers.get("server-timing")), r.is_success
+
+        await asyncio.gather(*(one(i) for i in range(warmup)))
+
+        counter = iter(range(requests))
+        latencies: List[float] = []
+        stages: List[Dict[str, float]] = []
+        errors = 0
+
+        async def worker() -> None:
+            nonlocal errors
+            for i in counter:
+                latency, timing, ok = await one(i)
+                if ok:
+                    latencies.append(latency)
+                    stages.append(timing)
+                else:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, stages, errors, time.perf_counter() - t0
+
+
+def run_http(
+    url: str,
+    queries: List[str],
+    concurrency: int = 32,
+    requests: int = 2000,
+    top_k: int = 5,
+    warmup: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Fire `requests` POSTs at `url` from `concurrency` workers.
+
+    `payload` adds request fields next to query and top_k (e.g. /search `fields`).
+
+    Returns:
+        Summary (see report.summarize) plus `errors` and per-stage p50/p95
+        from the Server-Timing header
+    """
+    latencies, stages, errors, wall = asyncio.run(
+        _drive(url, queries, concurrency, requests, top_k, concurrency if warmup is None else warmup, payload or {})
+    )
+    summary: Dict[str, Any] = summarize(latencies, wall)
+    summary["errors"] = errors
+    by_stage: Dict[str, List[float]] = {}
+    for timing in stages:
+        for name, ms in timing.items():
+            by_stage.setdefault(name, []).append(ms)
+    summary["stages"] = {
+        name: {"p50_ms": round(float(np.percentile(v, 50)), 4), "p95_ms": round(float(np.percentile(v, 95)), 4)}
+        for name, v in by_stage.items()
+    }
+    if errors:
+        logger.warning(f"{errors} of {requests} requests failed")
+    return summary
@@ -0,0 +1,94 @@
+"""Micro-benchmarks of the retrieval hot path over a catalog directory.
+
+    embed_query     one query through the encoder (needs the model)
+    index_search    one FAISS search (stored vectors plus noise as queries)
+    format_results  top_k rows gathered from the metadata store
+    build_context   prompt context for top_k results: precomputed strings
+                    under the serving token budget (PROMPT_TOKEN_BUDGET)
+    build_context_raw  the same, formatting every metadata field per request
+"""
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend import app_settings
+from backend.benchmarks.catalog import sample_queries
+from backend.benchmarks.report import summarize
+from backend.core.generation.prompt_builder import PromptBuilder
+from backend.core.resource_loader import (
+    load_context_store, load_embeddings, load_index, load_metadata_store, load_search_params,
+)
+from backend.core.retrieval.result_formatter import ResultFormatter
+from backend.core.retrieval.vector_search import VectorSearchEngine
+
+
+def _time(fn: Callable[[int], object], iterations: int, warmup: int = 10) -> Dict[str, float]:
+    for i in range(min(warmup, iterations)):
+        fn(i)
+    latencies: List[float] = []
+    t_start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def run_micro(
+    catalog: Path,
+    iterations: int = 1000,
+    top_k: int = 5,
+    model=None,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """Run the micro-benchmarks; embed_query only when a model is given.
+
+    Args:
+        catalog: Catalog (or build) directory with index.faiss, metadata.jsonl, embeddings.npy
+        iterations: Timed calls per benchmark
+        top_k: Results per search
+        model: Loaded encoder (None skips embed_query)
+        seed: Query sampling seed
+
+    Returns:
+        {"micro.<name>": summary}
+    """
+    catalog = Path(catalog)
+    index_path = catalog / "index.faiss"
+    index = load_index(index_path)
+    engine = VectorSearchEngine(model=model, index=index, search_params=load_search_params(index_path))
+    formatter = ResultFormatter(metadata_entries=load_metadata_store(catalog / "metadata.jsonl"))
+    prompt_builder = PromptBuilder(
+        contexts=load_context_store(index_path),
+        token_budget=getattr(app_settings, "PROMPT_TOKEN_BUDGET", 2000),
+        full_items=getattr(app_settings, "PROMPT_FULL_ITEMS", 3),
+    )
+    per_request_builder = PromptBuilder()
+    results: Dict[str, Dict[str, float]] = {}
+
+    texts = sample_queries(iterations, seed=seed)
+    if model is not None:
+        results["micro.embed_query"] = _time(lambda i: engine.embed_query(texts[i]), iterations)
+
+    embeddings: Optional[np.ndarray] = load_embeddings(index_path, expected_rows=len(formatter.metadata_entries))
+    rng = np.random.default_rng(seed)
+    if embeddings is not None:
+        vectors = np.asarray(embeddings[np.sort(rng.integers(0, index.ntotal, iterations))], dtype="float32")
+        vectors += rng.normal(0, 0.05, vectors.shape).astype("float32")
+    else:
+        vectors = rng.normal(size=(iterations, index.d)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    results["micro.index_search"] = _time(lambda i: engine.search(vectors[i], top_k=top_k), iterations)
+
+    rows = rng.integers(0, index.ntotal, (iterations, top_k)).tolist()
+    distances = [0.5] * top_k
+    results["micro.format_results"] = _time(lambda i: formatter.format_results(distances, rows[i]), iterations)
+
+    formatted = [formatter.format_results(distances, r) for r in rows]
+    results["micro.build_context"] = _time(lambda i: prompt_builder.build_context(formatted[i]), iterations)
+    results["micro.build_context_raw"] = _time(
+        lambda i: per_request_builder.build_context(formatted[i]), iterations
+    )
+    return results
@@ -0,0 +1,146 @@
+"""
+Benchmark result summaries, JSON reports and regression checks.
+
+A report is {"environment": ..., "config": ..., "results": {name: summary}}
+where every summary has n, p50/p95/p99/mean in ms and qps. Compare two runs:
+
+    python -m backend.benchmarks.report baseline.json current.json --threshold 0.10
+
+Exits with status 1 when any benchmark's p95 grew, or its QPS dropped, by
+more than the threshold (relative).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+def summarize(latencies_s: Sequence[float], wall_s: float) -> Dict[str, float]:
+    """Latency percentiles (ms) and throughput of one benchmark."""
+    if not len(latencies_s):
+        return {"n": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "qps": 0.0}
+    ms = np.asarray(latencies_s, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "n": int(len(ms)),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "qps": round(len(ms) / wall_s, 2) if wall_s > 0 else 0.0,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Host and library versions, so reports from different machines are not compared blindly."""
+    import faiss  # type: ignore
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", None),
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10,
+) -> List[Dict[str, Any]]:
+    """Per-benchmark deltas between two reports.
+
+    Returns:
+        One row per benchmark present in both: name, p95/qps before and
+        after, relative changes and `regression` (p95 up or qps down by
+        more than `threshold`)
+    """
+    rows = []
+    before_all, after_all = baseline.get("results", {}), current.get("results", {})
+    for name in sorted(set(before_all) & set(after_all)):
+        before, after = before_all[name], after_all[name]
+        if not before.get("n") or not after.get("n"):
+            continue
+        p95_change = after["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        qps_change = after["qps"] / before["qps"] - 1 if before["qps"] else 0.0
+        rows.append({
+            "name": name,
+            "p95_before": before["p95_ms"],
+            "p95_after": after["p95_ms"],
+            "p95_change": round(p95_change, 4),
+            "qps_before": before["qps"],
+            "qps_after": after["qps"],
+            "qps_change": round(qps_change, 4),
+            "regression": p95_change > threshold or qps_change < -threshold,
+        })
+    return rows
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'benchmark':<28} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'qps':>10}")
+    for name, s in results.items():
+        print(f"{name:<28} {s['n']:>7} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['qps']:>10.1f}")
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'benchmark':<28} {'p95 ms':>19} {'Δp95':>8} {'qps':>21} {'Δqps':>8}")
+    for r in rows:
+        flag = "  ✗ regression" if r["regression"] else ""
+        print(f"{r['name']:<28} {r['p95_before']:>9.3f}→{r['p95_after']:<9.3f} {r['p95_change']:>+8.1%} "
+              f"{r['qps_before']:>10.1f}→{r['qps_after']:<10.1f} {r['qps_change']:>+8.1%}{flag}")
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(path: Path, report: Dict[str, Any]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare two benchmark reports")
+    p.add_argument("baseline", type=str)
+    p.add_argument("current", type=str)
+    p.add_argument("--threshold", type=float, default=0.10, help="Relative p95/QPS change flagged as regression")
+    args = p.parse_args()
+
+    baseline, current = load_report(Path(args.baseline)), load_report(Path(args.current))
+    if baseline.get("config") != current.get("config"):
+        print("! configs differ, deltas may not be comparable")
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    regressions = [r["name"] for r in rows if r["regression"]]
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"✔ No regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Reproducible benchmark run: synthetic catalog, micro-benchmarks, HTTP load
+on /query (fake LLM) and on the retrieval-only /search.
+
+    python -m backend.benchmarks.run --rows 100000
+    python -m backend.benchmarks.run --rows 1000000 --index-type ivf-pq --llm-latency-ms 800 \\
+        --baseline export/benchmarks/baseline.json
+    python -m backend.benchmarks.run --rows 5000000 --index-type ivf-sq8 --only micro --no-model
+
+The catalog is generated once per (rows, dim, index type, seed) and reused.
+Results are written as JSON (see backend.benchmarks.report); with
+--baseline the run is compared and exits 1 on regressions.
+"""
+
+from __future__ import annotations
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import backend.app_settings as cfg
+from backend.benchmarks.catalog import build_catalog, catalog_dir, read_catalog, sample_queries
+from backend.benchmarks.fake_llm import FakeLLMClient
+from backend.benchmarks.http_load import run_http, serve_in_process
+from backend.benchmarks.micro import run_micro
+from backend.benchmarks.report import (
+    compare, environment, load_report, print_comparison, print_results, save_report,
+)
+from backend.build_index.faiss_index import INDEX_TYPES
+from backend.core.resource_loader import load_model
+
+
+def main():
+    default_root = cfg.EXPORT_DIR / "benchmarks"
+    p = argparse.ArgumentParser(description="Run the benchmark suite")
+    p.add_argument("--rows", type=int, default=100_000, help="Catalog size (10k to 5M)")
+    p.add_argument("--index-type", choices=INDEX_TYPES, default="auto")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--no-lexical", action="store_true", help="Skip the BM25 index (HTTP runs dense-only)")
+    p.add_argument("--catalog-dir", type=str, default=None, help="Default: <root>/catalog-<rows>-d<dim>-...")
+    p.add_argument("--root", type=str, default=str(default_root))
+    p.add_argument("--only", choices=["micro", "http"], nargs="+", default=["micro", "http"])
+    p.add_argument("--no-model", action="store_true",
+                   help="Do not load the encoder: skips embed_query and HTTP, needs --dim")
+    p.add_argument("--dim", type=int, default=None, help="Vector dimension (default: the model's)")
+    p.add_argument("--iterations", type=int, default=1000, help="Calls per micro-benchmark")
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--llm-latency-ms", type=float, default=0.0)
+    p.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    p.add_argument("--search-fields", nargs="*", default=None,
+                   help="Fields /search returns (default: all; e.g. Κωδικός Περιγραφή Αποθήκη)")
+    p.add_argument("--caches", action="store_true", help="Keep retrieval/answer caches on for the HTTP run")
+    p.add_argument("--url", type=str, default=None, help="Load a running server's /query instead of in-process")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--out", type=str, default=None, help="Report path (default: <root>/results-<timestamp>.json)")
+    p.add_argument("--baseline", type=str, default=None, help="Report to compare against")
+    p.add_argument("--threshold", type=float, default=0.10)
+    args = p.parse_args()
+    # progress from the suite only; per-request server logs would skew the HTTP numbers
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logging.getLogger("backend.benchmarks").setLevel(logging.INFO)
+
+    model = None
+    if not args.no_model:
+        model = load_model(
+            cfg.DEFAULT_EMBEDDING_MODEL,
+            backend=getattr(cfg, "EMBEDDING_BACKEND", "torch"),
+            onnx_dir=getattr(cfg, "ONNX_MODEL_DIR", None),
+            quantized=getattr(cfg, "ONNX_QUANTIZED", True),
+            threads=getattr(cfg, "ONNX_THREADS", None),
+        )
+    dim = args.dim or (model.get_sentence_embedding_dimension() if model is not None else None)
+    if dim is None:
+        raise SystemExit("--dim is required with --no-model")
+    if model is not None and dim != model.get_sentence_embedding_dimension():
+        raise SystemExit(f"--dim {dim} does not match the model ({model.get_sentence_embedding_dimension()})")
+
+    out_dir = Path(args.catalog_dir) if args.catalog_dir else catalog_dir(
+        Path(args.root), args.rows, dim, args.seed, args.index_type
+    )
+    t0 = time.perf_counter()
+    build_catalog(out_dir, args.rows, dim, seed=args.seed, index_type=args.index_type, lexical=not args.no_lexical)
+    print(f"✔ Catalog {out_dir} ({time.perf_counter() - t0:.1f}s)")
+
+    results = {}
+    if "micro" in args.only:
+        results.update(run_micro(out_dir, iterations=args.iterations, top_k=args.top_k, model=model, seed=args.seed))
+    if "http" in args.only and (model is not None or args.url):
+        # the in-process server loads its own encoder; free ours first
+        del model
+        queries = sample_queries(max(args.requests, 1), seed=args.seed + 1)
+        http_args = dict(concurrency=args.concurrency, requests=args.requests, top_k=args.top_k)
+        if args.url:
+            results["http.query"] = run_http(args.url, queries, **http_args)
+        else:
+            llm = FakeLLMClient(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms, seed=args.seed)
+            search_payload = {"fields": args.search_fields} if args.search_fields is not None else None
+            with serve_in_process(out_dir, llm, port=args.port, caches=args.caches) as base_url:
+                results["http.query"] = run_http(f"{base_url}/query", queries, **http_args)
+                results["http.search"] = run_http(f"{base_url}/search", queries, payload=search_payload, **http_args)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "threshold", "root", "catalog_dir")}
+    report = {"environment": environment(), "config": config, "catalog": read_catalog(out_dir), "results": results}
+    out = Path(args.out) if args.out else Path(args.root) / time.strftime("results-%Y%m%d-%H%M%S.json")
+    save_report(out, report)
+    print()
+    print_results(results)
+    print(f"✔ Report: {out.resolve()}")
+
+    if args.baseline:
+        rows = compare(load_report(Path(args.baseline)), report, args.threshold)
+        print()
+        print_comparison(rows)
+        if any(r["regression"] for r in rows):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import List, Dict
 from pathlib import Path
+import hashlib
 import json
 
 @dataclass
@@ -13,6 +14,10 @@ class Doc:
     text: str
     metadata: Dict[str, str]
 
+    def content_hash(self) -> str:
+        """Σταθερό hash του κειμένου (για εντοπισμό αλλαγών σε incremental builds)."""
+        return hashlib.blake2b(self.text.encode("utf-8"), digest_size=16).hexdigest()
+
     def __repr__(self):
        short_text = self.text[:50] + ("..." if len(self.text) > 50 else "")
        return f"Doc(id={self.id!r}, text={short_text!r})"
@@ -29,14 +34,15 @@ class SimpleCorpusBuilder:
     # εδώ μπορείς να κρατάς προσωρινά δεδομένα αν θες
       self.docs: List[Doc] = []
     
-    def build(self, rows: List[Dict[str,str]]) -> List[Doc]:
+    def build(self, rows: List[Dict[str,str]], start: int = 0) -> List[Doc]:
       """
         Παίρνει λίστα από dicts (γραμμές Excel) και επιστρέφει λίστα Doc αντικειμένων.
+        Το `start` είναι η θέση της πρώτης γραμμής όταν το αρχείο διαβάζεται σε chunks.
         """
       docs: List[Doc] = []
       
       # Βήμα 1: επανάληψη σε κάθε γραμμή
-      for i, row in enumerate(rows):
+      for i, row in enumerate(rows, start):
         text = "|".join(f"{k}: {v}" for k, v in row.items())
         doc_id = row.get("Κωδικός", f"row-{i}")
         doc = Doc(id=doc_id, text=text, metadata=row)
@@ -0,0 +1,176 @@
+# backend/build_index/embedding_cache.py
+"""
+Persistent, content-addressed embedding cache for index builds.
+
+One namespace directory per (model name, normalization flag) holds:
+- vectors.bin: append-only rows of float16/float32 embeddings
+- keys.bin:    append-only 16-byte blake2b digests of the text, row i <-> key i
+- meta.json:   dimension and dtype
+
+Vectors are appended before their keys, so an interrupted write never
+leaves a key pointing at missing data. A torn tail (vectors or keys
+without their counterpart) is truncated on open, before anything new is
+appended. Not safe for concurrent writers.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+KEY_SIZE = 16
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+def namespace(model_name: str, normalize: bool) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_")
+    return f"{slug}-{'norm' if normalize else 'raw'}"
+
+
+class EmbeddingCache:
+    """hash(text) -> embedding store for one model/normalization setting."""
+
+    def __init__(self, cache_dir: Path, model_name: str, normalize: bool = True, dtype: str = "float16"):
+        self.root = Path(cache_dir)
+        self.dir = self.root / namespace(model_name, normalize)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.dir / "vectors.bin"
+        self._keys_path = self.dir / "keys.bin"
+        self._meta_path = self.dir / "meta.json"
+
+        self.dim: Optional[int] = None
+        self.dtype = np.dtype(dtype)
+        if self._meta_path.exists():
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            self.dim, self.dtype = meta["dim"], np.dtype(meta["dtype"])
+
+        self._rows: Dict[bytes, int] = {}
+        # records in both files (rows are 0..size-1)
+        self._size = 0
+        self._load_keys()
+        self._vectors: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _row_bytes(self) -> int:
+        return (self.dim or 0) * self.dtype.itemsize
+
+    def _load_keys(self) -> None:
+        if not self._keys_path.exists() or self.dim is None:
+            return
+        keys = self._keys_path.read_bytes()
+        n_vectors = self._vectors_path.stat().st_size // self._row_bytes() if self._vectors_path.exists() else 0
+        n = min(len(keys) // KEY_SIZE, n_vectors)
+        # drop a torn tail, or the next put would number its rows after orphaned bytes
+        if len(keys) != n * KEY_SIZE:
+            os.truncate(self._keys_path, n * KEY_SIZE)
+        if self._vectors_path.exists() and self._vectors_path.stat().st_size != n * self._row_bytes():
+            os.truncate(self._vectors_path, n * self._row_bytes())
+        for row in range(n):
+            self._rows[keys[row * KEY_SIZE:(row + 1) * KEY_SIZE]] = row
+        self._size = n
+
+    def _matrix(self) -> np.ndarray:
+        n = self._size
+        if self._vectors is None or len(self._vectors) < n:
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(n, self.dim))
+        return self._vectors
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def lookup(self, texts: Sequence[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """Split texts into cached vectors (by position) and positions to encode."""
+        found: Dict[int, np.ndarray] = {}
+        missing: List[int] = []
+        rows: List[int] = []
+        positions: List[int] = []
+        for i, text in enumerate(texts):
+            row = self._rows.get(text_digest(text))
+            if row is None:
+                missing.append(i)
+            else:
+                positions.append(i)
+                rows.append(row)
+        if rows:
+            block = np.asarray(self._matrix()[rows], dtype=np.float32)
+            found = dict(zip(positions, block))
+        self.hits += len(positions)
+        self.misses += len(missing)
+        return found, missing
+
+    def put(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Append embeddings for texts that are not cached yet."""
+        if len(texts) == 0:
+            return
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._meta_path.write_text(json.dumps({"dim": self.dim, "dtype": self.dtype.name}), encoding="utf-8")
+        new_keys, new_rows = [], []
+        seen = set()
+        for text, vec in zip(texts, vectors):
+            key = text_digest(text)
+            if key in self._rows or key in seen:
+                continue
+            seen.add(key)
+            new_keys.append(key)
+            new_rows.append(vec)
+        if not new_keys:
+            return
+        start = self._size
+        with self._vectors_path.open("ab") as f:
+            f.write(np.asarray(new_rows, dtype=self.dtype).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with self._keys_path.open("ab") as f:
+            f.write(b"".join(new_keys))
+        for offset, key in enumerate(new_keys):
+            self._rows[key] = start + offset
+        self._size += len(new_keys)
+        self._vectors = None
+
+    def prune(self, keep_texts: Iterable[str]) -> Tuple[int, int]:
+        """Rewrite the cache keeping only entries for `keep_texts`.
+
+        Returns:
+            (kept, removed) entry counts
+        """
+        keep = {text_digest(t) for t in keep_texts}
+        kept = [(key, row) for key, row in self._rows.items() if key in keep]
+        removed = len(self._rows) - len(kept)
+        if removed == 0:
+            return len(kept), 0
+        matrix = self._matrix()
+        tmp_vectors = self.dir / "vectors.bin.tmp"
+        tmp_keys = self.dir / "keys.bin.tmp"
+        with tmp_vectors.open("wb") as fv, tmp_keys.open("wb") as fk:
+            for key, row in kept:
+                fv.write(np.asarray(matrix[row], dtype=self.dtype).tobytes())
+                fk.write(key)
+        self._vectors = None
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_keys, self._keys_path)
+        self._rows = {key: i for i, (key, _) in enumerate(kept)}
+        self._size = len(kept)
+        return len(kept), removed
+
+    def nbytes(self) -> int:
+        return sum(p.stat().st_size for p in (self._vectors_path, self._keys_path) if p.exists())
+
+
+def drop_other_namespaces(cache_dir: Path, keep: str) -> List[str]:
+    """Delete cache namespaces (other models / normalization settings) except `keep`."""
+    dropped = []
+    for d in Path(cache_dir).iterdir():
+        if d.is_dir() and d.name != keep:
+            shutil.rmtree(d)
+            dropped.append(d.name)
+    return dropped
@@ -1,35 +1,83 @@
 # backend/core/embeddings.py
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Optional
 import json
+import os
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from backend.build_index.corpus import SimpleCorpusBuilder, Doc
+from backend import app_settings
 from backend.app_settings import DEFAULT_EMBEDDING_MODEL
+from backend.core.generation.context_store import ContextStore
+from backend.core.retrieval.metadata_store import ColumnarMetadataStore
+from backend.core.retrieval.lexical_index import BM25Index
+from backend.core.resource_loader import CONTEXT_STORE_DIR, LEXICAL_INDEX_DIR
+from backend.build_index.faiss_index import build_index, save_search_params
+from backend.build_index.embedding_cache import EmbeddingCache
+from backend.build_index.parallel_encode import ParallelEncoder
 
 
 class EmbeddingManager:
     """
     Encode a list of Doc objects and save embeddings + metadata.
     Optional: build a FAISS index if faiss is installed.
+    With workers > 1 (CPU only) texts are encoded by a pool of processes.
+    With encoder="onnx" the ONNX Runtime export in `onnx_dir` replaces the
+    PyTorch model (see backend.core.encoders.onnx_encoder).
     """
-    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        cache_dir: Optional[Path] = None,
+        workers: int = 1,
+        threads_per_worker: Optional[int] = None,
+        shard_size: int = 2048,
+        checkpoint_dir: Optional[Path] = None,
+        encoder: str = "torch",
+        onnx_dir: Optional[Path] = None,
+        onnx_quantized: bool = True,
+        onnx_threads: Optional[int] = None,
+    ):
         self.model_name = model_name
-        print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model_id = model_name
+        self.parallel: Optional[ParallelEncoder] = None
+        if encoder == "onnx":
+            from backend.core.encoders.onnx_encoder import OnnxEncoder
+            print(f"Loading ONNX encoder from: {onnx_dir}")
+            self.model = OnnxEncoder(onnx_dir, quantized=onnx_quantized, threads=onnx_threads)
+            # int8/fp32 ONNX vectors are not interchangeable with the torch ones (cache, incremental builds)
+            self.model_id = f"{model_name}@onnx-{self.model.variant}"
+            print(f"✓ ONNX encoder ready ({self.model.variant}, dim {self.model.get_sentence_embedding_dimension()})")
+        else:
+            print(f"Loading embedding model: {model_name}")
+            self.model = SentenceTransformer(model_name)
+        # persistent hash(text) -> embedding cache; only misses reach the model
+        self.cache = EmbeddingCache(cache_dir, self.model_id, normalize=True) if cache_dir else None
         
-        # Έλεγχος και ενεργοποίηση GPU
+        # Έλεγχος και ενεργοποίηση GPU (μόνο για το PyTorch μοντέλο)
         print(f"Initial device: {self.model.device}")
-        try:
-            import torch
-            if torch.cuda.is_available():
-                print(f"✓ CUDA available! GPU: {torch.cuda.get_device_name(0)}")
-                self.model = self.model.to('cuda')
-                print(f"✓ Model moved to GPU: {self.model.device}")
+        if encoder != "onnx":
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    print(f"✓ CUDA available! GPU: {torch.cuda.get_device_name(0)}")
+                    self.model = self.model.to('cuda')
+                    print(f"✓ Model moved to GPU: {self.model.device}")
+                else:
+                    print("✗ CUDA not available, using CPU")
+            except ImportError:
+                print("✗ PyTorch not found or no CUDA support, using CPU")
+
+        if workers > 1:
+            if str(self.model.device).startswith("cuda"):
+                print("✗ Parallel encode workers are CPU only, ignoring (GPU in use)")
+            elif encoder == "onnx":
+                print("✗ Parallel encode workers load the PyTorch model, ignoring with the ONNX encoder")
             else:
-                print("✗ CUDA not available, using CPU")
-        except ImportError:
-            print("✗ PyTorch not found or no CUDA support, using CPU")
+                self.parallel = ParallelEncoder(
+                    model_name, workers, threads_per_worker=threads_per_worker,
+                    shard_size=shard_size, checkpoint_dir=checkpoint_dir,
+                )
         
         self.docs: List = []
         self.embeddings: np.ndarray | None = None
@@ -37,24 +85,54 @@ class EmbeddingManager:
     def set_docs(self, docs: List):
         self.docs = docs
 
-    def encode_docs(self, docs: List, batch_size: int = 128):
-        texts = [d.text for d in docs]
-        print(f"\nEncoding {len(texts)} documents...")
-        print(f"Batch size: {batch_size}")
-        print(f"Device: {self.model.device}")
-        
-        embs = self.model.encode(
+    def _encode_texts(self, texts: List[str], batch_size: int, verbose: bool = True) -> np.ndarray:
+        # small inputs are not worth a round trip through the pool
+        if self.parallel is not None and len(texts) > self.parallel.shard_size:
+            return self.parallel.encode(texts, batch_size=batch_size)
+        return self.model.encode(
             texts,
             batch_size=batch_size,
-            show_progress_bar=True,
+            show_progress_bar=verbose,
             convert_to_numpy=True,
             normalize_embeddings=True
         )
+
+    def encode_docs(self, docs: List, batch_size: int = 128, verbose: bool = True):
+        texts = [d.text for d in docs]
+        if verbose:
+            print(f"\nEncoding {len(texts)} documents...")
+            print(f"Batch size: {batch_size}")
+            print(f"Device: {self.model.device}")
+        
+        if self.cache is None or not texts:
+            embs = self._encode_texts(texts, batch_size, verbose)
+        else:
+            found, missing = self.cache.lookup(texts)
+            # duplicated texts (e.g. across sheets) are encoded once
+            to_encode = list(dict.fromkeys(texts[i] for i in missing))
+            if verbose:
+                print(f"Embedding cache: {len(found)} hits, {len(missing)} misses ({len(to_encode)} unique to encode)")
+            by_text = {}
+            if to_encode:
+                encoded = self._encode_texts(to_encode, batch_size, verbose)
+                self.cache.put(to_encode, encoded)
+                by_text = dict(zip(to_encode, encoded))
+            embs = np.empty((len(texts), self.cache.dim), dtype=np.float32)
+            for i, vec in found.items():
+                embs[i] = vec
+            for i in missing:
+                embs[i] = by_text[texts[i]]
         self.docs = docs
         self.embeddings = embs
-        print(f"✓ Encoding complete! Shape: {embs.shape}")
+        if verbose:
+            print(f"✓ Encoding complete! Shape: {embs.shape}")
         return embs
 
+    def close(self) -> None:
+        """Stop the encode worker pool, if any."""
+        if self.parallel is not None:
+            self.parallel.close()
+
     def encode_from_corpus_or_rows(
         self,
         corpus_path: Optional[Path] = None,
@@ -88,7 +166,7 @@ class EmbeddingManager:
 
         return self.encode_docs(docs, batch_size=batch_size)
 
-    def save(self, out_dir: Path | str):
+    def save(self, out_dir: Path | str, index_type: str = "auto", index_params: Optional[Dict] = None):
         out_dir = Path(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
         if self.embeddings is None:
@@ -100,40 +178,120 @@ class EmbeddingManager:
         np.save(out_dir / "embeddings.npy", self.embeddings)
         print(f"✓ Saved embeddings.npy ({self.embeddings.shape})")
 
-        # save metadata (id + original metadata) as jsonl
-        with (out_dir / "metadata.jsonl").open("w", encoding="utf-8") as f:
-            for d in self.docs:
-                f.write(json.dumps(
-                    
-                    {"id": d.id, 
-                    "metadata": d.metadata}, 
-                    ensure_ascii=False) + "\n")
-                
-        print(f"✓ Saved metadata.jsonl ({len(self.docs)} entries)")
+        # save metadata (id + original metadata) as jsonl + binary columnar copy
+        n_entries = write_metadata(out_dir, ({"id": d.id, "metadata": d.metadata} for d in self.docs))
+        print(f"✓ Saved metadata.jsonl / metadata.cols / {LEXICAL_INDEX_DIR} / {CONTEXT_STORE_DIR} ({n_entries} entries)")
 
         # try to build and save faiss index (best-effort)
         try:
             import faiss
-            dim = int(self.embeddings.shape[1])
-            
-            if len(self.embeddings) > 10000:
-                print(f"Building IVF FAISS index for {len(self.embeddings)} vectors...")
-                nlist = min(int(np.sqrt(len(self.embeddings))), 100)
-                quantizer = faiss.IndexFlatIP(dim)
-                index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
-                index.train(self.embeddings)
-                index.add(self.embeddings)
-                index.nprobe = 10
-                print(f"✓ Built IVF index with {nlist} clusters")
-            else:
-                print(f"Building Flat FAISS index for {len(self.embeddings)} vectors...")
-                index = faiss.IndexFlatIP(dim)
-                index.add(self.embeddings)
-                print(f"✓ Built Flat index")
-            
-            faiss.write_index(index, str(out_dir / "index.faiss"))
+            print(f"Building '{index_type}' FAISS index for {len(self.embeddings)} vectors...")
+            index, search_params = build_index(self.embeddings, index_type=index_type, params=index_params)
+            print(f"✓ Built {type(index).__name__} (search params: {search_params})")
+
+            write_index(out_dir, index)
+            save_search_params(out_dir, search_params)
             print(f"✓ Saved index.faiss")
         except Exception as e:
             print(f"✗ Could not build FAISS index: {e}")
 
-        return out_dir
\ No newline at end of file
+        # doc id -> (row, content hash), used by incremental updates
+        save_build_state(out_dir, {
+            "model": self.model_id,
+            "index_type": index_type,
+            "index_params": index_params or {},
+            "docs": {key: [slot, d.content_hash()] for slot, (key, d) in enumerate(zip(doc_keys(self.docs), self.docs))},
+            "free_slots": [],
+        })
+
+        return out_dir
+
+
+BUILD_STATE_FILE = "build_state.json"
+
+
+def doc_keys(docs: Iterable[Doc], seen: Optional[Dict[str, int]] = None) -> List[str]:
+    """Stable per-doc keys: the doc id, suffixed with #n for repeated ids.
+
+    Pass the same `seen` dict across calls to key a corpus chunk by chunk.
+    """
+    seen = {} if seen is None else seen
+    keys: List[str] = []
+    for d in docs:
+        n = seen.get(d.id, 0)
+        seen[d.id] = n + 1
+        keys.append(d.id if n == 0 else f"{d.id}#{n}")
+    return keys
+
+
+def write_metadata(out_dir: Path, entries: Iterable[Dict]) -> int:
+    """Write metadata.jsonl and everything derived from it (metadata.cols, BM25, LLM contexts).
+
+    Files are written aside and renamed so servers mapping the old ones are
+    never truncated.
+    """
+    out_dir = Path(out_dir)
+    n = 0
+    tmp_meta = out_dir / "metadata.jsonl.tmp"
+    with tmp_meta.open("w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            n += 1
+    os.replace(tmp_meta, out_dir / "metadata.jsonl")
+    write_metadata_cols(out_dir)
+    write_lexical_index(out_dir)
+    write_context_cols(out_dir)
+    return n
+
+
+def write_metadata_cols(out_dir: Path) -> Path:
+    """Binary columnar copy of metadata.jsonl (mmapped by the server), built in one streaming pass."""
+    out_dir = Path(out_dir)
+    return ColumnarMetadataStore.from_jsonl(out_dir / "metadata.jsonl").save(out_dir / "metadata.cols")
+
+
+def write_lexical_index(out_dir: Path) -> Path:
+    """BM25 inverted index over metadata.jsonl (row ids = FAISS ids), for hybrid search."""
+    out_dir = Path(out_dir)
+    return BM25Index.from_jsonl(out_dir / "metadata.jsonl").save(out_dir / LEXICAL_INDEX_DIR)
+
+
+def write_context_cols(out_dir: Path) -> Path:
+    """Per-row LLM context strings (full and compact), read from metadata.cols.
+
+    Needs write_metadata_cols first. PROMPT_FIELDS, PROMPT_COMPACT_FIELDS and
+    PROMPT_MAX_VALUE_CHARS shape the compact strings.
+    """
+    out_dir = Path(out_dir)
+    store = ColumnarMetadataStore.load(out_dir / "metadata.cols", use_mmap=True)
+    contexts = ContextStore.build(
+        store,
+        fields=getattr(app_settings, "PROMPT_FIELDS", None),
+        compact_fields=getattr(app_settings, "PROMPT_COMPACT_FIELDS", 4),
+        max_value_chars=getattr(app_settings, "PROMPT_MAX_VALUE_CHARS", 80),
+    )
+    return contexts.save(out_dir / CONTEXT_STORE_DIR)
+
+
+def write_index(out_dir: Path, index) -> Path:
+    """Atomically write index.faiss."""
+    import faiss
+    tmp_index = Path(out_dir) / "index.faiss.tmp"
+    faiss.write_index(index, str(tmp_index))
+    os.replace(tmp_index, Path(out_dir) / "index.faiss")
+    return Path(out_dir) / "index.faiss"
+
+
+def save_build_state(out_dir: Path, state: Dict[str, Any]) -> Path:
+    path = Path(out_dir) / BUILD_STATE_FILE
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_build_state(out_dir: Path) -> Optional[Dict[str, Any]]:
+    path = Path(out_dir) / BUILD_STATE_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
\ No newline at end of file
@@ -0,0 +1,130 @@
+# backend/build_index/faiss_index.py
+"""
+FAISS index construction for the build pipeline.
+
+Supported index types (all inner product on normalized embeddings):
+- auto:        Flat up to 10k vectors, IVF-Flat above (the original behaviour)
+- flat:        exact search
+- ivf-flat:    IVF{nlist},Flat
+- ivf-sq8:     IVF{nlist},SQ8          (4x smaller than Flat)
+- ivf-pq:      IVF{nlist},PQ{m}x{nbits}
+- opq-ivf-pq:  OPQ{m},IVF{nlist},PQ{m}x{nbits}
+- hnsw:        HNSW{M},Flat            (no training, fast, more memory)
+
+Search-time parameters (nprobe / efSearch) are persisted in
+search_params.json next to index.faiss and applied when the index is loaded.
+"""
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from backend.core.resource_loader import SEARCH_PARAMS_FILE
+from backend.core.retrieval.vector_search import apply_search_params
+
+INDEX_TYPES = ("auto", "flat", "ivf-flat", "ivf-sq8", "ivf-pq", "opq-ivf-pq", "hnsw")
+
+
+def _default_nlist(n: int) -> int:
+    # ~4*sqrt(n) lists, but keep >= 39 training points per centroid
+    return max(1, min(int(4 * np.sqrt(n)), n // 39 or 1))
+
+
+def _default_pq_m(dim: int) -> int:
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def factory_string(index_type: str, dim: int, n: int, params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Resolve an index type + build params into a faiss.index_factory string.
+
+    Returns:
+        (factory string, default search params)
+    """
+    if index_type == "auto":
+        if n > 10000:
+            return f"IVF{min(int(np.sqrt(n)), 100)},Flat", {"nprobe": 10}
+        return "Flat", {}
+    if index_type == "flat":
+        return "Flat", {}
+    if index_type == "hnsw":
+        return f"HNSW{params.get('hnsw_m', 32)},Flat", {"efSearch": params.get("ef_search", 64)}
+
+    nlist = params.get("nlist") or _default_nlist(n)
+    search = {"nprobe": params.get("nprobe", max(1, min(nlist, 16)))}
+    if index_type == "ivf-flat":
+        return f"IVF{nlist},Flat", search
+    if index_type == "ivf-sq8":
+        return f"IVF{nlist},SQ8", search
+    m = params.get("pq_m") or _default_pq_m(dim)
+    nbits = params.get("pq_nbits", 8)
+    if index_type == "ivf-pq":
+        return f"IVF{nlist},PQ{m}x{nbits}", search
+    if index_type == "opq-ivf-pq":
+        return f"OPQ{m},IVF{nlist},PQ{m}x{nbits}", search
+    raise ValueError(f"Unknown index type: {index_type} (expected one of {INDEX_TYPES})")
+
+
+def build_index(
+    embeddings: np.ndarray,
+    index_type: str = "auto",
+    params: Optional[Dict[str, Any]] = None,
+    max_train_points: int = 256_000,
+    ids: Optional[np.ndarray] = None,
+) -> Tuple[faiss.Index, Dict[str, Any]]:
+    """Build, train and fill an index for normalized embeddings.
+
+    Args:
+        embeddings: (n, d) float32 matrix
+        index_type: One of INDEX_TYPES
+        params: Build/search parameters (nlist, nprobe, hnsw_m, ef_construction,
+            ef_search, pq_m, pq_nbits)
+        max_train_points: Training sample cap for IVF/PQ quantizers
+        ids: Explicit int64 ids (row numbers); non-IVF indexes are wrapped
+            in an IndexIDMap2 so ids survive removals
+
+    Returns:
+        (index, search params to persist)
+    """
+    params = params or {}
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    n, dim = embeddings.shape
+    spec, search_params = factory_string(index_type, dim, n, params)
+    index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == "hnsw":
+        faiss.downcast_index(index).hnsw.efConstruction = params.get("ef_construction", 200)
+
+    if not index.is_trained:
+        train = embeddings
+        if n > max_train_points:
+            rng = np.random.default_rng(0)
+            train = embeddings[rng.choice(n, max_train_points, replace=False)]
+        index.train(train)
+
+    if ids is None:
+        index.add(embeddings)
+    else:
+        ids = np.ascontiguousarray(ids, dtype="int64")
+        try:
+            faiss.extract_index_ivf(index)
+        except RuntimeError:
+            index = faiss.IndexIDMap2(index)
+        index.add_with_ids(embeddings, ids)
+    apply_search_params(index, search_params)
+    return index, search_params
+
+
+def save_search_params(out_dir: Path, search_params: Dict[str, Any]) -> Path:
+    """Persist search-time parameters next to index.faiss."""
+    path = Path(out_dir) / SEARCH_PARAMS_FILE
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(search_params), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,190 @@
+# backend/build_index/incremental.py
+"""
+Incremental index updates.
+
+Diffs the new corpus against the previous build (build_state.json) by
+doc key (Doc.id, "Κωδικός") and content hash of Doc.text, embeds only the
+added/changed docs and applies add/update/delete to the saved index,
+embeddings.npy and metadata files.
+
+Row ids are stable: a doc keeps its FAISS id (= metadata row) across
+updates. Deleted rows become tombstones whose slots are reused by later
+additions.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import json
+import numpy as np
+import faiss
+
+from backend.build_index.corpus import Doc
+from backend.build_index.embeddings import (
+    EmbeddingManager, doc_keys, load_build_state, save_build_state,
+    write_index, write_metadata,
+)
+from backend.build_index.faiss_index import build_index, save_search_params
+from backend.core.retrieval.vector_search import apply_search_params
+from backend.core.resource_loader import load_search_params
+
+TOMBSTONE = {"id": None, "metadata": {}}
+
+
+@dataclass
+class UpdatePlan:
+    added: List[int] = field(default_factory=list)      # positions in the new doc list
+    changed: List[int] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)    # doc keys from the previous build
+    unchanged: int = 0
+
+
+def plan_update(docs: List[Doc], keys: List[str], state: Dict[str, Any]) -> UpdatePlan:
+    """Classify docs against the previous build state."""
+    previous: Dict[str, List] = state["docs"]
+    plan = UpdatePlan()
+    for pos, (key, doc) in enumerate(zip(keys, docs)):
+        prev = previous.get(key)
+        if prev is None:
+            plan.added.append(pos)
+        elif prev[1] != doc.content_hash():
+            plan.changed.append(pos)
+        else:
+            plan.unchanged += 1
+    current = set(keys)
+    plan.deleted = [k for k in previous if k not in current]
+    return plan
+
+
+def _supports_remove(index: faiss.Index) -> bool:
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return not isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW)
+    try:
+        faiss.extract_index_ivf(index)
+        return True
+    except RuntimeError:
+        return False
+
+
+class IncrementalIndexUpdater:
+    """Applies an incremental update to a directory produced by a full build."""
+
+    def __init__(self, emb_mgr: EmbeddingManager, out_dir: Path):
+        self.emb_mgr = emb_mgr
+        self.out_dir = Path(out_dir)
+
+    def can_update(self, index_type: str) -> bool:
+        """True when a previous build with the same model and index type exists."""
+        state = load_build_state(self.out_dir)
+        if state is None or not (self.out_dir / "index.faiss").exists():
+            return False
+        return state.get("model") == self.emb_mgr.model_id and state.get("index_type") == index_type
+
+    def run(self, docs: List[Doc], batch_size: int = 128) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        state = load_build_state(self.out_dir)
+        keys = doc_keys(docs)
+        plan = plan_update(docs, keys, state)
+        print(f"Incremental plan: +{len(plan.added)} added, ~{len(plan.changed)} changed, "
+              f"-{len(plan.deleted)} deleted, {plan.unchanged} unchanged (skipped)")
+
+        embeddings = np.load(self.out_dir / "embeddings.npy")
+        with (self.out_dir / "metadata.jsonl").open("r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+        # slot assignment: changed docs keep their slot, deleted slots are freed
+        docs_state: Dict[str, List] = state["docs"]
+        free_slots: List[int] = list(state.get("free_slots", []))
+        removed: List[int] = []
+        for key in plan.deleted:
+            slot = docs_state.pop(key)[0]
+            entries[slot] = TOMBSTONE
+            embeddings[slot] = 0.0
+            free_slots.append(slot)
+            removed.append(slot)
+
+        touched = plan.changed + plan.added
+        slots: List[int] = []
+        for pos in touched:
+            key = keys[pos]
+            if key in docs_state:
+                slots.append(docs_state[key][0])
+                removed.append(docs_state[key][0])
+            elif free_slots:
+                slots.append(free_slots.pop())
+            else:
+                slots.append(len(entries))
+                entries.append(TOMBSTONE)
+        if slots and max(slots) >= len(embeddings):
+            grown = np.zeros((max(slots) + 1, embeddings.shape[1]), dtype=embeddings.dtype)
+            grown[:len(embeddings)] = embeddings
+            embeddings = grown
+
+        new_vectors = np.zeros((0, embeddings.shape[1]), dtype="float32")
+        if touched:
+            t_enc = time.perf_counter()
+            new_vectors = self.emb_mgr.encode_docs([docs[p] for p in touched], batch_size=batch_size).astype("float32")
+            print(f"✓ Encoded {len(touched)} docs in {time.perf_counter() - t_enc:.1f}s")
+        for pos, slot, vec in zip(touched, slots, new_vectors):
+            doc = docs[pos]
+            entries[slot] = {"id": doc.id, "metadata": doc.metadata}
+            embeddings[slot] = vec
+            docs_state[keys[pos]] = [slot, doc.content_hash()]
+
+        self._update_index(
+            state, embeddings, np.array(removed, dtype="int64"),
+            np.array(slots, dtype="int64"), new_vectors, free_slots,
+        )
+
+        np.save(self.out_dir / "embeddings.npy", embeddings)
+        write_metadata(self.out_dir, entries)
+        state["free_slots"] = free_slots
+        save_build_state(self.out_dir, state)
+
+        report = {
+            "added": len(plan.added),
+            "changed": len(plan.changed),
+            "deleted": len(plan.deleted),
+            "skipped": plan.unchanged,
+            "seconds": round(time.perf_counter() - t0, 2),
+        }
+        print(f"✓ Incremental update done: {report}")
+        return report
+
+    def _update_index(
+        self,
+        state: Dict[str, Any],
+        embeddings: np.ndarray,
+        removed: np.ndarray,
+        slots: np.ndarray,
+        vectors: np.ndarray,
+        free_slots: List[int],
+    ) -> None:
+        index_path = self.out_dir / "index.faiss"
+        index = faiss.read_index(str(index_path))
+
+        if isinstance(index, faiss.IndexFlat):
+            # plain Flat ids are positional; switch to an ID map (ids = all rows built so far)
+            n_prev = index.ntotal
+            mapped = faiss.IndexIDMap2(faiss.IndexFlatIP(index.d))
+            mapped.add_with_ids(embeddings[:n_prev], np.arange(n_prev, dtype="int64"))
+            index = mapped
+
+        if _supports_remove(index):
+            if len(removed):
+                index.remove_ids(removed)
+            if len(slots):
+                index.add_with_ids(vectors, slots)
+        else:
+            # e.g. HNSW: no deletions, rebuild from stored embeddings (no re-encoding)
+            print("Index type does not support removals, rebuilding from embeddings.npy")
+            live = np.setdiff1d(np.arange(len(embeddings)), np.array(free_slots, dtype="int64"))
+            index, _ = build_index(
+                embeddings[live], index_type=state["index_type"],
+                params=state.get("index_params"), ids=live,
+            )
+
+        apply_search_params(index, load_search_params(index_path))
+        write_index(self.out_dir, index)
@@ -0,0 +1,157 @@
+# backend/build_index/parallel_encode.py
+"""
+Multi-process embedding for CPU builds.
+
+Texts are split into fixed-size shards and encoded by a pool of worker
+processes, each holding its own SentenceTransformer copy with a pinned
+intra-op thread count (and, on Linux, its own block of cores). Results are
+reassembled in input order.
+
+Finished shards are checkpointed as .npy files named after a hash of the
+model and the shard texts, so an interrupted build re-run on the same
+corpus only encodes the shards that were not finished yet.
+"""
+from __future__ import annotations
+import hashlib
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# per-process state of a pool worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int, counter, pin_cores: bool) -> None:
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    if pin_cores and hasattr(os, "sched_setaffinity"):
+        with counter.get_lock():
+            slot = counter.value
+            counter.value += 1
+        cpus = sorted(os.sched_getaffinity(0))
+        start = (slot * threads) % len(cpus)
+        os.sched_setaffinity(0, cpus[start:start + threads] or cpus)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from sentence_transformers import SentenceTransformer
+    global _worker_model
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_shard(texts: List[str], batch_size: int, out_path: str) -> str:
+    embs = _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    ).astype("float32")
+    tmp = f"{out_path}.{os.getpid()}.tmp.npy"
+    np.save(tmp, embs)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def shard_digest(model_name: str, texts: List[str]) -> str:
+    h = hashlib.blake2b(model_name.encode("utf-8"), digest_size=16)
+    for t in texts:
+        h.update(b"\0")
+        h.update(t.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ParallelEncoder:
+    """Shards texts across a process pool; each worker loads its own model.
+
+    Args:
+        model_name: SentenceTransformer model to load in every worker
+        workers: Number of worker processes
+        threads_per_worker: Intra-op threads per worker (default: cores // workers)
+        shard_size: Texts per task / checkpoint file
+        checkpoint_dir: Where finished shards are kept until the encode completes
+        pin_cores: Give each worker its own block of cores (Linux only)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        threads_per_worker: Optional[int] = None,
+        shard_size: int = 2048,
+        checkpoint_dir: Optional[Path] = None,
+        pin_cores: bool = True,
+    ):
+        self.model_name = model_name
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.shard_size = shard_size
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.pin_cores = pin_cores
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tmp_dir: Optional[Path] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that already initialized torch threads can deadlock
+            ctx = mp.get_context("spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self.model_name, self.threads_per_worker, ctx.Value("i", 0), self.pin_cores),
+            )
+            print(f"✓ Started {self.workers} encode workers x {self.threads_per_worker} threads")
+        return self._pool
+
+    def _shard_dir(self) -> Path:
+        if self.checkpoint_dir is not None:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            return self.checkpoint_dir
+        if self._tmp_dir is None:
+            self._tmp_dir = Path(tempfile.mkdtemp(prefix="encode_shards_"))
+        return self._tmp_dir
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts in parallel; returns normalized float32 embeddings in input order."""
+        shard_dir = self._shard_dir()
+        shards = [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        paths = [shard_dir / f"shard-{shard_digest(self.model_name, s)}.npy" for s in shards]
+
+        # identical shards (repeated texts) share a checkpoint and are encoded once
+        unique = dict(zip(paths, shards))
+        pending = [(p, s) for p, s in unique.items() if not p.exists()]
+        if len(pending) < len(unique):
+            print(f"Resuming: {len(unique) - len(pending)}/{len(unique)} shards already encoded")
+        if pending:
+            pool = self._get_pool()
+            futures = [pool.submit(_encode_shard, s, batch_size, str(p)) for p, s in pending]
+            for done, fut in enumerate(futures, 1):
+                fut.result()
+                if len(pending) > 1:
+                    print(f"  encoded shard {done}/{len(pending)}")
+
+        embs = np.concatenate([np.load(p) for p in paths]) if paths else np.zeros((0, 0), dtype="float32")
+        # the caller persists the assembled result; shards are only needed until then
+        for p in set(paths):
+            p.unlink(missing_ok=True)
+        return embs
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
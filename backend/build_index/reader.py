@@ -1,9 +1,13 @@
 # backend/data/reader.py
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+from collections import defaultdict
 import json
 
+# Μορφές που διαβάζει το openpyxl· οι υπόλοιπες (.xls, .ods, ...) περνούν από pd.read_excel.
+_OPENPYXL_SUFFIXES = {".xlsx", ".xlsm", ".xltx", ".xltm"}
+
 def _clean_col(c: str) -> str:
     """Καθαρίζει ονόματα στηλών (trim, αντικατάσταση \n, συμπτύξη πολλαπλών κενών)."""
     if c is None:
@@ -18,6 +22,47 @@ def _norm_val(v) -> Optional[str]:
     s = str(v).strip()
     return s if s and s.lower() != "nan" else None
 
+def _excel_cell(v):
+    """Ακέραιοι αριθμοί από το Excel ως '12' και όχι '12.0' (όπως το pd.read_excel)."""
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def _header_names(header) -> List:
+    """Ονόματα στηλών όπως τα δίνει το pd.read_excel (python parser του pandas).
+
+    Κενά -> 'Unnamed: i'. Διπλότυπα -> 'X.1', 'X.2', ... παρακάμπτοντας ονόματα
+    που υπάρχουν ήδη στην κεφαλίδα· πρώτα οι επώνυμες στήλες, μετά οι κενές.
+    """
+    columns = [_excel_cell(c) for c in header]
+    unnamed = [i for i, c in enumerate(columns) if c is None or c == ""]
+    for i in unnamed:
+        columns[i] = f"Unnamed: {i}"
+    counts: Dict = defaultdict(int)
+    for i in [i for i in range(len(columns)) if i not in unnamed] + unnamed:
+        col = old_col = columns[i]
+        cur = counts[col]
+        while cur > 0:
+            counts[old_col] = cur + 1
+            col = f"{old_col}.{cur}"
+            cur = cur + 1 if col in columns else counts[col]
+        columns[i] = col
+        counts[col] = cur + 1
+    return columns
+
+
+def _clean_frame(df: pd.DataFrame) -> List[Dict[str, str]]:
+    """Vectorized εκδοχή του _norm_val για ολόκληρο chunk (trim, κενό/NaN -> εκτός γραμμής)."""
+    df = df.astype("string").apply(lambda col: col.str.strip())
+    empty = df.isna() | (df == "") | df.apply(lambda col: col.str.lower() == "nan")
+    df = df.astype(object).mask(empty.astype(bool), None)
+    return [
+        {k: v for k, v in rec.items() if v is not None}
+        for rec in df.to_dict("records")
+    ]
+
+
 class ExcelReader:
     """ΟΛΗ η λογική ανάγνωσης/προεπισκόπησης/εξαγωγής Excel."""
     def list_sheets(self, path: Path) -> List[str]:
@@ -29,18 +74,56 @@ class ExcelReader:
 
     def read_from_path(self, path: Path, sheet: int | str = 0) -> List[Dict[str, str]]:
         """Διαβάζει Excel ή CSV αρχείο ανάλογα με την κατάληξη."""
-        if path.suffix.lower() == '.csv':
-            df = pd.read_csv(path, dtype=str)
-        else:
-            df = pd.read_excel(path, sheet_name=sheet, dtype=str)
-        
-        df.columns = [_clean_col(c) for c in df.columns]
         rows: List[Dict[str, str]] = []
-        for _, r in df.iterrows():
-            row = {c: _norm_val(r[c]) for c in df.columns}
-            rows.append({k: v for k, v in row.items() if v is not None})
+        for chunk in self.iter_chunks(path, sheet=sheet):
+            rows.extend(chunk)
         return rows
 
+    def iter_chunks(self, path: Path, sheet: int | str = 0, chunk_size: int = 10_000) -> Iterator[List[Dict[str, str]]]:
+        """Διαβάζει το αρχείο σε chunks των `chunk_size` γραμμών (σταθερή μνήμη).
+
+        CSV: pandas chunked reader. Excel (.xlsx): openpyxl σε read-only streaming
+        mode, με τα ίδια ονόματα στηλών με το pd.read_excel. Άλλες μορφές (π.χ. .xls): pd.read_excel και τεμαχισμός.
+        """
+        suffix = path.suffix.lower()
+        if suffix == '.csv':
+            for df in pd.read_csv(path, dtype=str, chunksize=chunk_size):
+                df.columns = [_clean_col(c) for c in df.columns]
+                yield _clean_frame(df)
+            return
+        if suffix not in _OPENPYXL_SUFFIXES:
+            df = pd.read_excel(path, sheet_name=sheet, dtype=str)
+            df.columns = [_clean_col(c) for c in df.columns]
+            for start in range(0, len(df), chunk_size):
+                yield _clean_frame(df.iloc[start:start + chunk_size])
+            return
+
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[sheet] if isinstance(sheet, int) else wb[sheet]
+            values = ws.iter_rows(values_only=True)
+            header = next(values, None)
+            if header is None:
+                return
+            columns = [_clean_col(c) for c in _header_names(header)]
+            buf: List[tuple] = []
+            blank = 0  # κενές γραμμές στο τέλος αγνοούνται, όπως στο pd.read_excel
+            for row in values:
+                if all(v is None or v == "" for v in row):
+                    blank += 1
+                    continue
+                buf.extend([(None,) * len(columns)] * blank)
+                blank = 0
+                buf.append(tuple(_excel_cell(v) for v in row))
+                if len(buf) >= chunk_size:
+                    yield _clean_frame(pd.DataFrame(buf, columns=columns, dtype=object))
+                    buf = []
+            if buf:
+                yield _clean_frame(pd.DataFrame(buf, columns=columns, dtype=object))
+        finally:
+            wb.close()
+
     def preview(self, rows: List[Dict[str, str]], n: int = 20) -> str:
         lines: List[str] = []
         for i, row in enumerate(rows[:n], start=1):
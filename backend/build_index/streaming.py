@@ -0,0 +1,155 @@
+# backend/build_index/streaming.py
+"""
+Bounded-memory building blocks for streaming builds.
+
+Rows flow through the build in fixed-size chunks (read -> corpus -> encode
+-> index add -> write), so peak memory depends on the chunk size and the
+IVF/PQ training sample rather than on the catalog size:
+
+- NpyWriter:            appends embedding chunks to disk, writes embeddings.npy on close
+- StreamingIndexWriter: buffers only the training sample, then adds chunk by chunk
+- StageStats:           per-stage seconds and rows/s
+"""
+from __future__ import annotations
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from backend.build_index.faiss_index import build_index
+
+
+class NpyWriter:
+    """Append float32 row blocks and finalize them as a regular .npy file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._raw_path = self.path.with_suffix(".npy.part")
+        self._raw = self._raw_path.open("wb")
+        self.rows = 0
+        self.dim: Optional[int] = None
+
+    def append(self, block: np.ndarray) -> None:
+        block = np.ascontiguousarray(block, dtype="float32")
+        if self.dim is None:
+            self.dim = block.shape[1]
+        elif block.shape[1] != self.dim:
+            raise ValueError(f"Dimension mismatch: {block.shape[1]} != {self.dim}")
+        block.tofile(self._raw)
+        self.rows += len(block)
+
+    def close(self) -> Path:
+        """Write the .npy header followed by the appended rows (atomic rename)."""
+        self._raw.close()
+        header = {
+            "descr": np.lib.format.dtype_to_descr(np.dtype("float32")),
+            "fortran_order": False,
+            "shape": (self.rows, self.dim or 0),
+        }
+        tmp = self.path.with_suffix(".npy.tmp")
+        with tmp.open("wb") as out, self._raw_path.open("rb") as raw:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, 16 * 1024 * 1024)
+        os.replace(tmp, self.path)
+        self._raw_path.unlink()
+        return self.path
+
+    def abort(self) -> None:
+        """Drop the appended rows without writing the .npy (failed build)."""
+        self._raw.close()
+        self._raw_path.unlink(missing_ok=True)
+        self.path.with_suffix(".npy.tmp").unlink(missing_ok=True)
+
+
+class StreamingIndexWriter:
+    """Fill a FAISS index from embedding chunks.
+
+    Index types that need no training (flat, hnsw) are created from the first
+    chunk. Trained types (IVF/PQ) and "auto" buffer vectors until
+    `train_points` are available and train on that prefix; catalogs smaller
+    than the sample end up identical to a non-streaming build.
+    """
+
+    def __init__(self, index_type: str = "auto", params: Optional[Dict[str, Any]] = None, train_points: int = 100_000):
+        self.index_type = index_type
+        self.params = params or {}
+        # auto switches to IVF above 10k vectors, so it needs to see them first
+        self.train_points = max(train_points, 10_001) if index_type == "auto" else train_points
+        self.index: Optional[faiss.Index] = None
+        self.search_params: Dict[str, Any] = {}
+        self._pending: List[np.ndarray] = []
+        self._n_pending = 0
+
+    @property
+    def ntotal(self) -> int:
+        return (self.index.ntotal if self.index is not None else 0) + self._n_pending
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        if self.index is not None:
+            self.index.add(vectors)
+            return
+        self._pending.append(vectors)
+        self._n_pending += len(vectors)
+        if self.index_type in ("flat", "hnsw") or self._n_pending >= self.train_points:
+            self._create()
+
+    def finish(self) -> Tuple[faiss.Index, Dict[str, Any]]:
+        """Return (index, search params to persist)."""
+        if self.index is None:
+            if not self._pending:
+                raise RuntimeError("No vectors were added")
+            self._create()
+        return self.index, self.search_params
+
+    def _create(self) -> None:
+        sample = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        self._pending, self._n_pending = [], 0
+        self.index, self.search_params = build_index(
+            sample, index_type=self.index_type, params=self.params, max_train_points=self.train_points,
+        )
+
+
+class StageStats:
+    """Accumulates wall time and row counts per build stage."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.rows: Dict[str, int] = {}
+
+    def add(self, stage: str, started: float, rows: int) -> None:
+        """Record a stage run that began at `started` (time.perf_counter())."""
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + time.perf_counter() - started
+        self.rows[stage] = self.rows.get(stage, 0) + rows
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for stage, secs in self.seconds.items():
+            rows = self.rows[stage]
+            out[stage] = {
+                "rows": rows,
+                "seconds": round(secs, 2),
+                "rows_per_s": round(rows / secs, 1) if secs > 0 else None,
+            }
+        return out
+
+    def print_report(self) -> None:
+        print("\nThroughput per stage:")
+        for stage, r in self.report().items():
+            print(f"- {stage:<8} {r['rows']:>9} rows  {r['seconds']:>8.2f}s  {r['rows_per_s'] or '-':>10} rows/s")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
@@ -1,6 +1,7 @@
 """Abstract base class for LLM clients."""
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 
 
 class BaseLLMClient(ABC):
@@ -22,4 +23,53 @@ class BaseLLMClient(ABC):
         Returns:
             Generated text
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+    ) -> str:
+        """Async variant of generate.
+
+        The default runs `generate` in a worker thread. Clients with a
+        native async transport should override it so no thread is held
+        while waiting on the upstream.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system instructions
+
+        Returns:
+            Generated text
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Generate text from prompt, yielding deltas as they arrive.
+
+        The default yields the full `generate` result as a single delta.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system instructions
+
+        Yields:
+            Text deltas
+        """
+        yield self.generate(prompt, system_prompt)
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Async variant of generate_stream.
+
+        The default yields the full `agenerate` result as a single delta.
+        """
+        yield await self.agenerate(prompt, system_prompt)
@@ -1,22 +1,68 @@
 """OpenAI LLM client implementation."""
-from openai import OpenAI
+from functools import lru_cache
+import openai
+from openai import OpenAI, AsyncOpenAI
 import logging
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 from backend import app_settings
 from backend.clients.base_llm_client import BaseLLMClient
+from backend.clients.transport import LLMTransport
+from backend.core.metrics import LLM_CALLS, LLM_TOKENS
 
 logger = logging.getLogger(__name__)
 
+# 408 timeout, 409 conflict, 429 rate limit; 5xx are retried as well
+RETRY_STATUS = (408, 409, 429)
+
+
+def _record_usage(usage, mode: str) -> None:
+    """Count a finished call and the tokens the API reported for it."""
+    LLM_CALLS.inc(mode=mode, outcome="ok")
+    if usage is None:
+        return
+    LLM_TOKENS.inc(getattr(usage, "input_tokens", 0) or 0, kind="input")
+    LLM_TOKENS.inc(getattr(usage, "output_tokens", 0) or 0, kind="output")
+
+
+def _stream_event(event) -> None:
+    """Count the end of a stream: usage when it completed, an error when the API reports one."""
+    if event.type == "response.completed":
+        _record_usage(getattr(event.response, "usage", None), "stream")
+    elif event.type in ("response.failed", "error"):
+        LLM_CALLS.inc(mode="stream", outcome="error")
+
+
+def is_retryable(e: BaseException) -> bool:
+    """Connection errors, timeouts, rate limits and server errors are worth another attempt."""
+    if isinstance(e, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in RETRY_STATUS or e.status_code >= 500
+    return False
+
 
 class OpenAIClient(BaseLLMClient):
-    """OpenAI GPT client."""
+    """OpenAI GPT client.
+
+    Calls go through an LLMTransport: pooled keep-alive connections,
+    per-call deadlines, jittered retries and (async) optional hedging. The
+    SDK's own retries are disabled so only the transport retries.
+    """
     
     def __init__(
         self, 
         api_key: str = app_settings.OPENAI_API_KEY,
-        model: str = app_settings.OPEN_AI_MODEL
+        model: str = app_settings.OPEN_AI_MODEL,
+        base_url: Optional[str] = getattr(app_settings, "OPENAI_BASE_URL", None),
+        transport: Optional[LLMTransport] = None,
     ):
-        self.client = OpenAI(api_key=api_key)
+        self.transport = transport or LLMTransport.from_settings()
+        self.client = OpenAI(
+            api_key=api_key, base_url=base_url, max_retries=0, http_client=self.transport.http_client()
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=api_key, base_url=base_url, max_retries=0, http_client=self.transport.async_http_client()
+        )
         self.model = model
     
     def generate(
@@ -25,23 +71,113 @@ class OpenAIClient(BaseLLMClient):
         system_prompt: Optional[str] = None,
     ) -> str:
         """Generate response using OpenAI API."""
+        try:
+            response = self.transport.call(
+                lambda timeout: self.client.responses.create(
+                    model=self.model,
+                    instructions=system_prompt,
+                    input=prompt,
+                    timeout=timeout,
+                ),
+                is_retryable,
+            )
+        except Exception:
+            LLM_CALLS.inc(mode="sync", outcome="error")
+            raise
+        _record_usage(getattr(response, "usage", None), "sync")
+        logger.debug("OpenAI response: %s", response)
+        return response.output_text
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+    ) -> str:
+        """Generate response using the async OpenAI API (hedged when LLM_HEDGE is on)."""
+        try:
+            response = await self.transport.acall(
+                lambda timeout: self.async_client.responses.create(
+                    model=self.model,
+                    instructions=system_prompt,
+                    input=prompt,
+                    timeout=timeout,
+                ),
+                is_retryable,
+            )
+        except Exception:
+            LLM_CALLS.inc(mode="async", outcome="error")
+            raise
+        _record_usage(getattr(response, "usage", None), "async")
+        logger.debug("OpenAI response: %s", response)
+        return response.output_text
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Stream response text deltas from the OpenAI API.
 
-        response = self.client.responses.create(
-                model=self.model,
-                instructions=system_prompt,
-                input=prompt
+        Opening the stream is retried; once deltas flow, errors propagate.
+        """
+        try:
+            stream = self.transport.call(
+                lambda timeout: self.client.responses.create(
+                    model=self.model,
+                    instructions=system_prompt,
+                    input=prompt,
+                    stream=True,
+                    timeout=timeout,
+                ),
+                is_retryable,
             )
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                else:
+                    _stream_event(event)
+        except Exception:
+            LLM_CALLS.inc(mode="stream", outcome="error")
+            raise
 
-        print(f"OpenAI response: {response}")    
-        return response.output_text
-    
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Stream response text deltas from the async OpenAI API.
+
+        Opening the stream is retried (never hedged); once deltas flow,
+        errors propagate.
+        """
+        try:
+            stream = await self.transport.acall(
+                lambda timeout: self.async_client.responses.create(
+                    model=self.model,
+                    instructions=system_prompt,
+                    input=prompt,
+                    stream=True,
+                    timeout=timeout,
+                ),
+                is_retryable,
+                hedge=False,
+            )
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                else:
+                    _stream_event(event)
+        except Exception:
+            LLM_CALLS.inc(mode="stream", outcome="error")
+            raise
+
+
+@lru_cache(maxsize=None)
+def _legacy_client(model: str) -> OpenAIClient:
+    return OpenAIClient(model=model)
 
-            
-        
 
 # Backward compatibility
 def generate_response(prompt: str, model: str = app_settings.OPEN_AI_MODEL) -> str:
-    """Legacy function for backward compatibility."""
-    client = OpenAIClient(model=model)
-    return client.generate(prompt)
\ No newline at end of file
+    """Legacy function for backward compatibility (one pooled client per model)."""
+    return _legacy_client(model).generate(prompt)
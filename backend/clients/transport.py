@@ -0,0 +1,296 @@
+"""Connection pooling, deadlines, retries and hedging for LLM calls.
+
+LLMTransport wraps single upstream attempts; it does not know the provider
+API. Clients pass a function that makes one attempt with a given timeout
+and a predicate telling retryable errors apart (see OpenAIClient).
+
+    deadline   each attempt gets min(LLM_TIMEOUT_S, what is left of the
+               request's REQUEST_TIMEOUT_S, measured from request start);
+               the request budget is the only bound on the whole call
+    retries    up to LLM_MAX_RETRIES, full-jitter exponential backoff,
+               only while the deadline leaves room for another attempt;
+               a call that ends on a timeout raises LLMTimeoutError
+    hedging    (async, non-streaming) if the first attempt is still running
+               after the hedge delay, a second one is sent and the first
+               answer wins; the delay is LLM_HEDGE_AFTER_MS or, by default,
+               the p95 of recent successful hedgeable (async, non-streaming)
+               attempts
+"""
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+import httpx
+import numpy as np
+
+from backend import app_settings
+from backend.core.metrics import REGISTRY, current_timings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LLM_RETRIES = REGISTRY.counter(
+    "warehouse_llm_retries_total", "LLM attempts retried, by error type", labelnames=("reason",)
+)
+LLM_HEDGES = REGISTRY.counter(
+    "warehouse_llm_hedges_total", "Hedged LLM attempts, by which attempt answered first", labelnames=("winner",)
+)
+
+# an attempt with less time than this left is not started
+MIN_ATTEMPT_S = 0.05
+
+
+class LLMTimeoutError(TimeoutError):
+    """The request's time budget ran out before the LLM answered."""
+
+
+def is_timeout(e: BaseException) -> bool:
+    """Timeout-class error, also when a client library wraps it (openai.APITimeoutError)."""
+    while e is not None:
+        if isinstance(e, (TimeoutError, httpx.TimeoutException)):
+            return True
+        e = e.__cause__
+    return False
+
+
+class LLMTransport:
+    """Shared HTTP pools and the retry/hedging policy of one LLM client.
+
+    Args:
+        timeout_s: Upper bound per attempt
+        connect_timeout_s: TCP/TLS connect timeout per attempt
+        request_budget_s: Total time a request may spend, retries included
+            (the call's deadline is what is left of it); None = no overall
+            bound, only timeout_s per attempt and max_retries
+        max_retries: Retries after the first attempt
+        backoff_base_ms: First backoff cap; doubles per retry up to backoff_max_ms
+        backoff_max_ms: Largest backoff cap
+        max_connections: Connection pool size (per sync/async client)
+        max_keepalive: Idle connections kept open
+        keepalive_s: How long an idle connection is kept
+        hedge: Send a second attempt when the first one is slow (async only)
+        hedge_after_ms: Fixed hedge delay (None = p95 of recent attempts)
+        hedge_min_samples: Attempts observed before the p95 is trusted
+        seed: Backoff jitter seed (tests)
+    """
+
+    def __init__(
+        self,
+        timeout_s: float = 30.0,
+        connect_timeout_s: float = 2.0,
+        request_budget_s: Optional[float] = 60.0,
+        max_retries: int = 2,
+        backoff_base_ms: float = 100.0,
+        backoff_max_ms: float = 2000.0,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_s: float = 30.0,
+        hedge: bool = False,
+        hedge_after_ms: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        seed: Optional[int] = None,
+    ):
+        self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.request_budget_s = request_budget_s
+        self.max_retries = max_retries
+        self.backoff_base_ms = backoff_base_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_s,
+        )
+        self.hedge = hedge
+        self.hedge_after_ms = hedge_after_ms
+        self.hedge_min_samples = hedge_min_samples
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=512)
+
+    @classmethod
+    def from_settings(cls) -> "LLMTransport":
+        return cls(
+            timeout_s=getattr(app_settings, "LLM_TIMEOUT_S", 30.0),
+            connect_timeout_s=getattr(app_settings, "LLM_CONNECT_TIMEOUT_S", 2.0),
+            request_budget_s=getattr(app_settings, "REQUEST_TIMEOUT_S", 60.0),
+            max_retries=getattr(app_settings, "LLM_MAX_RETRIES", 2),
+            backoff_base_ms=getattr(app_settings, "LLM_BACKOFF_BASE_MS", 100.0),
+            backoff_max_ms=getattr(app_settings, "LLM_BACKOFF_MAX_MS", 2000.0),
+            max_connections=getattr(app_settings, "LLM_MAX_CONNECTIONS", 100),
+            max_keepalive=getattr(app_settings, "LLM_MAX_KEEPALIVE", 20),
+            keepalive_s=getattr(app_settings, "LLM_KEEPALIVE_S", 30.0),
+            hedge=getattr(app_settings, "LLM_HEDGE", False),
+            hedge_after_ms=getattr(app_settings, "LLM_HEDGE_AFTER_MS", None),
+        )
+
+    # ---- pools -------------------------------------------------------------
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout_s, connect=self.connect_timeout_s)
+
+    def http_client(self) -> httpx.Client:
+        """Keep-alive pool for sync calls (create once per LLM client)."""
+        return httpx.Client(limits=self.limits, timeout=self._timeout())
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Keep-alive pool for async calls (create once per LLM client)."""
+        return httpx.AsyncClient(limits=self.limits, timeout=self._timeout())
+
+    # ---- deadlines and policy ----------------------------------------------
+
+    def remaining_s(self) -> float:
+        """Time left of the request budget (inf without one): the bound on the whole call."""
+        if self.request_budget_s is None:
+            return math.inf
+        timings = current_timings()
+        elapsed = timings.elapsed() if timings is not None else 0.0
+        return self.request_budget_s - elapsed
+
+    def attempt_timeout(self, deadline: float) -> httpx.Timeout:
+        """Timeout for one attempt: timeout_s, cut short if the call must finish by `deadline` (perf_counter)."""
+        left = max(min(self.timeout_s, deadline - time.perf_counter()), 0.001)
+        return httpx.Timeout(left, connect=min(self.connect_timeout_s, left))
+
+    def _backoff_s(self, retry: int) -> float:
+        cap = min(self.backoff_max_ms, self.backoff_base_ms * (2 ** retry))
+        with self._lock:
+            return self._rnd.uniform(0, cap) / 1000
+
+    def _observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay_s(self) -> Optional[float]:
+        """When to send the hedged attempt, or None (hedging off or too few samples)."""
+        if not self.hedge:
+            return None
+        if self.hedge_after_ms is not None:
+            return self.hedge_after_ms / 1000
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            return float(np.percentile(self._latencies, 95))
+
+    def _retry_or_raise(
+        self,
+        e: BaseException,
+        retry: int,
+        deadline: float,
+        retryable: Callable[[BaseException], bool],
+    ) -> float:
+        """Backoff before the next attempt; re-raises when retrying is pointless.
+
+        Timeouts, and retryable errors with no time left, are raised as
+        LLMTimeoutError.
+        """
+        if not retryable(e):
+            self._give_up(e)
+        left = deadline - time.perf_counter()
+        if left <= MIN_ATTEMPT_S:
+            raise LLMTimeoutError(f"LLM call exceeded its deadline ({type(e).__name__}: {e})") from e
+        if retry >= self.max_retries:
+            self._give_up(e)
+        sleep = self._backoff_s(retry)
+        if left - sleep < MIN_ATTEMPT_S:
+            self._give_up(e)
+        LLM_RETRIES.inc(reason=type(e).__name__)
+        logger.warning(f"LLM attempt failed ({type(e).__name__}: {e}), retry {retry + 1} in {sleep * 1000:.0f}ms")
+        return sleep
+
+    @staticmethod
+    def _give_up(e: BaseException) -> None:
+        if is_timeout(e):
+            raise LLMTimeoutError(f"LLM call timed out ({type(e).__name__}: {e})") from e
+        raise e
+
+    def _deadline(self) -> float:
+        remaining = self.remaining_s()
+        if remaining < MIN_ATTEMPT_S:
+            raise LLMTimeoutError("Request budget exhausted before the LLM call")
+        return time.perf_counter() + remaining
+
+    # ---- calls -------------------------------------------------------------
+
+    def call(
+        self,
+        attempt: Callable[[httpx.Timeout], T],
+        retryable: Callable[[BaseException], bool],
+    ) -> T:
+        """Run `attempt(timeout)` with deadline and retries (no hedging: it would hold a second thread)."""
+        deadline = self._deadline()
+        retry = 0
+        while True:
+            try:
+                return attempt(self.attempt_timeout(deadline))
+            except Exception as e:
+                time.sleep(self._retry_or_raise(e, retry, deadline, retryable))
+                retry += 1
+
+    async def acall(
+        self,
+        attempt: Callable[[httpx.Timeout], Awaitable[T]],
+        retryable: Callable[[BaseException], bool],
+        hedge: bool = True,
+    ) -> T:
+        """Async `call`; with `hedge`, slow attempts are raced against a second one.
+
+        Only hedgeable calls feed the latency window behind the hedge delay;
+        pass hedge=False for calls of a different shape (opening a stream).
+        """
+        deadline = self._deadline()
+        retry = 0
+        while True:
+            try:
+                if hedge:
+                    return await self._hedged(attempt, deadline)
+                return await attempt(self.attempt_timeout(deadline))
+            except Exception as e:
+                await asyncio.sleep(self._retry_or_raise(e, retry, deadline, retryable))
+                retry += 1
+
+    async def _hedged(self, attempt: Callable[[httpx.Timeout], Awaitable[T]], deadline: float) -> T:
+        """First attempt, plus a second one if the first is still running after the hedge delay.
+
+        Only the first attempt's latency feeds the p95; when the hedge wins,
+        the first is recorded as the time it had run when cancelled. That
+        keeps the tail visible, so hedging does not pull its own delay down.
+        """
+        delay = self.hedge_delay_s()
+        t0 = time.perf_counter()
+        first = asyncio.ensure_future(attempt(self.attempt_timeout(deadline)))
+        tasks = [first]
+        try:
+            if delay is None or deadline - time.perf_counter() < delay + MIN_ATTEMPT_S:
+                result = await first
+                self._observe(time.perf_counter() - t0)
+                return result
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(attempt(self.attempt_timeout(deadline))))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._observe(time.perf_counter() - t0)
+                        if len(tasks) > 1:
+                            LLM_HEDGES.inc(winner="first" if task is first else "hedge")
+                        return task.result()
+                    error = task.exception()
+            # every attempt failed: the retry policy sees the last error
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # mark a losing attempt's error as retrieved
+                    task.exception()
@@ -0,0 +1,45 @@
+"""Abstract base class for text encoders."""
+from abc import ABC, abstractmethod
+from typing import List, Union
+
+import numpy as np
+
+
+class BaseEncoder(ABC):
+    """Interface shared by every query/document encoder.
+
+    Mirrors the subset of SentenceTransformer used by VectorSearchEngine
+    and EmbeddingManager, so a SentenceTransformer instance is a valid
+    encoder as is and other backends (ONNX Runtime) plug in beside it.
+    """
+
+    device: str = "cpu"
+
+    @abstractmethod
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """Embed one text (-> (d,)) or a list of texts (-> (n, d)).
+
+        Args:
+            sentences: Text or texts to embed
+            batch_size: Texts per forward pass
+            show_progress_bar: Ignored unless the backend supports it
+            convert_to_numpy: Always numpy for non-torch backends
+            normalize_embeddings: L2-normalize the output rows
+
+        Returns:
+            float32 embeddings
+        """
+        pass
+
+    @abstractmethod
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension."""
+        pass
@@ -0,0 +1,209 @@
+"""ONNX Runtime encoder (optionally int8) for CPU-only serving.
+
+`export_onnx` turns a locally cached SentenceTransformer into one ONNX
+graph: transformer, pooling and any Dense/Normalize modules, so the
+runtime side only tokenizes and runs the session. The export directory
+holds:
+    model.onnx        fp32 graph
+    model.int8.onnx   dynamically quantized weights (with quantize=True)
+    encoder.json      source model, dimension, input names, max_seq_length
+    tokenizer files   saved from the model's tokenizer
+onnxruntime, onnx and torch are only needed for the ONNX backend.
+"""
+import importlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from backend.core.encoders.base_encoder import BaseEncoder
+
+logger = logging.getLogger(__name__)
+
+ENCODER_CONFIG = "encoder.json"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+
+def _require(module: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"The ONNX encoder backend needs '{module}' (pip install {module})") from e
+
+
+def export_onnx(
+    model_name: str,
+    out_dir: Path,
+    quantize: bool = True,
+    opset: int = 17,
+) -> Path:
+    """Export a SentenceTransformer to ONNX (and an int8 copy).
+
+    Args:
+        model_name: Model name or local path (loaded from the local cache)
+        out_dir: Export directory
+        quantize: Also write dynamically quantized int8 weights
+        opset: ONNX opset version
+
+    Returns:
+        out_dir
+    """
+    torch = _require("torch")
+    from sentence_transformers import SentenceTransformer
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    model.eval()
+    tokenizer = model.tokenizer
+    sample = tokenizer(["βίδα inox M8", "rakor 1/2"], padding=True, return_tensors="pt")
+    input_names = list(sample.keys())
+
+    class _Graph(torch.nn.Module):
+        """Full SentenceTransformer forward: features -> sentence_embedding."""
+
+        def __init__(self, st):
+            super().__init__()
+            self.st = st
+
+        def forward(self, *inputs):
+            return self.st(dict(zip(input_names, inputs)))["sentence_embedding"]
+
+    t0 = time.perf_counter()
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["sentence_embedding"] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Graph(model),
+            tuple(sample[name] for name in input_names),
+            str(out_dir / FP32_FILE),
+            input_names=input_names,
+            output_names=["sentence_embedding"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    logger.info(f"Exported {model_name} to {out_dir / FP32_FILE} in {time.perf_counter() - t0:.1f}s")
+
+    if quantize:
+        quantization = _require("onnxruntime.quantization")
+        quantization.quantize_dynamic(
+            str(out_dir / FP32_FILE),
+            str(out_dir / INT8_FILE),
+            weight_type=quantization.QuantType.QInt8,
+        )
+        logger.info(f"Quantized weights to int8: {out_dir / INT8_FILE}")
+
+    tokenizer.save_pretrained(str(out_dir))
+    config = {
+        "model_name": model_name,
+        "dim": model.get_sentence_embedding_dimension(),
+        "input_names": input_names,
+        "max_seq_length": model.max_seq_length,
+        "opset": opset,
+    }
+    with (out_dir / ENCODER_CONFIG).open("w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return out_dir
+
+
+class OnnxEncoder(BaseEncoder):
+    """Encodes with an ONNX Runtime session over an `export_onnx` directory.
+
+    Args:
+        model_dir: Export directory
+        quantized: Use model.int8.onnx (falls back to fp32 if it was not exported)
+        threads: Intra-op threads per run (None = ONNX Runtime default, all cores).
+            Keep threads x concurrent searches <= cores on a shared server.
+    """
+
+    def __init__(self, model_dir: Path, quantized: bool = True, threads: Optional[int] = None):
+        ort = _require("onnxruntime")
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        with (self.model_dir / ENCODER_CONFIG).open("r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        path = self.model_dir / INT8_FILE
+        if not quantized or not path.exists():
+            if quantized:
+                logger.warning(f"{path} not found, using the fp32 ONNX model")
+            path = self.model_dir / FP32_FILE
+        self.quantized = path.name == INT8_FILE
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+        self.threads = threads
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.max_seq_length = self.config.get("max_seq_length") or 512
+        self._dim = int(self.config["dim"])
+        logger.info(
+            f"ONNX encoder {path.name} ({self.config.get('model_name')}, dim={self._dim}, threads={threads or 'default'})"
+        )
+
+    @property
+    def variant(self) -> str:
+        return "int8" if self.quantized else "fp32"
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.empty((len(texts), self._dim), dtype=np.float32)
+        # longest first, like SentenceTransformer: batches pad to similar lengths
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feed = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            out[idx] = self.session.run(None, feed)[0]
+        if normalize_embeddings and len(out):
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+
+def embedding_agreement(
+    reference: BaseEncoder,
+    candidate: BaseEncoder,
+    texts: Sequence[str],
+    batch_size: int = 64,
+) -> Dict[str, float]:
+    """Cosine similarity between two encoders' embeddings of the same texts.
+
+    Returns:
+        min / p01 / mean cosine over `texts`
+    """
+    a = reference.encode(list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    b = candidate.encode(list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    cos = np.sum(np.asarray(a, dtype=np.float32) * np.asarray(b, dtype=np.float32), axis=1)
+    return {
+        "min": float(cos.min()),
+        "p01": float(np.percentile(cos, 1)),
+        "mean": float(cos.mean()),
+    }
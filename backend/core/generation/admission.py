@@ -0,0 +1,129 @@
+"""Admission control in front of the LLM stage.
+
+At most `max_concurrency` LLM calls run at once; up to `max_queue` more
+wait, each for at most `max_wait_ms`. A request that finds the queue full,
+or waits too long, is shed with Overloaded and answered without the LLM
+(see PromptBuilder.retrieval_only_answer), so a slow upstream degrades
+answers instead of piling requests up until they all time out.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+from backend.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "warehouse_llm_queue_wait_seconds", "Time spent waiting for an LLM slot (admitted and shed)",
+    labelnames=("outcome",),
+)
+LLM_SHED = REGISTRY.counter(
+    "warehouse_llm_shed_total", "Requests answered without the LLM because it was saturated",
+    labelnames=("reason",),
+)
+
+QUEUE_FULL, WAIT_TIMEOUT = "queue_full", "wait_timeout"
+
+
+class Overloaded(Exception):
+    """No LLM slot was available within the allowed wait."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"LLM saturated ({reason})")
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency limit plus a bounded FIFO queue with a maximum wait.
+
+    Lives on one event loop (the server's); not thread-safe.
+
+    Args:
+        max_concurrency: LLM calls allowed in flight
+        max_queue: Requests allowed to wait for a slot (0 = shed as soon as all slots are busy)
+        max_wait_ms: Longest a request waits before it is shed
+    """
+
+    def __init__(self, max_concurrency: int = 32, max_queue: int = 64, max_wait_ms: float = 250.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_ms = max_wait_ms
+        self.active = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self.admitted = 0
+        self.shed = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one LLM slot for the duration of the block.
+
+        Raises:
+            Overloaded: Queue full, or no slot freed up within max_wait_ms
+        """
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            LLM_QUEUE_WAIT.observe(0.0, outcome="admitted")
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed(QUEUE_FULL, 0.0)
+
+        t0 = time.perf_counter()
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait_ms / 1000)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the wait ended
+                if isinstance(e, asyncio.CancelledError):
+                    self._release()
+                    raise
+            else:
+                waiter.cancel()
+                self._remove(waiter)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self._shed(WAIT_TIMEOUT, time.perf_counter() - t0)
+        self.admitted += 1
+        LLM_QUEUE_WAIT.observe(time.perf_counter() - t0, outcome="admitted")
+
+    def _release(self) -> None:
+        # hand the slot straight to the oldest waiter, so newcomers cannot overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove(self, waiter: "asyncio.Future[None]") -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _shed(self, reason: str, waited_s: float) -> None:
+        self.shed += 1
+        LLM_SHED.inc(reason=reason)
+        LLM_QUEUE_WAIT.observe(waited_s, outcome="shed")
+        raise Overloaded(reason)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "llm_active": self.active,
+            "llm_queue_depth": len(self._waiters),
+            "llm_admitted": self.admitted,
+            "llm_shed": self.shed,
+        }
@@ -0,0 +1,113 @@
+"""LLM answer cache with in-flight request coalescing (single-flight)."""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.core.retrieval.cache import LRUTTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def answer_key(
+    normalized_query: str,
+    results: List[Dict],
+    template_version: str,
+    model: str,
+    index_version: Optional[str] = None,
+) -> Tuple:
+    """Cache key for a generated answer.
+
+    Results are identified by their ordered ids, so a change in what was
+    retrieved (or in its order) yields a different key. Ids do not cover
+    the rows' content (stock, location), so the index version is part of
+    the key too: a reload never serves answers built from the old rows.
+    """
+    ids = tuple(r.get("metadata", {}).get("id", r.get("index")) for r in results)
+    return (normalized_query, ids, template_version, model, index_version)
+
+
+class AnswerCache:
+    """Caches LLM answers and coalesces concurrent identical requests.
+
+    Only one upstream call runs per key at a time; other callers wait for
+    its result instead of issuing their own.
+    """
+
+    def __init__(self, max_size: int = 512, ttl_seconds: Optional[float] = 600.0, cache: Optional[Any] = None):
+        self.cache = cache or LRUTTLCache(max_size, ttl_seconds)
+        self._inflight: Dict[Hashable, Future] = {}
+        self._ainflight: Dict[Hashable, "asyncio.Task"] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        return self.cache.get(key)
+
+    def put(self, key: Hashable, value: str) -> None:
+        self.cache.put(key, value)
+
+    def get_or_generate(self, key: Hashable, generate: Callable[[], str]) -> str:
+        """Return the cached answer for `key` or produce it once via `generate`."""
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return fut.result()
+
+        try:
+            value = generate()
+            self.cache.put(key, value)
+            fut.set_result(value)
+            return value
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_generate(self, key: Hashable, generate: Callable[[], Awaitable[str]]) -> str:
+        """Async variant of get_or_generate.
+
+        The upstream call runs in its own task, so a cancelled caller does
+        not cancel the request for the others waiting on it.
+        """
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+
+        task = self._ainflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(generate())
+            self._ainflight[key] = task
+
+            def _done(t: "asyncio.Task", key: Hashable = key) -> None:
+                self._ainflight.pop(key, None)
+                if not t.cancelled() and t.exception() is None:
+                    self.cache.put(key, t.result())
+
+            task.add_done_callback(_done)
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "answer_hits": getattr(self.cache, "hits", 0),
+            "answer_misses": getattr(self.cache, "misses", 0),
+            "answer_coalesced": self.coalesced,
+            "answer_size": len(self.cache),
+        }
@@ -0,0 +1,175 @@
+"""Per-document LLM context strings, precomputed at index-build time.
+
+Each row gets two strings:
+    full     every non-empty field, "key: value | ..." in column order
+    compact  the most useful fields only (see rank_fields), long values clipped
+PromptBuilder joins them at request time instead of formatting metadata.
+
+On disk this is a ColumnarMetadataStore (context.cols next to index.faiss)
+with the columns "full" and "compact", so it is memory-mapped like
+metadata.cols and row ids line up with FAISS ids.
+"""
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from backend.core.retrieval.code_index import CODE_COLUMN_HINTS
+from backend.core.retrieval.metadata_store import ColumnarMetadataStore, MetadataStore
+
+logger = logging.getLogger(__name__)
+
+# descriptive columns, ranked right after codes
+NAME_COLUMN_HINTS = ("περιγραφ", "ονομ", "όνομ", "τίτλ", "name", "title", "descr", "brand", "μάρκα")
+
+FULL, COMPACT = "full", "compact"
+
+# distinct values tracked per column while ranking; enough to tell constant from varied
+_DISTINCT_CAP = 64
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast token count estimate: UTF-8 bytes / 4.
+
+    BPE tokenizers average ~4 characters per token on Latin text and ~2 on
+    Greek, which is also 2 bytes per character in UTF-8, so the byte count
+    tracks both without loading a tokenizer.
+    """
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def format_fields(fields: Iterable[Tuple[str, str]], max_value_chars: Optional[int] = None) -> str:
+    """'key: value | key: value', optionally clipping each value."""
+    parts = []
+    for key, value in fields:
+        value = str(value)
+        if max_value_chars is not None and len(value) > max_value_chars:
+            value = value[:max_value_chars - 1].rstrip() + "…"
+        parts.append(f"{key}: {value}")
+    return " | ".join(parts)
+
+
+def rank_fields(
+    entries: Iterable[Dict],
+    priority: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Order metadata columns by how useful they are in a prompt.
+
+    Order: `priority` columns as given, then code-like columns (see
+    CODE_COLUMN_HINTS), then descriptive ones (NAME_COLUMN_HINTS), then the
+    rest. Within a tier, columns filled in more rows come first and shorter
+    values break ties. Columns with a single distinct value say nothing
+    about an individual product and go last.
+    """
+    filled: Counter = Counter()
+    chars: Counter = Counter()
+    distinct: Dict[str, set] = {}
+    order: Dict[str, int] = {}
+    n = 0
+    for entry in entries:
+        n += 1
+        for key, value in (entry.get("metadata") or {}).items():
+            order.setdefault(key, len(order))
+            if value is None or value == "":
+                continue
+            value = str(value)
+            filled[key] += 1
+            chars[key] += len(value)
+            seen = distinct.setdefault(key, set())
+            if len(seen) < _DISTINCT_CAP:
+                seen.add(value)
+
+    priority = list(priority or [])
+
+    def tier(column: str) -> int:
+        if column in priority:
+            return 0
+        name = column.casefold()
+        if any(h in name for h in CODE_COLUMN_HINTS):
+            return 1
+        if any(h in name for h in NAME_COLUMN_HINTS):
+            return 2
+        return 3
+
+    def key(column: str):
+        constant = n > 1 and len(distinct.get(column, ())) <= 1
+        mean_len = chars[column] / filled[column] if filled[column] else 0.0
+        return (
+            constant,
+            tier(column),
+            priority.index(column) if column in priority else 0,
+            -filled[column],
+            mean_len,
+            order[column],
+        )
+
+    return sorted(order, key=key)
+
+
+class ContextStore:
+    """Full and compact context string per metadata row.
+
+    Args:
+        store: Columnar store with FULL and COMPACT columns, row = FAISS id
+    """
+
+    def __init__(self, store: MetadataStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get(self, idx: int) -> Tuple[str, str]:
+        """(full, compact) strings of row `idx`."""
+        row = self.store.get(idx)["metadata"]
+        full = row.get(FULL, "")
+        return full, row.get(COMPACT, full)
+
+    @classmethod
+    def build(
+        cls,
+        entries: Union[MetadataStore, Sequence[Dict]],
+        fields: Optional[Sequence[str]] = None,
+        compact_fields: int = 4,
+        max_value_chars: int = 80,
+    ) -> "ContextStore":
+        """Format every entry once.
+
+        Args:
+            entries: Metadata entries ({"id", "metadata"}), e.g. the build's
+                metadata store; read twice (ranking, then formatting)
+            fields: Columns to rank first (see rank_fields)
+            compact_fields: Non-empty fields kept in the compact string
+            max_value_chars: Values longer than this are clipped in the compact string
+        """
+        t0 = time.perf_counter()
+        ranked = rank_fields(entries, priority=fields)
+        position = {column: i for i, column in enumerate(ranked)}
+
+        def contexts():
+            for entry in entries:
+                metadata = entry.get("metadata") or {}
+                present = [(k, v) for k, v in metadata.items() if v is not None and v != ""]
+                compact = sorted(present, key=lambda kv: position.get(kv[0], len(position)))[:compact_fields]
+                yield {
+                    "id": entry.get("id"),
+                    "metadata": {FULL: format_fields(present), COMPACT: format_fields(compact, max_value_chars)},
+                }
+
+        # max_dict_size=0: every column is a plain blob, the strings are all distinct anyway
+        store = ColumnarMetadataStore.from_entries(contexts(), max_dict_size=0)
+        logger.info(
+            f"Context store: {len(store)} rows in {time.perf_counter() - t0:.2f}s "
+            f"(compact fields, most useful first: {ranked[:compact_fields]})"
+        )
+        return cls(store)
+
+    def save(self, out_dir: Path) -> Path:
+        if not isinstance(self.store, ColumnarMetadataStore):
+            raise TypeError("Only columnar context stores can be saved")
+        return self.store.save(out_dir)
+
+    @classmethod
+    def load(cls, store_dir: Path, use_mmap: bool = True) -> "ContextStore":
+        return cls(ColumnarMetadataStore.load(store_dir, use_mmap=use_mmap))
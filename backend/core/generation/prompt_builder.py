@@ -1,19 +1,54 @@
 """Build prompts for LLM from search results.
 
-Note: The number of context items is not controlled here.
+Note: The number of results is not controlled here.
 Pass in the already-trimmed results list (e.g., length == top_k).
+With a token budget, items beyond the budget are left out of the context.
 """
-from typing import List, Dict
+import logging
+from typing import List, Dict, Optional, Tuple
+
+from backend.core.generation.context_store import ContextStore, estimate_tokens, format_fields
+
+logger = logging.getLogger(__name__)
 
 
 class PromptBuilder:
-    """Constructs prompts for LLM queries."""
+    """Constructs prompts for LLM queries.
+
+    Args:
+        system_prompt: System message sent with every prompt
+        contexts: Precomputed per-row context strings of the loaded index
+            (rows missing from it are formatted from their metadata)
+        token_budget: Estimated tokens allowed for the context (None = no
+            limit, every item in full)
+        full_items: With a budget, how many top-ranked items are kept in
+            full; the rest get their compact string
+    """
+
+    # Bump whenever the prompt wording/format changes (invalidates cached answers)
+    # 2: precomputed context strings, token-budgeted context
+    template_version = "2"
     
     def __init__(
         self,
         system_prompt: str = "Είσαι ένας έξυπνος βοηθός αποθήκης και πρέπει να βοηθήσεις τον εργαζόμενο να εντοπίσει ή να βρει πληροφορίες για αυτό που ψάχνει.",
+        contexts: Optional[ContextStore] = None,
+        token_budget: Optional[int] = None,
+        full_items: int = 3,
     ):
         self.system_prompt = system_prompt
+        self.contexts = contexts
+        self.token_budget = token_budget
+        self.full_items = full_items
+
+    def item_context(self, result: Dict) -> Tuple[str, str]:
+        """(full, compact) context strings of one result."""
+        idx = result.get("index")
+        if self.contexts is not None and idx is not None and 0 <= idx < len(self.contexts):
+            return self.contexts.get(idx)
+        metadata = result.get('metadata', {}).get('metadata', {})
+        full = format_fields((key, value) for key, value in metadata.items() if value)
+        return full, full
     
     def build_context(self, results: List[Dict]) -> str:
         """Extract and format context from search results.
@@ -24,22 +59,40 @@ class PromptBuilder:
         Returns:
             Formatted context string
         """
-        context_items = []
-        
-        for i, result in enumerate(results, 1):
-            metadata = result.get('metadata', {}).get('metadata', {})
-            
-            # Format each field
-            fields = []
-            for key, value in metadata.items():
-                if value:  # Skip empty values
-                    fields.append(f"{key}: {value}")
-            
-            item_text = " | ".join(fields)
-            context_items.append(f"{i}. {item_text}")
-        
-        print(f"Built context: {context_items}")
+        if self.token_budget is None:
+            context_items = [f"{i}. {self.item_context(result)[0]}" for i, result in enumerate(results, 1)]
+        else:
+            context_items = self._budgeted_items(results, self.token_budget)
+
+        logger.debug("Built context: %s", context_items)
         return "\n".join(context_items)
+
+    def _budgeted_items(self, results: List[Dict], budget: int) -> List[str]:
+        """Top items in full, the tail compact, stopping at `budget` estimated tokens.
+
+        An item that does not fit in full falls back to its compact string;
+        the first item is always included (clipped if even that is too long).
+        """
+        context_items: List[str] = []
+        used = 0
+        for i, result in enumerate(results, 1):
+            full, compact = self.item_context(result)
+            candidates = (full, compact) if i <= self.full_items else (compact,)
+            for text in candidates:
+                item = f"{i}. {text}"
+                # +1 for the newline joining the items
+                cost = estimate_tokens(item) + 1
+                if used + cost <= budget:
+                    break
+            else:
+                if not context_items:
+                    # ~4 bytes per token; Greek is 2 bytes per char, so chars = 2 * tokens stays within budget
+                    context_items.append(item[:max(2 * budget, 1)])
+                logger.debug(f"Context budget {budget} reached: {len(results) - i + 1} of {len(results)} items left out")
+                break
+            context_items.append(item)
+            used += cost
+        return context_items
     
     def build_prompt(self, query: str, results: List[Dict]) -> str:
         """Build complete prompt for LLM.
@@ -69,4 +122,15 @@ class PromptBuilder:
 - Αν χρειάζεται, πρότεινε εναλλακτικές
 - Μην εφευρίσκεις πληροφορίες που δεν υπάρχουν στο context"""
 
-        return prompt
\ No newline at end of file
+        return prompt
+
+    def retrieval_only_answer(self, query: str, results: List[Dict]) -> str:
+        """Deterministic answer without the LLM, listing the retrieved products.
+
+        Used when the LLM is saturated (see admission.AdmissionController).
+        Items use their compact context strings, so the text stays short.
+        """
+        if not results:
+            return f'Δεν βρέθηκαν σχετικά προϊόντα για την αναζήτηση: "{query}".'
+        items = [f"{i}. {self.item_context(result)[1]}" for i, result in enumerate(results, 1)]
+        return f'Σχετικά προϊόντα για την αναζήτηση "{query}":\n' + "\n".join(items)
@@ -0,0 +1,258 @@
+"""Versioned index directories for zero-downtime reloads.
+
+Layout under INDEX_VERSIONS_DIR:
+    CURRENT                 name of the active version (replaced atomically)
+    20260101-120000/        one complete build per version
+        version.json        version, created, dim, ntotal, metadata_rows, sha256 per file
+        index.faiss, metadata.jsonl, embeddings.npy, search_params.json,
+        metadata.cols/, lexical.bm25/, context.cols/
+A version directory is written under a temporary name and renamed into
+place, so a server never sees a half-copied build.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import faiss  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+VERSION_MANIFEST = "version.json"
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "index.faiss"
+METADATA_FILE = "metadata.jsonl"
+# build outputs the server reads; anything missing is skipped
+SERVING_FILES = (
+    INDEX_FILE, METADATA_FILE, "embeddings.npy", "search_params.json", "metadata.cols", "lexical.bm25",
+    "context.cols",
+)
+
+
+class IndexValidationError(ValueError):
+    """A version is incomplete or does not match the serving model."""
+
+
+def _sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_checksums(version_dir: Path) -> Dict[str, str]:
+    """sha256 of every file in a version directory (relative posix path -> hex)."""
+    version_dir = Path(version_dir)
+    return {
+        p.relative_to(version_dir).as_posix(): _sha256(p)
+        for p in sorted(version_dir.rglob("*"))
+        if p.is_file() and p.name != VERSION_MANIFEST
+    }
+
+
+def _count_lines(path: Path) -> int:
+    with path.open("rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def read_manifest(version_dir: Path) -> Optional[Dict]:
+    p = Path(version_dir) / VERSION_MANIFEST
+    if not p.exists():
+        return None
+    with p.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def current_version(root: Path) -> Optional[str]:
+    """Name of the active version, or None when nothing was published yet."""
+    p = Path(root) / CURRENT_FILE
+    if not p.exists():
+        return None
+    return p.read_text(encoding="utf-8").strip() or None
+
+
+def check_version_name(version: str) -> str:
+    """Reject version names that are not a single directory under the versions root.
+
+    Raises:
+        ValueError: Empty, ".", "..", or containing a path separator (e.g. "../x")
+    """
+    if not version or version in (".", "..") or Path(version).name != version:
+        raise ValueError(f"Invalid index version name: {version!r}")
+    return version
+
+
+def set_current(root: Path, version: str) -> None:
+    """Point CURRENT at `version` (atomic replace, watchers see old or new)."""
+    root = Path(root)
+    check_version_name(version)
+    if not (root / version / VERSION_MANIFEST).exists():
+        raise FileNotFoundError(f"Unknown index version: {root / version}")
+    fd, tmp = tempfile.mkstemp(prefix=CURRENT_FILE + ".", dir=root)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp, root / CURRENT_FILE)
+
+
+def version_paths(root: Path, version: str) -> Tuple[Path, Path]:
+    """(index.faiss, metadata.jsonl) of a version."""
+    version_dir = Path(root) / check_version_name(version)
+    return version_dir / INDEX_FILE, version_dir / METADATA_FILE
+
+
+def list_versions(root: Path) -> List[str]:
+    """Published versions, oldest first."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / VERSION_MANIFEST).exists())
+
+
+def publish_version(
+    build_dir: Path,
+    root: Path,
+    version: Optional[str] = None,
+    activate: bool = True,
+    keep: int = 3,
+) -> Path:
+    """Copy a finished build into a new version directory and (optionally) activate it.
+
+    Args:
+        build_dir: Build output (index.faiss, metadata.jsonl, ...)
+        root: INDEX_VERSIONS_DIR
+        version: Version name (default: UTC timestamp)
+        activate: Point CURRENT at the new version
+        keep: Versions kept on disk (older inactive ones are deleted; 0 keeps all)
+
+    Returns:
+        The new version directory
+    """
+    build_dir, root = Path(build_dir), Path(root)
+    version = version or time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    target = root / version
+    if target.exists():
+        raise FileExistsError(f"Index version already exists: {target}")
+    root.mkdir(parents=True, exist_ok=True)
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="." + version + ".", dir=root))
+    try:
+        for name in SERVING_FILES:
+            src = build_dir / name
+            if src.is_dir():
+                shutil.copytree(src, tmp_dir / name)
+            elif src.exists():
+                shutil.copy2(src, tmp_dir / name)
+        for name in (INDEX_FILE, METADATA_FILE):
+            if not (tmp_dir / name).exists():
+                raise FileNotFoundError(f"{build_dir / name} missing, nothing to publish")
+
+        index = faiss.read_index(str(tmp_dir / INDEX_FILE), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        manifest = {
+            "version": version,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "dim": index.d,
+            "ntotal": index.ntotal,
+            "metadata_rows": _count_lines(tmp_dir / METADATA_FILE),
+            "files": file_checksums(tmp_dir),
+        }
+        del index
+        with (tmp_dir / VERSION_MANIFEST).open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    logger.info(f"Published index version {version} ({manifest['ntotal']} vectors) to {target}")
+    if activate:
+        set_current(root, version)
+    if keep > 0:
+        prune_versions(root, keep)
+    return target
+
+
+def prune_versions(root: Path, keep: int) -> List[str]:
+    """Delete the oldest versions beyond `keep`, never the active one."""
+    active = current_version(root)
+    removed = []
+    for name in list_versions(root)[:-keep]:
+        if name != active:
+            shutil.rmtree(Path(root) / name, ignore_errors=True)
+            removed.append(name)
+    return removed
+
+
+def verify_checksums(version_dir: Path) -> None:
+    """Compare files on disk with the manifest (no-op for unversioned builds).
+
+    Raises:
+        IndexValidationError: A listed file is missing or differs
+    """
+    manifest = read_manifest(version_dir)
+    if manifest is None:
+        return
+    for name, expected in manifest.get("files", {}).items():
+        p = Path(version_dir) / name
+        if not p.exists():
+            raise IndexValidationError(f"{p} missing")
+        if _sha256(p) != expected:
+            raise IndexValidationError(f"Checksum mismatch for {p}")
+
+
+def max_row_id(index: faiss.Index) -> int:
+    """Largest FAISS id (= metadata row) in `index`, -1 if empty.
+
+    Indexes without explicit ids number their vectors 0..ntotal-1; ID-mapped
+    and IVF indexes keep the ids they were given (incremental builds leave
+    gaps where rows were deleted).
+    """
+    if index.ntotal == 0:
+        return -1
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return int(faiss.vector_to_array(index.id_map).max())
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return index.ntotal - 1
+    invlists, largest = ivf.invlists, -1
+    for list_no in range(ivf.nlist):
+        size = invlists.list_size(list_no)
+        if size:
+            largest = max(largest, int(faiss.rev_swig_ptr(invlists.get_ids(list_no), size).max()))
+    return largest
+
+
+def validate_loaded(
+    version_dir: Path,
+    index: faiss.Index,
+    metadata_rows: int,
+    model_dim: Optional[int],
+) -> None:
+    """Check a loaded index against the serving model, its metadata and its manifest.
+
+    Every FAISS id must address a metadata row. Incremental builds keep
+    tombstone rows for deleted docs, so the metadata may have more rows
+    than the index has vectors.
+
+    Raises:
+        IndexValidationError: Dimension or count mismatch
+    """
+    if model_dim is not None and index.d != model_dim:
+        raise IndexValidationError(f"Index dimension {index.d} != model dimension {model_dim}")
+    largest = max_row_id(index)
+    if index.ntotal > metadata_rows or largest >= metadata_rows:
+        raise IndexValidationError(
+            f"Index has {index.ntotal} vectors (largest id {largest}) but metadata has {metadata_rows} rows"
+        )
+    manifest = read_manifest(version_dir)
+    if manifest is not None and (manifest.get("dim"), manifest.get("ntotal")) != (index.d, index.ntotal):
+        raise IndexValidationError(
+            f"Manifest says dim={manifest.get('dim')} ntotal={manifest.get('ntotal')}, "
+            f"loaded dim={index.d} ntotal={index.ntotal}"
+        )
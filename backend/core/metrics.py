@@ -0,0 +1,244 @@
+"""Per-stage latency timers and Prometheus text-format metrics.
+
+Stages of one request are recorded into a StageTimings object carried in
+a context variable: the HTTP middleware creates it, QueryPipeline fills it
+(`with stage("embed"): ...`) and the middleware reports it in the
+Server-Timing response header. Every stage duration is also observed in
+the process-wide `warehouse_stage_seconds` histogram served on /metrics.
+
+No client library is needed: the registry renders the text exposition
+format (version 0.0.4) itself.
+"""
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# seconds; covers sub-millisecond cache hits up to slow LLM completions
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def total(self) -> float:
+        """Sum over all label values."""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}" for key, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        # first bucket with upper bound >= value; counts are made cumulative on render
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                slot = i
+                break
+        with self._lock:
+            counts, total = self._values.get(key) or self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[slot] += 1
+            total[0] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, key + (_fmt(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of this process, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets)
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, Dict[str, float]]]] = None) -> str:
+        """Text exposition of all metrics plus point-in-time gauges.
+
+        Args:
+            gauges: {name: (help, {label value or "": value})}; the label
+                (if any) is rendered as `name{kind="..."}`
+        """
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for name, (help, values) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            for label, value in values.items():
+                suffix = _labels(("kind",), (label,)) if label else ""
+                lines.append(f"{name}{suffix} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "warehouse_stage_seconds", "Time spent per query pipeline stage", labelnames=("stage",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "warehouse_request_seconds", "HTTP request latency until the response starts", labelnames=("path", "status")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "warehouse_llm_tokens_total", "LLM tokens reported by the provider", labelnames=("kind",)
+)
+LLM_CALLS = REGISTRY.counter(
+    "warehouse_llm_calls_total", "LLM calls by mode and outcome", labelnames=("mode", "outcome")
+)
+
+
+class StageTimings:
+    """Stage -> seconds of one request (repeated stages add up)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def breakdown(self) -> Dict[str, float]:
+        """Stage -> milliseconds, plus the elapsed `total`."""
+        with self._lock:
+            out = {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+        out["total"] = round(self.elapsed() * 1000, 2)
+        return out
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in ms)."""
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.breakdown().items())
+
+
+_current: contextvars.ContextVar[Optional[StageTimings]] = contextvars.ContextVar("stage_timings", default=None)
+
+
+def start_request() -> Tuple[StageTimings, contextvars.Token]:
+    """Begin collecting stage timings for the current request context."""
+    timings = StageTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current_timings() -> Optional[StageTimings]:
+    return _current.get()
+
+
+def record(name: str, seconds: float) -> None:
+    """Observe a stage duration (histogram + current request, if any)."""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as pipeline stage `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
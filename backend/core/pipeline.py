@@ -1,17 +1,65 @@
 """Query processing pipeline orchestration."""
-from typing import List, Dict, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, List, Dict, NamedTuple, Optional, Tuple
+import asyncio
+import contextvars
+import functools
 import logging
+import os
+import time
+
+import numpy as np
+
 from backend import app_settings
 
 from backend.core.retrieval.query_processor import QueryProcessor
 from backend.core.retrieval.vector_search import VectorSearchEngine
+from backend.core.retrieval.query_batcher import QueryBatcher
+from backend.core.retrieval.cache import RetrievalCache
+from backend.core.retrieval.attribute_index import AttributeIndex, FilterSpec
+from backend.core.retrieval.code_index import CodeIndex
+from backend.core.retrieval.fusion import reciprocal_rank_fusion
+from backend.core.retrieval.lexical_index import BM25Index
 from backend.core.retrieval.result_formatter import ResultFormatter
 from backend.core.generation.prompt_builder import PromptBuilder
+from backend.core.generation.answer_cache import AnswerCache, answer_key
+from backend.core.generation.admission import AdmissionController, Overloaded
+from backend.core.metrics import record, stage
 from backend.clients.base_llm_client import BaseLLMClient
 
 logger = logging.getLogger(__name__)
 
 
+class LLMAnswer(NamedTuple):
+    """Answer text; `degraded` when it was built from the results without the LLM (saturated)."""
+    text: str
+    degraded: bool = False
+
+
+def _in_context(fn: Callable, *args) -> Callable[[], Any]:
+    """Bind fn(*args) to a copy of the caller's context.
+
+    Executor threads do not inherit context variables; this carries the
+    request's stage timings into the thread that does the work.
+    """
+    return functools.partial(contextvars.copy_context().run, fn, *args)
+
+
+def make_search_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """Create the bounded executor used for CPU-bound embed/search work.
+
+    Kept separate from Starlette's default threadpool so slow requests
+    elsewhere never starve retrieval (and vice versa).
+
+    Args:
+        max_workers: Worker threads (defaults to SEARCH_WORKERS or CPU count)
+    """
+    if max_workers is None:
+        max_workers = getattr(app_settings, "SEARCH_WORKERS", None) or os.cpu_count() or 4
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+
+
 class QueryPipeline:
     """Orchestrates the complete query pipeline."""
     
@@ -21,68 +69,557 @@ class QueryPipeline:
         search_engine: VectorSearchEngine,
         result_formatter: ResultFormatter,
         prompt_builder: Optional[PromptBuilder] = None,
-        llm_client: Optional[BaseLLMClient] = None
+        llm_client: Optional[BaseLLMClient] = None,
+        executor: Optional[Executor] = None,
+        batcher: Optional[QueryBatcher] = None,
+        cache: Optional[RetrievalCache] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        code_index: Optional[CodeIndex] = None,
+        lexical_index: Optional[BM25Index] = None,
+        hybrid_candidates: int = 50,
+        rrf_k: int = 60,
+        lexical_executor: Optional[Executor] = None,
+        attribute_index: Optional[AttributeIndex] = None,
+        admission: Optional[AdmissionController] = None,
+        index_version: Optional[str] = None,
     ):
         self.query_processor = query_processor
         self.search_engine = search_engine
         self.result_formatter = result_formatter
         self.prompt_builder = prompt_builder
         self.llm_client = llm_client
+        self.executor = executor
+        self.batcher = batcher
+        self.cache = cache
+        self.answer_cache = answer_cache
+        self.code_index = code_index
+        self.searches = 0
+        # hybrid retrieval: BM25 runs beside FAISS on its own threads, results fused by RRF
+        self.lexical_index = lexical_index
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        self.lexical_executor = lexical_executor
+        if lexical_index is not None and lexical_executor is None:
+            self.lexical_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 4, thread_name_prefix="lexical"
+            )
+        self.attribute_index = attribute_index
+        self.admission = admission
+        # part of answer cache keys; the cache is shared across versions
+        self.index_version = index_version
+
+    def resolve_filters(self, filters: Optional[FilterSpec]) -> Optional[np.ndarray]:
+        """Row ids matching the attribute filters (None = no filtering).
+
+        Raises:
+            ValueError: Unknown attribute, or filters given without an attribute index
+        """
+        if not filters:
+            return None
+        if self.attribute_index is None:
+            raise ValueError("Attribute filters are not enabled on this server")
+        return self.attribute_index.resolve(filters)
+
+    def _code_results(self, query: str, top_k: int, allowed: Optional[np.ndarray] = None) -> Optional[List[Dict]]:
+        """Exact-code fast path: answers code-shaped queries without the model or FAISS.
+
+        Returns None for free-text queries, unknown codes and codes whose
+        rows are all excluded by `allowed` (vector search fallback).
+        """
+        self.searches += 1
+        if self.code_index is None:
+            return None
+        with stage("code_lookup"):
+            code = self.query_processor.code_candidate(query)
+            if code is None:
+                return None
+            rows = self.code_index.lookup(code)
+            if rows and allowed is not None:
+                rows = [r for r, ok in zip(rows, np.isin(rows, allowed)) if ok]
+        if not rows:
+            return None
+        logger.info(f"Code fast path: '{code}' -> {len(rows)} rows")
+        rows = rows[:top_k]
+        return self._format([0.0] * len(rows), rows, score_kind="code")
+
+    def _process(self, query: str) -> str:
+        with stage("process"):
+            return self.query_processor.process(query)
+
+    def _format(self, distances: List[float], indices: List[int], score_kind: Optional[str] = None) -> List[Dict]:
+        with stage("format"):
+            return self.result_formatter.format_results(
+                distances, indices, score_kind=score_kind or self.score_kind
+            )
+
+    @property
+    def score_kind(self) -> str:
+        """What retrieval scores mean: RRF scores with BM25 fusion, else inner products of unit vectors."""
+        return "rrf" if self.lexical_index is not None else "cosine"
+
+    def _cached_results(self, processed_query: str, top_k: int) -> Optional[Tuple[List[float], List[int]]]:
+        if self.cache is None:
+            return None
+        with stage("cache"):
+            self.cache.bind(self.search_engine.index)
+            return self.cache.get_results(processed_query, top_k)
+
+    def _store_results(self, processed_query: str, top_k: int, distances: List[float], indices: List[int]) -> None:
+        if self.cache is not None:
+            self.cache.put_results(processed_query, top_k, distances, indices)
+
+    def _embed(self, processed_query: str):
+        vector = self.cache.get_embedding(processed_query) if self.cache is not None else None
+        if vector is None:
+            vector = self.search_engine.embed_query(processed_query)
+            if self.cache is not None:
+                self.cache.put_embedding(processed_query, vector)
+        return vector
+
+    def _candidates(self, top_k: int) -> int:
+        """Depth retrieved per retriever before fusion."""
+        return max(top_k, self.hybrid_candidates) if self.lexical_index is not None else top_k
+
+    def _fuse(self, dense_ids: List[int], lexical_ids: List[int], top_k: int) -> Tuple[List[float], List[int]]:
+        # fused results carry RRF scores in place of FAISS distances
+        with stage("fusion"):
+            return reciprocal_rank_fusion([dense_ids, lexical_ids], top_k, k=self.rrf_k)
+
+    def _lexical_search(self, processed_query: str, top_k: int, allowed: Optional[np.ndarray] = None):
+        with stage("bm25"):
+            return self.lexical_index.search(processed_query, top_k, allowed)
+
+    def _submit_lexical(self, processed_query: str, top_k: int, allowed: Optional[np.ndarray] = None):
+        """Run BM25 on the lexical executor, next to the dense search."""
+        return self.lexical_executor.submit(_in_context(self._lexical_search, processed_query, top_k, allowed))
+
+    def _dense_search(self, processed_query: str, top_k: int) -> Tuple[List[float], List[int]]:
+        if self.batcher is not None:
+            # queueing + the shared batch's encode and search
+            with stage("batch_wait"):
+                return self.batcher.search(processed_query, top_k)
+        query_vector = self._embed(processed_query)
+        return self.search_engine.search(query_vector, top_k=top_k)
+
+    def _embed_and_search(self, processed_query: str, top_k: int) -> Tuple[List[float], List[int]]:
+        if self.lexical_index is None:
+            distances, indices = self._dense_search(processed_query, top_k)
+        else:
+            n = self._candidates(top_k)
+            lexical = self._submit_lexical(processed_query, n)
+            _, dense_ids = self._dense_search(processed_query, n)
+            _, lexical_ids = lexical.result()
+            distances, indices = self._fuse(dense_ids, lexical_ids, top_k)
+        self._store_results(processed_query, top_k, distances, indices)
+        return distances, indices
+
+    def _filtered_search(self, processed_query: str, top_k: int, allowed: np.ndarray) -> Tuple[List[float], List[int]]:
+        """Filtered variant of _embed_and_search: the id set is pushed into FAISS and BM25.
+
+        Bypasses the batcher and the result cache (both are keyed by query only).
+        """
+        if not len(allowed):
+            return [], []
+        if self.lexical_index is None:
+            return self.search_engine.search(self._embed(processed_query), top_k=top_k, allowed=allowed)
+        n = self._candidates(top_k)
+        lexical = self._submit_lexical(processed_query, n, allowed)
+        _, dense_ids = self.search_engine.search(self._embed(processed_query), top_k=n, allowed=allowed)
+        _, lexical_ids = lexical.result()
+        return self._fuse(dense_ids, lexical_ids, top_k)
+
+    def _answer_key(self, query: str, results: List[Dict]) -> Tuple:
+        model = getattr(self.llm_client, "model", type(self.llm_client).__name__)
+        return answer_key(
+            self.query_processor.process(query),
+            results,
+            self.prompt_builder.template_version,
+            model,
+            self.index_version,
+        )
     
-    def search(self, query: str, top_k: int) -> List[Dict]:
+    def search(self, query: str, top_k: int, filters: Optional[FilterSpec] = None) -> List[Dict]:
         """Execute search and return structured results.
         
         Args:
             query: User query
             top_k: Number of results (resolved at API layer)
+            filters: Optional attribute filters ({attribute: value(s)})
             
         Returns:
             List of search results
         """
         logger.info(f"Processing search query: {query}")
+        allowed = self.resolve_filters(filters)
+
+        # Exact product codes skip embedding and FAISS
+        fast = self._code_results(query, top_k, allowed)
+        if fast is not None:
+            return fast
         
         # Process query
-        processed_query = self.query_processor.process(query)
+        processed_query = self._process(query)
         
-        # Embed and search
-        query_vector = self.search_engine.embed_query(processed_query)
-        distances, indices = self.search_engine.search(query_vector, top_k=top_k)
+        # Embed and search (served from cache when possible)
+        cached = self._cached_results(processed_query, top_k) if allowed is None else None
+        if allowed is not None:
+            distances, indices = self._filtered_search(processed_query, top_k, allowed)
+        elif cached is not None:
+            distances, indices = cached
+        else:
+            distances, indices = self._embed_and_search(processed_query, top_k)
         
         # Format results
-        results = self.result_formatter.format_results(distances, indices)
+        results = self._format(distances, indices)
         
         logger.info(f"Found {len(results)} results")
         return results
     
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        batch_size: int = 64,
+        filters: Optional[FilterSpec] = None,
+    ) -> List[List[Dict]]:
+        """Search many queries with one encode call and one FAISS search.
+
+        Cached queries are served from the retrieval cache; the remaining
+        (deduplicated) ones are embedded together and searched as a single
+        matrix.
+
+        Args:
+            queries: User queries
+            top_k: Number of results per query (resolved at API layer)
+            batch_size: Forward-pass batch size for encoding
+            filters: Optional attribute filters applied to every query
+
+        Returns:
+            One list of search results per query, in input order
+        """
+        logger.info(f"Processing batch of {len(queries)} queries")
+        allowed = self.resolve_filters(filters)
+
+        processed = [self._process(q) for q in queries]
+        distances: List[Optional[List[float]]] = [None] * len(processed)
+        indices: List[Optional[List[int]]] = [None] * len(processed)
+        fast: List[Optional[List[Dict]]] = [self._code_results(q, top_k, allowed) for q in queries]
+
+        misses: List[int] = []
+        for i, processed_query in enumerate(processed):
+            if fast[i] is not None:
+                continue
+            cached = self._cached_results(processed_query, top_k) if allowed is None else None
+            if cached is not None:
+                distances[i], indices[i] = cached
+            else:
+                misses.append(i)
+
+        if misses:
+            unique = list(dict.fromkeys(processed[i] for i in misses))
+            n = self._candidates(top_k)
+            lexical = None
+            if self.lexical_index is not None:
+                lexical = [self._submit_lexical(q, n, allowed) for q in unique]
+            vectors = self.search_engine.embed_queries(unique, batch_size=batch_size)
+            batch_distances, batch_indices = self.search_engine.search_batch(vectors, top_k=n, allowed=allowed)
+            if lexical is not None:
+                fused = [self._fuse(dense_ids, fut.result()[1], top_k) for dense_ids, fut in zip(batch_indices, lexical)]
+                batch_distances = [d for d, _ in fused]
+                batch_indices = [i for _, i in fused]
+            by_query = {}
+            for processed_query, dist_row, idx_row in zip(unique, batch_distances, batch_indices):
+                if allowed is None:
+                    self._store_results(processed_query, top_k, dist_row, idx_row)
+                by_query[processed_query] = (dist_row, idx_row)
+            for i in misses:
+                distances[i], indices[i] = by_query[processed[i]]
+
+        return [
+            fast[i] if fast[i] is not None else self._format(distances[i], indices[i])
+            for i in range(len(queries))
+        ]
+
+    async def asearch_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        filters: Optional[FilterSpec] = None,
+    ) -> List[List[Dict]]:
+        """Async variant of search_many (runs on the pipeline executor)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _in_context(lambda: self.search_many(queries, top_k, filters=filters))
+        )
+
+    def close(self) -> None:
+        """Stop the threads this pipeline owns (batcher, BM25 executor).
+
+        The shared search executor is left to its owner.
+        """
+        if self.batcher is not None:
+            self.batcher.close()
+        if self.lexical_executor is not None:
+            self.lexical_executor.shutdown(wait=False)
+
+    def warmup(self, queries: List[str], top_k: int = 5) -> None:
+        """Run dummy queries through every stage before serving traffic.
+
+        Pays the first-call costs (allocator growth, BLAS/ONNX kernel
+        selection, page faults on mmapped files) up front. Calls the model,
+        FAISS and BM25 directly so caches, counters and metrics stay clean.
+        """
+        if not queries:
+            return
+        processed = [self.query_processor.process(q) for q in queries]
+        model, index = self.search_engine.model, self.search_engine.index
+        # single queries and one batch: the batch path pads and multiplies differently
+        vectors = [model.encode(q, convert_to_numpy=True, normalize_embeddings=True) for q in processed]
+        model.encode(processed, batch_size=len(processed), convert_to_numpy=True, normalize_embeddings=True)
+        matrix = np.ascontiguousarray(vectors, dtype="float32")
+        index.search(matrix, top_k)
+        for query, processed_query, vector in zip(queries, processed, matrix):
+            distances, ids = index.search(vector.reshape(1, -1), top_k)
+            valid = ids[0] >= 0
+            results = self.result_formatter.format_results(
+                distances[0][valid].tolist(), ids[0][valid].tolist(), score_kind="cosine"
+            )
+            if self.lexical_index is not None:
+                self.lexical_index.search(processed_query, self._candidates(top_k))
+            if self.prompt_builder is not None:
+                self.prompt_builder.build_prompt(query, results)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of the retrieval fast paths (code index, caches)."""
+        stats: Dict[str, Any] = {"searches": self.searches}
+        if self.code_index is not None:
+            stats.update(self.code_index.stats())
+            stats["fast_path_ratio"] = round(self.code_index.hits / self.searches, 4) if self.searches else 0.0
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        if self.answer_cache is not None:
+            stats.update(self.answer_cache.stats())
+        if self.admission is not None:
+            stats.update(self.admission.stats())
+        return stats
+
+    def _llm_slot(self) -> AsyncContextManager:
+        """Admission to the LLM stage (no limit without an admission controller)."""
+        return self.admission.slot() if self.admission is not None else nullcontext()
+
+    def _degraded(self, query: str, results: List[Dict], error: Overloaded) -> LLMAnswer:
+        logger.info(f"LLM saturated ({error.reason}), answering from retrieval only: {query}")
+        return LLMAnswer(self.prompt_builder.retrieval_only_answer(query, results), degraded=True)
+
+    async def agenerate_many(
+        self,
+        queries: List[str],
+        results: List[List[Dict]],
+        max_concurrency: int = 8,
+    ) -> List[LLMAnswer]:
+        """Generate answers for already-retrieved batches with bounded parallelism.
+
+        Args:
+            queries: User queries
+            results: Search results per query (as returned by search_many)
+            max_concurrency: Maximum number of LLM calls in flight
+
+        Returns:
+            One answer per query, in input order (degraded ones when the LLM is saturated)
+        """
+        if not self.llm_client or not self.prompt_builder:
+            raise ValueError("LLM client and prompt builder required for NL generation")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def one(query: str, query_results: List[Dict]) -> LLMAnswer:
+            async with semaphore:
+                return await self._agenerate_answer(query, query_results)
+
+        return await asyncio.gather(*(one(q, r) for q, r in zip(queries, results)))
+
     def search_with_llm(
         self,
         query: str,
         top_k: int,
-    ) -> Dict:
-        """Execute search and generate natural language response.
-        
+        filters: Optional[FilterSpec] = None,
+    ) -> str:
+        """Execute search and generate natural language response (sync).
+
+        Identical answers are generated once through the answer cache. The
+        admission controller is async-only, so this path is not admission
+        controlled; the API routes use asearch_with_llm.
+
         Args:
             query: User query
             top_k: Number of results for context (resolved at API layer)
-            
+            filters: Optional attribute filters ({attribute: value(s)})
+
         Returns:
-            Dict with results and natural_language_response
+            Answer text (the `text` of asearch_with_llm's LLMAnswer)
         """
         if not self.llm_client or not self.prompt_builder:
             raise ValueError("LLM client and prompt builder required for NL generation")
-        
+
         logger.info(f"Processing query with LLM: {query}")
-        
+
         # Get search results
-        results = self.search(query, top_k=top_k)
-        
-        # Build prompt and generate response
-        prompt = self.prompt_builder.build_prompt(query, results)
-        system_prompt = self.prompt_builder.system_prompt
-        
-        nl_response = self.llm_client.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-        )
-        
-        return nl_response
\ No newline at end of file
+        results = self.search(query, top_k=top_k, filters=filters)
+
+        # Build prompt and generate response (skipped on answer-cache hits)
+        def generate() -> str:
+            with stage("prompt"):
+                prompt = self.prompt_builder.build_prompt(query, results)
+            with stage("llm"):
+                return self.llm_client.generate(prompt=prompt, system_prompt=self.prompt_builder.system_prompt)
+
+        if self.answer_cache is not None:
+            return self.answer_cache.get_or_generate(self._answer_key(query, results), generate)
+        return generate()
+
+    async def asearch(self, query: str, top_k: int, filters: Optional[FilterSpec] = None) -> List[Dict]:
+        """Async variant of search.
+
+        Embedding and FAISS search are CPU-bound, so they run on the
+        pipeline executor instead of the event loop. With a batcher the
+        request just awaits its slot in the next batch; cache hits are
+        answered inline. Filtered searches skip both and run on the executor.
+        """
+        logger.info(f"Processing search query: {query}")
+        allowed = self.resolve_filters(filters)
+        fast = self._code_results(query, top_k, allowed)
+        if fast is not None:
+            return fast
+
+        processed_query = self._process(query)
+
+        cached = self._cached_results(processed_query, top_k) if allowed is None else None
+        if allowed is not None:
+            loop = asyncio.get_running_loop()
+            distances, indices = await loop.run_in_executor(
+                self.executor, _in_context(self._filtered_search, processed_query, top_k, allowed)
+            )
+        elif cached is not None:
+            distances, indices = cached
+        elif self.batcher is not None:
+            n = self._candidates(top_k)
+            with stage("batch_wait"):
+                dense = asyncio.wrap_future(self.batcher.submit(processed_query, n))
+                if self.lexical_index is not None:
+                    lexical = asyncio.wrap_future(self._submit_lexical(processed_query, n))
+                    (_, dense_ids), (_, lexical_ids) = await asyncio.gather(dense, lexical)
+                else:
+                    distances, indices = await dense
+            if self.lexical_index is not None:
+                distances, indices = self._fuse(dense_ids, lexical_ids, top_k)
+            self._store_results(processed_query, top_k, distances, indices)
+        else:
+            loop = asyncio.get_running_loop()
+            distances, indices = await loop.run_in_executor(
+                self.executor, _in_context(self._embed_and_search, processed_query, top_k)
+            )
+
+        results = self._format(distances, indices)
+        logger.info(f"Found {len(results)} results")
+        return results
+
+    async def asearch_with_llm(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[FilterSpec] = None,
+    ) -> LLMAnswer:
+        """Execute search and generate a natural language answer.
+
+        Only retrieval occupies an executor thread; the LLM call is awaited
+        on the event loop so slow completions do not hold worker threads.
+        Identical answers are generated once (answer cache single-flight).
+        When the admission controller sheds the call, the answer is the
+        retrieval-only text, flagged as degraded.
+
+        Args:
+            query: User query
+            top_k: Number of results for context (resolved at API layer)
+            filters: Optional attribute filters ({attribute: value(s)})
+
+        Returns:
+            LLMAnswer with the answer text and whether it is degraded
+        """
+        if not self.llm_client or not self.prompt_builder:
+            raise ValueError("LLM client and prompt builder required for NL generation")
+
+        logger.info(f"Processing query with LLM: {query}")
+
+        results = await self.asearch(query, top_k=top_k, filters=filters)
+        return await self._agenerate_answer(query, results)
+
+    async def _agenerate_answer(self, query: str, results: List[Dict]) -> LLMAnswer:
+        async def generate() -> str:
+            # cache hits never reach here, so they are not limited
+            async with self._llm_slot():
+                with stage("prompt"):
+                    prompt = self.prompt_builder.build_prompt(query, results)
+                with stage("llm"):
+                    return await self.llm_client.agenerate(prompt=prompt, system_prompt=self.prompt_builder.system_prompt)
+
+        try:
+            if self.answer_cache is not None:
+                return LLMAnswer(await self.answer_cache.aget_or_generate(self._answer_key(query, results), generate))
+            return LLMAnswer(await generate())
+        except Overloaded as e:
+            return self._degraded(query, results, e)
+
+    async def astream_with_llm(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[FilterSpec] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Search, then stream the LLM answer.
+
+        Yields (event, payload) pairs: ("results", results) before generation
+        starts, then ("delta", text) for each chunk of the answer. Cached
+        answers are replayed as a single delta; streamed answers are cached
+        once complete. When the LLM is saturated, ("degraded", {"reason"})
+        is followed by the retrieval-only answer as a single delta.
+        """
+        if not self.llm_client or not self.prompt_builder:
+            raise ValueError("LLM client and prompt builder required for NL generation")
+
+        logger.info(f"Streaming query with LLM: {query}")
+
+        results = await self.asearch(query, top_k=top_k, filters=filters)
+        yield "results", results
+
+        key = self._answer_key(query, results) if self.answer_cache is not None else None
+        if key is not None:
+            cached = self.answer_cache.get(key)
+            if cached is not None:
+                yield "delta", cached
+                return
+
+        parts: List[str] = []
+        try:
+            # the slot is held until the stream ends
+            async with self._llm_slot():
+                with stage("prompt"):
+                    prompt = self.prompt_builder.build_prompt(query, results)
+                # llm covers the whole stream, llm_first_delta the time to first token
+                with stage("llm"):
+                    started = time.perf_counter()
+                    async for delta in self.llm_client.agenerate_stream(
+                        prompt=prompt,
+                        system_prompt=self.prompt_builder.system_prompt,
+                    ):
+                        if not parts:
+                            record("llm_first_delta", time.perf_counter() - started)
+                        parts.append(delta)
+                        yield "delta", delta
+        except Overloaded as e:
+            answer = self._degraded(query, results, e)
+            yield "degraded", {"reason": e.reason}
+            yield "delta", answer.text
+            return
+
+        if key is not None:
+            self.answer_cache.put(key, "".join(parts))
@@ -0,0 +1,88 @@
+"""Startup progress of the serving resources (backs GET /ready)."""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+class Readiness:
+    """Load status and timings per resource, and the cold-start milestones.
+
+    Args:
+        boot_t0: perf_counter() taken when the server module was imported;
+            ready/first-query times are reported relative to it
+    """
+
+    def __init__(self, boot_t0: Optional[float] = None):
+        self.boot_t0 = time.perf_counter() if boot_t0 is None else boot_t0
+        self._lock = threading.Lock()
+        self.resources: Dict[str, Dict[str, Any]] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self.ready_after_s: Optional[float] = None
+        self.first_query_after_s: Optional[float] = None
+
+    def declare(self, *names: str) -> None:
+        """List resources up front so /ready shows what is still pending."""
+        with self._lock:
+            for name in names:
+                self.resources.setdefault(name, {"status": PENDING, "seconds": None})
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Mark `name` loading for the duration of the block, then ready or failed."""
+        t0 = time.perf_counter()
+        with self._lock:
+            self.resources[name] = {"status": LOADING, "seconds": None}
+        try:
+            yield
+        except BaseException as e:
+            with self._lock:
+                self.resources[name] = {
+                    "status": FAILED, "seconds": round(time.perf_counter() - t0, 3), "error": f"{type(e).__name__}: {e}",
+                }
+            raise
+        with self._lock:
+            self.resources[name] = {"status": READY, "seconds": round(time.perf_counter() - t0, 3)}
+
+    def run(self, name: str, fn: Callable[[], Any]) -> Any:
+        """fn() tracked as `name` (for executor.submit)."""
+        with self.track(name):
+            return fn()
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            self.ready = True
+            self.ready_after_s = round(time.perf_counter() - self.boot_t0, 3)
+            breakdown = ", ".join(f"{name} {r['seconds']}s" for name, r in self.resources.items())
+        logger.info(f"Ready {self.ready_after_s}s after start ({breakdown})")
+
+    def mark_failed(self, error: BaseException) -> None:
+        with self._lock:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def first_query(self) -> None:
+        """Record the first successfully served query (only the first call counts)."""
+        if self.first_query_after_s is not None:
+            return
+        with self._lock:
+            if self.first_query_after_s is not None:
+                return
+            self.first_query_after_s = round(time.perf_counter() - self.boot_t0, 3)
+        logger.info(f"First query served {self.first_query_after_s}s after start")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "uptime_s": round(time.perf_counter() - self.boot_t0, 3),
+                "ready_after_s": self.ready_after_s,
+                "first_query_after_s": self.first_query_after_s,
+                "error": self.error,
+                "resources": {name: dict(r) for name, r in self.resources.items()},
+            }
@@ -0,0 +1,156 @@
+"""Atomic pipeline swaps for zero-downtime index reloads."""
+import asyncio
+import gc
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.core.index_versions import current_version
+from backend.core.pipeline import QueryPipeline
+
+logger = logging.getLogger(__name__)
+
+# loader(version) -> (pipeline, version label); runs on a worker thread, raises on invalid builds
+PipelineLoader = Callable[[Optional[str]], Tuple[QueryPipeline, str]]
+
+
+class PipelineManager:
+    """Serves the current QueryPipeline and swaps in new index versions.
+
+    Requests lease the pipeline for their whole lifetime (including
+    streamed answers). A reload builds and validates the new pipeline in
+    the background, then replaces the reference in one assignment: new
+    requests get the new version, leased ones finish on the old one, which
+    is closed and released once its last lease ends.
+    """
+
+    def __init__(self, pipeline: QueryPipeline, version: str, loader: PipelineLoader):
+        self._pipeline = pipeline
+        self.version = version
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._leases: Dict[int, int] = {id(pipeline): 0}
+        self._retired: Dict[int, Tuple[QueryPipeline, str]] = {}
+        self._reload_lock = asyncio.Lock()
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self.on_swap: List[Callable[[QueryPipeline], None]] = []
+
+    @property
+    def pipeline(self) -> QueryPipeline:
+        return self._pipeline
+
+    def acquire(self) -> QueryPipeline:
+        """Lease the current pipeline; pair every call with release()."""
+        with self._lock:
+            pipeline = self._pipeline
+            self._leases[id(pipeline)] += 1
+            return pipeline
+
+    def release(self, pipeline: QueryPipeline) -> None:
+        with self._lock:
+            key = id(pipeline)
+            self._leases[key] -= 1
+            drained = self._leases[key] == 0 and key in self._retired
+            if drained:
+                del self._leases[key]
+                _, version = self._retired.pop(key)
+        if drained:
+            self._close(pipeline, version)
+
+    @contextmanager
+    def lease(self) -> Iterator[QueryPipeline]:
+        pipeline = self.acquire()
+        try:
+            yield pipeline
+        finally:
+            self.release(pipeline)
+
+    def swap(self, pipeline: QueryPipeline, version: str) -> None:
+        """Make `pipeline` current; the previous one drains and is closed."""
+        with self._lock:
+            old, old_version = self._pipeline, self.version
+            self._pipeline, self.version = pipeline, version
+            self._leases[id(pipeline)] = 0
+            idle = self._leases[id(old)] == 0
+            if idle:
+                del self._leases[id(old)]
+            else:
+                self._retired[id(old)] = (old, old_version)
+        self.loaded_at = time.time()
+        for callback in self.on_swap:
+            callback(pipeline)
+        logger.info(f"Serving index version {version} (was {old_version})")
+        if idle:
+            self._close(old, old_version)
+
+    @staticmethod
+    def _close(pipeline: QueryPipeline, version: str) -> None:
+        pipeline.close()
+        del pipeline
+        gc.collect()
+        logger.info(f"Released index version {version}")
+
+    async def reload(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """Load, validate and swap in `version` (default: the active one on disk).
+
+        Concurrent calls are serialized. A failed load leaves the current
+        pipeline serving and is reported in `last_error`.
+
+        Raises:
+            Exception: Whatever the loader raised (validation, I/O)
+        """
+        async with self._reload_lock:
+            t0 = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            try:
+                pipeline, label = await loop.run_in_executor(None, self._loader, version)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.error(f"Index reload failed, keeping version {self.version}: {self.last_error}")
+                raise
+            self.swap(pipeline, label)
+            self.reloads += 1
+            self.last_error = None
+            logger.info(f"Index reload to {label} took {time.perf_counter() - t0:.2f}s")
+            return self.status()
+
+    async def watch(self, root: Path, interval_s: float) -> None:
+        """Reload whenever CURRENT under `root` names a different version.
+
+        A version that fails validation is not retried until CURRENT changes.
+        """
+        failed: Optional[str] = None
+        while True:
+            await asyncio.sleep(interval_s)
+            target = current_version(root)
+            if target is None or target in (self.version, failed):
+                continue
+            try:
+                await self.reload(target)
+                failed = None
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # logged by reload(); the current version keeps serving
+                failed = target
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            draining = [
+                {"version": version, "in_flight": self._leases.get(key, 0)}
+                for key, (_, version) in self._retired.items()
+            ]
+            in_flight = self._leases.get(id(self._pipeline), 0)
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "in_flight": in_flight,
+            "reloads": self.reloads,
+            "draining": draining,
+            "last_error": self.last_error,
+        }
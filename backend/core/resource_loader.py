@@ -1,24 +1,133 @@
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Union
 import json
+import logging
 
 import faiss  # type: ignore
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
+from backend.core.encoders.base_encoder import BaseEncoder
+from backend.core.generation.context_store import ContextStore
+from backend.core.retrieval.metadata_store import MetadataStore, ColumnarMetadataStore
+from backend.core.retrieval.lexical_index import BM25Index
 
-def load_model(model_name: str) -> SentenceTransformer:
-    """Load the SentenceTransformer model."""
+if TYPE_CHECKING:
+    # torch is imported only when a torch model is actually loaded
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PARAMS_FILE = "search_params.json"
+LEXICAL_INDEX_DIR = "lexical.bm25"
+CONTEXT_STORE_DIR = "context.cols"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+# anything with SentenceTransformer's encode(): the torch model itself or a BaseEncoder backend
+Encoder = Union["SentenceTransformer", BaseEncoder]
+
+
+def load_model(
+    model_name: str,
+    backend: str = "torch",
+    onnx_dir: Optional[Path] = None,
+    quantized: bool = True,
+    threads: Optional[int] = None,
+) -> Encoder:
+    """Load the query encoder.
+
+    Args:
+        model_name: SentenceTransformer model (torch backend)
+        backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime over an export_onnx dir)
+        onnx_dir: Export directory for the onnx backend
+        quantized: Prefer the int8 ONNX model
+        threads: ONNX Runtime intra-op threads
+    """
+    if backend == "onnx":
+        if onnx_dir is None:
+            raise ValueError("The onnx encoder backend needs an export directory (ONNX_MODEL_DIR)")
+        from backend.core.encoders.onnx_encoder import OnnxEncoder
+        return OnnxEncoder(onnx_dir, quantized=quantized, threads=threads)
+    if backend != "torch":
+        raise ValueError(f"Unknown encoder backend: {backend}")
+    from sentence_transformers import SentenceTransformer
     return SentenceTransformer(model_name)
 
 
-def load_index(index_path: Path) -> faiss.Index:
-    """Load FAISS index from disk."""
+def _mmap_flags(p: Path) -> int:
+    """Pick FAISS mmap flags from the index fourcc (IVF indexes start with 'Iw')."""
+    with p.open("rb") as f:
+        fourcc = f.read(4)
+    if fourcc.startswith(b"Iw") or not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        flags = faiss.IO_FLAG_MMAP
+    else:
+        flags = faiss.IO_FLAG_MMAP_IFC
+    return flags | faiss.IO_FLAG_READ_ONLY
+
+
+def load_index(index_path: Path, mmap: bool = False) -> faiss.Index:
+    """Load FAISS index from disk.
+
+    With `mmap`, vector data is mapped read-only from the file instead of
+    copied to the heap, so workers on the same host share it through the
+    page cache. Index types that cannot be mapped are read normally.
+    """
     p = Path(index_path)
     if not p.exists():
         raise FileNotFoundError(f"FAISS index not found: {p}")
+    if mmap:
+        try:
+            return faiss.read_index(str(p), _mmap_flags(p))
+        except RuntimeError as e:
+            logger.warning(f"Could not mmap FAISS index {p}, reading into memory: {e}")
     return faiss.read_index(str(p))
 
 
+def load_search_params(index_path: Path) -> Dict:
+    """Read the tuned search params (nprobe/efSearch) saved next to the index."""
+    p = Path(index_path).parent / SEARCH_PARAMS_FILE
+    if not p.exists():
+        return {}
+    with p.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_lexical_index(index_path: Path, mmap: bool = True) -> Optional[BM25Index]:
+    """Load the BM25 index built next to index.faiss (None if the build has none)."""
+    p = Path(index_path).parent / LEXICAL_INDEX_DIR
+    if not (p / BM25Index.MANIFEST).exists():
+        logger.warning(f"No lexical index at {p}, hybrid search disabled (rebuild the index to enable it)")
+        return None
+    index = BM25Index.load(p, use_mmap=mmap)
+    logger.info(f"Loaded lexical index: {len(index.terms)} terms, {len(index)} docs")
+    return index
+
+
+def load_context_store(index_path: Path, mmap: bool = True) -> Optional[ContextStore]:
+    """Load the LLM context strings built next to index.faiss (None if the build has none)."""
+    p = Path(index_path).parent / CONTEXT_STORE_DIR
+    if not (p / ColumnarMetadataStore.MANIFEST).exists():
+        logger.warning(f"No context store at {p}, prompts format metadata per request (rebuild the index to precompute them)")
+        return None
+    return ContextStore.load(p, use_mmap=mmap)
+
+
+def load_embeddings(index_path: Path, expected_rows: Optional[int] = None) -> Optional[np.ndarray]:
+    """Memory-map the build's embeddings.npy (row i = FAISS id i), or None if absent/stale.
+
+    `expected_rows` is the number of row slots, i.e. metadata rows. After
+    incremental deletions that is more than index.ntotal: deleted slots
+    stay in both files as tombstones.
+    """
+    p = Path(index_path).parent / EMBEDDINGS_FILE
+    if not p.exists():
+        return None
+    embeddings = np.load(p, mmap_mode="r")
+    if expected_rows is not None and len(embeddings) != expected_rows:
+        logger.warning(f"{p} has {len(embeddings)} rows, metadata has {expected_rows}; not using it")
+        return None
+    return embeddings
+
+
 def load_metadata(metadata_path: Path) -> List[Dict]:
     """Load metadata.jsonl into memory."""
     p = Path(metadata_path)
@@ -34,9 +143,53 @@ def load_metadata(metadata_path: Path) -> List[Dict]:
     return entries
 
 
-def load_resources(model_name: str, index_path: Path, metadata_path: Path) -> Tuple[SentenceTransformer, faiss.Index, List[Dict]]:
-    """Load all heavy resources once."""
+def metadata_store_dir(metadata_path: Path) -> Path:
+    """Location of the binary columnar store for a metadata.jsonl file."""
+    return Path(metadata_path).with_suffix(".cols")
+
+
+def load_metadata_store(metadata_path: Path, mmap: bool = False) -> ColumnarMetadataStore:
+    """Load metadata.jsonl into a compact columnar store.
+
+    With `mmap`, the binary store next to the jsonl (metadata.cols) is
+    mapped read-only. It is (re)built from the jsonl first when missing or
+    older than it.
+    """
+    p = Path(metadata_path)
+    if not p.exists():
+        raise FileNotFoundError(f"Metadata file not found: {p}")
+    if not mmap:
+        return ColumnarMetadataStore.from_jsonl(p)
+
+    store_dir = metadata_store_dir(p)
+    manifest = store_dir / ColumnarMetadataStore.MANIFEST
+    if not manifest.exists() or manifest.stat().st_mtime < p.stat().st_mtime:
+        logger.info(f"Building columnar metadata store: {store_dir}")
+        store = ColumnarMetadataStore.from_jsonl(p)
+        try:
+            store.save(store_dir)
+        except OSError as e:
+            logger.warning(f"Could not save metadata store {store_dir}, keeping it in memory: {e}")
+            return store
+    return ColumnarMetadataStore.load(store_dir, use_mmap=True)
+
+
+def load_resources(
+    model_name: str,
+    index_path: Path,
+    metadata_path: Path,
+    columnar_metadata: bool = False,
+    mmap: bool = False,
+) -> Tuple[Encoder, faiss.Index, Union[MetadataStore, List[Dict]]]:
+    """Load all heavy resources once.
+
+    `mmap` maps the index and the columnar metadata read-only (implies
+    columnar metadata).
+    """
     model = load_model(model_name)
-    index = load_index(index_path)
-    meta_entries = load_metadata(metadata_path)
+    index = load_index(index_path, mmap=mmap)
+    if columnar_metadata or mmap:
+        meta_entries = load_metadata_store(metadata_path, mmap=mmap)
+    else:
+        meta_entries = load_metadata(metadata_path)
     return model, index, meta_entries
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""Attribute filters: per-value posting lists over metadata columns."""
+import logging
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from backend.core.retrieval.metadata_store import ColumnarMetadataStore, MetadataStore
+
+logger = logging.getLogger(__name__)
+
+FilterSpec = Dict[str, Union[str, List[str]]]
+
+# derived attribute ("true"/"false") when a stock column is configured or detected
+IN_STOCK = "in_stock"
+
+# catalog headers recognised as the stock column when STOCK_COLUMN is not set
+STOCK_COLUMN_NAMES = ("απόθεμα", "αποθεμα", "υπόλοιπο", "υπολοιπο", "stock", "qty", "quantity", "on hand")
+
+
+def _norm(value) -> str:
+    return str(value).strip().casefold()
+
+
+def _in_stock(value) -> Optional[bool]:
+    try:
+        return float(str(value).replace(",", ".")) > 0
+    except ValueError:
+        return None
+
+
+def detect_stock_column(store: MetadataStore, sample: int = 1000) -> Optional[str]:
+    """Find the catalog's stock column by header name (e.g. "Απόθεμα").
+
+    A candidate counts only if at least 90% of its non-empty values in the
+    first `sample` rows are numeric.
+
+    Returns:
+        The column name, or None when the catalog has no stock column
+    """
+    numeric: Dict[str, int] = {}
+    filled: Dict[str, int] = {}
+    for entry in store.get_many(range(min(sample, len(store)))):
+        for name, value in (entry.get("metadata") or {}).items():
+            if _norm(name) not in STOCK_COLUMN_NAMES or value in (None, ""):
+                continue
+            filled[name] = filled.get(name, 0) + 1
+            numeric[name] = numeric.get(name, 0) + (_in_stock(value) is not None)
+    candidates = [name for name, count in filled.items() if numeric[name] >= 0.9 * count]
+    return candidates[0] if candidates else None
+
+
+class AttributeIndex:
+    """Value -> sorted row ids for each filterable metadata column.
+
+    Row ids are FAISS ids (int64). Values of one attribute are OR'ed,
+    attributes are AND'ed; the resulting id set is pushed into the vector
+    and lexical searches instead of post-filtering their results.
+    """
+
+    def __init__(self, postings: Dict[str, Dict[str, np.ndarray]], size: int):
+        self._postings = postings
+        self._names = {name.casefold(): name for name in postings}
+        self.size = size
+
+    @classmethod
+    def from_metadata(
+        cls,
+        store: MetadataStore,
+        columns: Optional[Sequence[str]] = None,
+        max_values: int = 4096,
+        stock_column: Optional[str] = None,
+        chunk_size: int = 10_000,
+    ) -> "AttributeIndex":
+        """Build posting lists from a metadata store.
+
+        Args:
+            store: Metadata entries, positions = FAISS ids
+            columns: Columns to index (default: every column with at most
+                `max_values` distinct values, e.g. warehouse, category, shelf)
+            max_values: Cardinality limit for automatically chosen columns
+            stock_column: Numeric column backing the derived "in_stock" attribute
+            chunk_size: Entries fetched per get_many call
+        """
+        t0 = time.perf_counter()
+        n = len(store)
+        postings: Dict[str, Dict[str, np.ndarray]] = {}
+        pending = set(columns) if columns is not None else None
+
+        # dictionary-encoded columns of the columnar store: one argsort per column
+        if isinstance(store, ColumnarMetadataStore):
+            for name in store.columns:
+                if pending is not None and name not in pending:
+                    continue
+                encoded = store.dictionary_column(name)
+                if encoded is None or len(encoded[0]) > max_values:
+                    continue
+                postings[name] = cls._from_codes(*encoded)
+                if pending is not None:
+                    pending.discard(name)
+
+        # everything else (plain stores, explicit high-cardinality columns, stock) in one pass
+        scan_all = pending is None and not isinstance(store, ColumnarMetadataStore)
+        if scan_all or pending or stock_column:
+            lists: Dict[str, Dict[str, array]] = {}
+            dropped = set()
+            stock = {True: array("q"), False: array("q")}
+            for start in range(0, n, chunk_size):
+                positions = range(start, min(start + chunk_size, n))
+                for row, entry in zip(positions, store.get_many(positions)):
+                    for name, value in (entry.get("metadata") or {}).items():
+                        if name == stock_column:
+                            flag = _in_stock(value)
+                            if flag is not None:
+                                stock[flag].append(row)
+                        if name in dropped or not (scan_all or (pending and name in pending)):
+                            continue
+                        by_value = lists.setdefault(name, {})
+                        key = _norm(value)
+                        ids = by_value.get(key)
+                        if ids is None:
+                            if scan_all and len(by_value) >= max_values:
+                                dropped.add(name)
+                                del lists[name]
+                                continue
+                            ids = by_value[key] = array("q")
+                        ids.append(row)
+            for name, by_value in lists.items():
+                postings[name] = {v: np.frombuffer(ids, dtype=np.int64) for v, ids in by_value.items()}
+            if stock_column:
+                postings[IN_STOCK] = {
+                    "true": np.frombuffer(stock[True], dtype=np.int64),
+                    "false": np.frombuffer(stock[False], dtype=np.int64),
+                }
+
+        index = cls(postings, n)
+        logger.info(
+            f"Attribute index: {len(postings)} attributes "
+            f"({', '.join(f'{a}={len(v)}' for a, v in postings.items())}) in {time.perf_counter() - t0:.2f}s"
+        )
+        return index
+
+    @staticmethod
+    def _from_codes(values: List[str], codes) -> Dict[str, np.ndarray]:
+        codes = np.frombuffer(codes, dtype=np.int32)
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(values) + 1))
+        by_value: Dict[str, np.ndarray] = {}
+        for code, value in enumerate(values):
+            ids = order[bounds[code]:bounds[code + 1]].astype(np.int64)
+            key = _norm(value)
+            # values differing only in case/whitespace share one posting list
+            by_value[key] = np.union1d(by_value[key], ids) if key in by_value else ids
+        return by_value
+
+    def attributes(self) -> Dict[str, int]:
+        """Filterable attributes and their number of distinct values."""
+        return {name: len(values) for name, values in self._postings.items()}
+
+    def resolve(self, filters: Optional[FilterSpec]) -> Optional[np.ndarray]:
+        """Turn filters into the sorted array of matching row ids.
+
+        Args:
+            filters: {attribute: value or list of values}
+
+        Returns:
+            Sorted int64 row ids, or None when there are no filters
+
+        Raises:
+            ValueError: Unknown attribute (or in_stock without a stock column)
+        """
+        if not filters:
+            return None
+        result: Optional[np.ndarray] = None
+        for attr, wanted in filters.items():
+            name = self._names.get(str(attr).casefold())
+            if name is None and _norm(attr) == IN_STOCK:
+                raise ValueError(
+                    "in_stock filtering needs a stock column: none was detected in the catalog, set STOCK_COLUMN"
+                )
+            if name is None:
+                raise ValueError(f"Unknown filter attribute '{attr}' (available: {sorted(self._postings)})")
+            wanted = [wanted] if isinstance(wanted, (str, bool, int, float)) else wanted
+            by_value = self._postings[name]
+            lists = [by_value[k] for k in {_norm(v) for v in wanted} if k in by_value]
+            # a row has one value per attribute, so the lists are disjoint
+            ids = np.sort(np.concatenate(lists)) if lists else np.zeros(0, dtype=np.int64)
+            result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+            if not len(result):
+                break
+        return result
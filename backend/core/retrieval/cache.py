@@ -0,0 +1,119 @@
+"""Bounded LRU/TTL caches for query embeddings and retrieval results."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache with optional per-entry time-to-live.
+
+    Any object exposing get/put/clear/__len__ can be plugged into
+    RetrievalCache in its place (e.g. a shared external cache).
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 300.0):
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RetrievalCache:
+    """Caches embeddings and (query, top_k) -> (distances, indices) lookups.
+
+    Keys are the QueryProcessor.process output. Entries are tied to the
+    index they were computed against; binding a different index (or one
+    whose vector count changed) clears both caches.
+    """
+
+    def __init__(
+        self,
+        embedding_cache: Optional[Any] = None,
+        result_cache: Optional[Any] = None,
+        max_size: int = 1024,
+        ttl_seconds: Optional[float] = 300.0,
+    ):
+        self.embeddings = embedding_cache or LRUTTLCache(max_size, ttl_seconds)
+        self.results = result_cache or LRUTTLCache(max_size, ttl_seconds)
+        self._index_token: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def bind(self, index: Any) -> None:
+        """Invalidate cached entries if `index` is not the one they came from."""
+        token = (id(index), int(getattr(index, "ntotal", 0)))
+        if token == self._index_token:
+            return
+        with self._lock:
+            if token != self._index_token:
+                if self._index_token is not None:
+                    logger.info("Index changed, clearing retrieval cache")
+                self.clear()
+                self._index_token = token
+
+    def get_embedding(self, query: str) -> Optional[np.ndarray]:
+        return self.embeddings.get(query)
+
+    def put_embedding(self, query: str, vector: np.ndarray) -> None:
+        self.embeddings.put(query, vector)
+
+    def get_results(self, query: str, top_k: int) -> Optional[Tuple[List[float], List[int]]]:
+        return self.results.get((query, top_k))
+
+    def put_results(self, query: str, top_k: int, distances: List[float], indices: List[int]) -> None:
+        self.results.put((query, top_k), (distances, indices))
+
+    def clear(self) -> None:
+        self.embeddings.clear()
+        self.results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and sizes for both caches."""
+        return {
+            "embedding_hits": getattr(self.embeddings, "hits", 0),
+            "embedding_misses": getattr(self.embeddings, "misses", 0),
+            "embedding_size": len(self.embeddings),
+            "result_hits": getattr(self.results, "hits", 0),
+            "result_misses": getattr(self.results, "misses", 0),
+            "result_size": len(self.results),
+        }
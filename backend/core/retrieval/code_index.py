@@ -0,0 +1,147 @@
+"""Exact product-code lookup (SKU fast path)."""
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from backend.core.retrieval.metadata_store import MetadataStore
+
+logger = logging.getLogger(__name__)
+
+# metadata columns whose values are indexed as codes (matched case-insensitively as substrings)
+CODE_COLUMN_HINTS = ("κωδικ", "code", "sku", "ean", "barcode", "upc", "mpn", "part no", "part_no", "part number")
+
+_SEPARATORS = re.compile(r"[\s\-_./]+")
+
+
+Rows = Dict[str, Union[int, Tuple[int, ...]]]
+
+
+def exact_code(code: str) -> str:
+    """Key for exact matches: case-insensitive, separators kept ("AB-12" != "AB12")."""
+    return code.strip().casefold()
+
+
+def normalize_code(code: str) -> str:
+    """Separator-insensitive form for the fallback lookup ("ab-12.3" -> "ab123")."""
+    return _SEPARATORS.sub("", code).casefold()
+
+
+def _add(rows: Rows, key: str, row: int) -> None:
+    prev = rows.get(key)
+    if prev is None:
+        rows[key] = row
+    elif isinstance(prev, int):
+        if prev != row:
+            rows[key] = (prev, row)
+    elif row not in prev:
+        rows[key] = prev + (row,)
+
+
+def _as_list(found) -> List[int]:
+    if found is None:
+        return []
+    return [found] if isinstance(found, int) else list(found)
+
+
+class CodeIndex:
+    """In-memory hash index: code -> metadata row(s).
+
+    Built from each entry's id (Doc.id) and its code-like metadata columns.
+    Lookups match the code exactly first (ignoring case); only when that
+    fails do they retry without separators, so "AB-12" and "AB12" stay
+    distinct when both exist. Lookups are dict accesses, so code queries
+    never touch the embedding model or FAISS.
+    """
+
+    def __init__(self, rows: Rows, loose: Optional[Rows] = None):
+        self._rows = rows
+        # separator-insensitive keys that differ from their exact key
+        self._loose = loose or {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    @classmethod
+    def from_metadata(
+        cls,
+        store: MetadataStore,
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 10_000,
+    ) -> "CodeIndex":
+        """Index the ids and code columns of every metadata entry.
+
+        Args:
+            store: Metadata entries ({"id", "metadata"}), positions = FAISS ids
+            columns: Exact column names to index (default: names matching CODE_COLUMN_HINTS)
+            chunk_size: Entries fetched per get_many call
+        """
+        t0 = time.perf_counter()
+        wanted = set(columns) if columns is not None else None
+        is_code_column: Dict[str, bool] = {}
+        rows: Rows = {}
+        loose: Rows = {}
+
+        def add(value, row: int) -> None:
+            key = exact_code(str(value))
+            if not key:
+                return
+            _add(rows, key, row)
+            loose_key = normalize_code(key)
+            if loose_key and loose_key != key:
+                _add(loose, loose_key, row)
+
+        n = len(store)
+        for start in range(0, n, chunk_size):
+            positions = range(start, min(start + chunk_size, n))
+            for row, entry in zip(positions, store.get_many(positions)):
+                if entry.get("id") is not None:
+                    add(entry["id"], row)
+                for column, value in (entry.get("metadata") or {}).items():
+                    flag = is_code_column.get(column)
+                    if flag is None:
+                        name = column.casefold()
+                        flag = column in wanted if wanted is not None else any(h in name for h in CODE_COLUMN_HINTS)
+                        is_code_column[column] = flag
+                    if flag and value:
+                        add(value, row)
+
+        index = cls(rows, loose)
+        logger.info(
+            f"Code index: {len(rows)} codes ({len(loose)} with separators) from {n} entries "
+            f"(columns: {[c for c, f in is_code_column.items() if f]}) in {time.perf_counter() - t0:.2f}s"
+        )
+        return index
+
+    def lookup(self, code: str) -> List[int]:
+        """Metadata rows whose id or code column equals `code`.
+
+        Exact (case-insensitive) match first; without one, codes equal to
+        `code` once separators are removed ("ab.12" finds "AB-12" and "AB12").
+        """
+        found = _as_list(self._rows.get(exact_code(code)))
+        if not found:
+            key = normalize_code(code)
+            found = _as_list(self._rows.get(key))
+            found += [row for row in _as_list(self._loose.get(key)) if row not in found]
+        with self._lock:
+            self.lookups += 1
+            if found:
+                self.hits += 1
+        return found
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, code: str) -> bool:
+        key = normalize_code(code)
+        return exact_code(code) in self._rows or key in self._rows or key in self._loose
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "code_lookups": self.lookups,
+            "code_hits": self.hits,
+            "code_misses": self.lookups - self.hits,
+            "code_index_size": len(self._rows),
+        }
@@ -0,0 +1,33 @@
+"""Rank fusion of several retrieval result lists."""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]],
+    top_k: int,
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> Tuple[List[float], List[int]]:
+    """Fuse ranked id lists by reciprocal rank: score(d) = sum w / (k + rank).
+
+    Only ranks are used, so dense inner products and BM25 scores never
+    have to be calibrated against each other.
+
+    Args:
+        rankings: Row ids per retriever, best first (negative ids are ignored)
+        top_k: Number of fused results
+        k: RRF damping constant (60 in the original paper)
+        weights: Optional per-retriever weights (default 1.0 each)
+
+    Returns:
+        (fused scores, row ids), best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, idx in enumerate(ranking, 1):
+            if idx < 0:
+                continue
+            scores[idx] = scores.get(idx, 0.0) + weight / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [s for _, s in fused], [i for i, _ in fused]
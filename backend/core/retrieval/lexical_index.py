@@ -0,0 +1,273 @@
+"""BM25 inverted index for exact-term retrieval next to FAISS.
+
+Catches what dense retrieval misses: dimensions ("1/2", "16mm"), brand
+names and Greek abbreviations. Documents are the metadata values of each
+entry, so row ids line up with FAISS ids and the metadata store.
+
+On-disk layout (a directory, like metadata.cols):
+    manifest.json   version, n_docs, avgdl, k1, b, n_terms
+    terms.blob      sorted UTF-8 terms, concatenated
+    terms.offsets   uint64 [n_terms + 1] into terms.blob
+    postings.offsets uint64 [n_terms + 1] into doc_ids / tfs
+    doc_ids         uint32 postings (ascending per term)
+    tfs             uint16 term frequencies
+    doc_len         uint32 tokens per document
+All buffers are memory-mapped on load, so opening the index is O(1).
+"""
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import tempfile
+import unicodedata
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# words, numbers and joined tokens such as 1/2, 3.5, 16mm, ab-12
+_TOKEN = re.compile(r"\w+(?:[./\-]\w+)*")
+
+# terms found in (almost) every document score ~0 but have the longest postings
+MIN_IDF = 0.05
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip Greek accents and split into terms."""
+    text = unicodedata.normalize("NFD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _TOKEN.findall(text)
+
+
+def entry_text(entry: Dict) -> str:
+    """Text indexed for one metadata entry: its metadata values."""
+    return " ".join(str(v) for v in (entry.get("metadata") or {}).values() if v)
+
+
+class _Terms:
+    """Sorted term blob addressed by offsets; a sequence of bytes for bisect."""
+
+    def __init__(self, blob, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return bytes(self.blob[int(self.offsets[i]):int(self.offsets[i + 1])])
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index held in flat numpy buffers."""
+
+    MANIFEST = "manifest.json"
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        terms: _Terms,
+        postings_offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.terms = terms
+        self.postings_offsets = postings_offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(doc_len)
+        self.avgdl = float(doc_len.mean()) if self.n_docs else 0.0
+
+    # ---- build --------------------------------------------------------------
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """Index documents in a single pass (document i gets row id i)."""
+        postings: Dict[str, Tuple[array, array]] = {}
+        doc_len = array("I")
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_len.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for t in tokens:
+                counts[t] = counts.get(t, 0) + 1
+            for t, tf in counts.items():
+                plist = postings.get(t)
+                if plist is None:
+                    plist = postings[t] = (array("I"), array("H"))
+                plist[0].append(doc_id)
+                plist[1].append(min(tf, 65535))
+
+        encoded = sorted((t.encode("utf-8"), t) for t in postings)
+        blob = bytearray()
+        term_offsets = array("Q", [0])
+        post_offsets = array("Q", [0])
+        doc_ids = array("I")
+        tfs = array("H")
+        for raw, term in encoded:
+            blob += raw
+            term_offsets.append(len(blob))
+            ids, freqs = postings.pop(term)
+            doc_ids.extend(ids)
+            tfs.extend(freqs)
+            post_offsets.append(len(doc_ids))
+
+        return cls(
+            _Terms(bytes(blob), np.frombuffer(term_offsets, dtype=np.uint64)),
+            np.frombuffer(post_offsets, dtype=np.uint64),
+            np.frombuffer(doc_ids, dtype=np.uint32),
+            np.frombuffer(tfs, dtype=np.uint16),
+            np.frombuffer(doc_len, dtype=np.uint32),
+            k1=k1,
+            b=b,
+        )
+
+    @classmethod
+    def from_jsonl(cls, metadata_path: Path, k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """Stream metadata.jsonl into an index (one document per entry)."""
+        def texts():
+            with Path(metadata_path).open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield entry_text(json.loads(line))
+
+        return cls.build(texts(), k1=k1, b=b)
+
+    # ---- query --------------------------------------------------------------
+
+    def _term_id(self, term: str) -> int:
+        raw = term.encode("utf-8")
+        i = bisect_left(self.terms, raw)
+        if i < len(self.terms) and self.terms[i] == raw:
+            return i
+        return -1
+
+    def search(self, query: str, top_k: int, allowed: Optional[np.ndarray] = None) -> Tuple[List[float], List[int]]:
+        """Top-k documents by BM25 score.
+
+        Args:
+            query: Query text (tokenized like the documents)
+            top_k: Number of results
+            allowed: Optional sorted row ids to restrict the search to
+
+        Returns:
+            (scores, row ids), best first; empty when no query term is indexed
+        """
+        ids_parts: List[np.ndarray] = []
+        score_parts: List[np.ndarray] = []
+        for term in set(tokenize(query)):
+            tid = self._term_id(term)
+            if tid < 0:
+                continue
+            start, end = int(self.postings_offsets[tid]), int(self.postings_offsets[tid + 1])
+            df = end - start
+            idf = math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+            if idf < MIN_IDF:
+                continue
+            ids = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[ids] / self.avgdl)
+            ids_parts.append(ids)
+            score_parts.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+        if not ids_parts:
+            return [], []
+
+        ids = np.concatenate(ids_parts)
+        scores = np.concatenate(score_parts)
+        if len(ids_parts) > 1:
+            ids, inverse = np.unique(ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores)
+        if allowed is not None:
+            keep = np.isin(ids, allowed, assume_unique=True)
+            ids, scores = ids[keep], scores[keep]
+            if not len(ids):
+                return [], []
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return scores[top].astype(float).tolist(), ids[top].astype(int).tolist()
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def nbytes(self) -> int:
+        return (
+            len(self.terms.blob) + self.terms.offsets.nbytes + self.postings_offsets.nbytes
+            + self.doc_ids.nbytes + self.tfs.nbytes + self.doc_len.nbytes
+        )
+
+    # ---- binary persistence -------------------------------------------------
+
+    def save(self, out_dir: Path) -> Path:
+        """Write the index buffers plus a manifest (temp dir renamed into place)."""
+        out_dir = Path(out_dir)
+        out_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=out_dir.name + ".", dir=out_dir.parent))
+        try:
+            (tmp_dir / "terms.blob").write_bytes(bytes(self.terms.blob))
+            for name, arr in (
+                ("terms.offsets", self.terms.offsets),
+                ("postings.offsets", self.postings_offsets),
+                ("doc_ids", self.doc_ids),
+                ("tfs", self.tfs),
+                ("doc_len", self.doc_len),
+            ):
+                (tmp_dir / name).write_bytes(np.ascontiguousarray(arr).tobytes())
+            manifest = {
+                "version": self.FORMAT_VERSION,
+                "n_docs": self.n_docs,
+                "n_terms": len(self.terms),
+                "avgdl": self.avgdl,
+                "k1": self.k1,
+                "b": self.b,
+            }
+            with (tmp_dir / self.MANIFEST).open("w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            if out_dir.exists():
+                shutil.rmtree(out_dir)
+            os.rename(tmp_dir, out_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return out_dir
+
+    @classmethod
+    def load(cls, index_dir: Path, use_mmap: bool = True) -> "BM25Index":
+        """Load an index written by `save` (buffers mapped read-only by default)."""
+        index_dir = Path(index_dir)
+        with (index_dir / cls.MANIFEST).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported lexical index version in {index_dir}")
+
+        def buf(name: str, dtype) -> np.ndarray:
+            path = index_dir / name
+            if path.stat().st_size == 0:
+                return np.zeros(0, dtype=dtype)
+            if use_mmap:
+                return np.memmap(path, dtype=dtype, mode="r")
+            return np.fromfile(path, dtype=dtype)
+
+        terms = _Terms(buf("terms.blob", np.uint8), buf("terms.offsets", np.uint64))
+        return cls(
+            terms,
+            buf("postings.offsets", np.uint64),
+            buf("doc_ids", np.uint32),
+            buf("tfs", np.uint16),
+            buf("doc_len", np.uint32),
+            k1=manifest["k1"],
+            b=manifest["b"],
+        )
@@ -0,0 +1,288 @@
+"""Metadata storage backends used by ResultFormatter.
+
+Entries keep the metadata.jsonl shape: {"id": ..., "metadata": {column: value}}.
+"""
+import json
+import logging
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataStore(ABC):
+    """Read-only, index-addressable collection of metadata entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def get(self, idx: int) -> Dict:
+        """Return the entry at position `idx` (the FAISS row id)."""
+        pass
+
+    def get_many(self, indices: Sequence[int]) -> List[Dict]:
+        """Gather several entries by position."""
+        return [self.get(i) for i in indices]
+
+    def __getitem__(self, idx: int) -> Dict:
+        return self.get(idx)
+
+
+class ListMetadataStore(MetadataStore):
+    """Plain list-of-dicts store (the original in-memory layout)."""
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, idx: int) -> Dict:
+        return self.entries[idx]
+
+
+class _ColumnBuilder:
+    """Accumulates one column as a UTF-8 blob, dictionary-encoding while cardinality is low."""
+
+    def __init__(self, n_before: int, max_dict_size: int):
+        self.blob = bytearray()
+        self.offsets = array("Q", [0] * (n_before + 1))
+        self.max_dict_size = max_dict_size
+        self.dictionary: Optional[Dict[str, int]] = {}
+        self.codes = array("i", [-1] * n_before)
+
+    def append(self, value: Optional[str]) -> None:
+        if value is not None:
+            self.blob += value.encode("utf-8")
+        self.offsets.append(len(self.blob))
+        if self.dictionary is None:
+            return
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.dictionary.get(value)
+        if code is None:
+            if len(self.dictionary) >= self.max_dict_size:
+                self.dictionary = None
+                self.codes = array("i")
+                return
+            code = self.dictionary[value] = len(self.dictionary)
+        self.codes.append(code)
+
+    def finish(self) -> "_Column":
+        if self.dictionary is not None:
+            values = [sys.intern(v) for v in self.dictionary]
+            return _DictColumn(values, self.codes)
+        return _BlobColumn(bytes(self.blob), self.offsets)
+
+
+class _Column(ABC):
+    @abstractmethod
+    def value(self, idx: int) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def nbytes(self) -> int:
+        pass
+
+
+class _BlobColumn(_Column):
+    """Values concatenated in one UTF-8 blob, addressed by a uint64 offsets array (empty = missing)."""
+
+    def __init__(self, blob: bytes, offsets: Sequence[int]):
+        self.blob = blob
+        self.offsets = offsets
+
+    def value(self, idx: int) -> Optional[str]:
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        if start == end:
+            return None
+        return self.blob[start:end].decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self.blob) + len(self.offsets) * self.offsets.itemsize
+
+
+class _DictColumn(_Column):
+    """Low-cardinality column: int32 codes into a list of interned values (-1 = missing)."""
+
+    def __init__(self, values: List[str], codes: Sequence[int]):
+        self.values = values
+        self.codes = codes
+
+    def value(self, idx: int) -> Optional[str]:
+        code = self.codes[idx]
+        return self.values[code] if code >= 0 else None
+
+    def nbytes(self) -> int:
+        return len(self.codes) * self.codes.itemsize + sum(len(v.encode("utf-8")) for v in self.values)
+
+
+class ColumnarMetadataStore(MetadataStore):
+    """Compact columnar store with interned column names.
+
+    Each metadata column is held either as a UTF-8 blob plus offsets or,
+    when it has few distinct values, as int32 codes into an interned value
+    list. Entries are materialized as dicts only when gathered.
+    """
+
+    ID_KEY = "id"
+
+    def __init__(self, columns: List[str], id_column: _Column, data: List[_Column], size: int):
+        self.columns = columns
+        self._ids = id_column
+        self._data = data
+        self._size = size
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict], max_dict_size: int = 4096) -> "ColumnarMetadataStore":
+        """Build from metadata entries ({"id", "metadata"}) in a single pass."""
+        columns: List[str] = []
+        positions: Dict[str, int] = {}
+        builders: List[_ColumnBuilder] = []
+        ids = _ColumnBuilder(0, 0)
+        n = 0
+        for entry in entries:
+            row = entry.get("metadata") or {}
+            for key in row:
+                if key not in positions:
+                    positions[key] = len(columns)
+                    columns.append(sys.intern(key))
+                    builders.append(_ColumnBuilder(n, max_dict_size))
+            values: List[Optional[str]] = [None] * len(columns)
+            for key, v in row.items():
+                if v is not None and v != "":
+                    values[positions[key]] = v if isinstance(v, str) else str(v)
+            for builder, v in zip(builders, values):
+                builder.append(v)
+            entry_id = entry.get(cls.ID_KEY)
+            ids.append(None if entry_id is None else str(entry_id))
+            n += 1
+        return cls(columns, ids.finish(), [b.finish() for b in builders], n)
+
+    @classmethod
+    def from_jsonl(cls, metadata_path: Path, max_dict_size: int = 4096) -> "ColumnarMetadataStore":
+        """Stream metadata.jsonl into a columnar store without materializing the dicts."""
+        def entries():
+            with Path(metadata_path).open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+        return cls.from_entries(entries(), max_dict_size=max_dict_size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, idx: int) -> Dict:
+        if not 0 <= idx < self._size:
+            raise IndexError(idx)
+        metadata = {}
+        for key, column in zip(self.columns, self._data):
+            v = column.value(idx)
+            if v is not None:
+                metadata[key] = v
+        return {self.ID_KEY: self._ids.value(idx), "metadata": metadata}
+
+    def dictionary_column(self, name: str) -> Optional[Tuple[List[str], Sequence[int]]]:
+        """Distinct values and per-row codes (-1 = missing) of a dictionary-encoded column.
+
+        Returns None for unknown or high-cardinality (blob) columns.
+        """
+        try:
+            column = self._data[self.columns.index(name)]
+        except ValueError:
+            return None
+        if isinstance(column, _DictColumn):
+            return column.values, column.codes
+        return None
+
+    def nbytes(self) -> int:
+        """Approximate payload size of all column buffers."""
+        return self._ids.nbytes() + sum(c.nbytes() for c in self._data)
+
+    # ---- binary persistence -------------------------------------------------
+
+    MANIFEST = "manifest.json"
+    FORMAT_VERSION = 1
+
+    def save(self, out_dir: Path) -> Path:
+        """Write the store as raw column buffers plus a manifest.
+
+        The directory is written next to its final location and renamed into
+        place, so concurrent readers never see a partial store.
+        """
+        out_dir = Path(out_dir)
+        out_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=out_dir.name + ".", dir=out_dir.parent))
+        try:
+            manifest = {
+                "version": self.FORMAT_VERSION,
+                "size": self._size,
+                "columns": self.columns,
+                "id": _write_column(tmp_dir, "id", self._ids),
+                "data": [_write_column(tmp_dir, f"c{i}", c) for i, c in enumerate(self._data)],
+            }
+            with (tmp_dir / self.MANIFEST).open("w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            if out_dir.exists():
+                shutil.rmtree(out_dir)
+            os.rename(tmp_dir, out_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return out_dir
+
+    @classmethod
+    def load(cls, store_dir: Path, use_mmap: bool = True) -> "ColumnarMetadataStore":
+        """Load a store written by `save`.
+
+        With `use_mmap` the column buffers are mapped read-only, so every
+        process loading the same directory shares one copy in page cache.
+        """
+        store_dir = Path(store_dir)
+        with (store_dir / cls.MANIFEST).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported metadata store version in {store_dir}")
+        columns = [sys.intern(c) for c in manifest["columns"]]
+        ids = _read_column(store_dir, "id", manifest["id"], use_mmap)
+        data = [_read_column(store_dir, f"c{i}", spec, use_mmap) for i, spec in enumerate(manifest["data"])]
+        return cls(columns, ids, data, manifest["size"])
+
+
+def _write_column(out_dir: Path, name: str, column: _Column) -> Dict:
+    if isinstance(column, _DictColumn):
+        (out_dir / f"{name}.codes").write_bytes(bytes(column.codes))
+        return {"kind": "dict", "values": column.values}
+    (out_dir / f"{name}.blob").write_bytes(bytes(column.blob))
+    (out_dir / f"{name}.offsets").write_bytes(bytes(column.offsets))
+    return {"kind": "blob"}
+
+
+def _read_buffer(path: Path, use_mmap: bool):
+    if not use_mmap:
+        return path.read_bytes()
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _read_column(store_dir: Path, name: str, spec: Dict, use_mmap: bool) -> _Column:
+    if spec["kind"] == "dict":
+        codes = memoryview(_read_buffer(store_dir / f"{name}.codes", use_mmap)).cast("i")
+        return _DictColumn([sys.intern(v) for v in spec["values"]], codes)
+    blob = _read_buffer(store_dir / f"{name}.blob", use_mmap)
+    offsets = memoryview(_read_buffer(store_dir / f"{name}.offsets", use_mmap)).cast("Q")
+    return _BlobColumn(blob, offsets)
@@ -0,0 +1,96 @@
+"""Micro-batching front-end for query embedding and FAISS search."""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from backend.core.retrieval.vector_search import VectorSearchEngine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBatcher:
+    """Collects concurrent queries and serves them with one encode + one search.
+
+    Queries arriving within `max_wait_ms` of the first one (up to
+    `max_batch_size`) are encoded in a single `model.encode` call and
+    searched with a single `index.search` over the stacked matrix. Each
+    caller gets back only its own row.
+    """
+
+    def __init__(
+        self,
+        search_engine: VectorSearchEngine,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be a positive integer")
+        self.search_engine = search_engine
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: "queue.Queue[Optional[Tuple[str, int, Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, query: str, top_k: int) -> Future:
+        """Enqueue an already-processed query.
+
+        Returns:
+            Future resolving to (distances, indices) for this query
+        """
+        fut: Future = Future()
+        self._queue.put((query, top_k, fut))
+        return fut
+
+    def search(self, query: str, top_k: int) -> Tuple[List[float], List[int]]:
+        """Blocking variant of submit."""
+        return self.submit(query, top_k).result()
+
+    def close(self) -> None:
+        """Stop the batching thread after draining queued requests."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: Tuple[str, int, Future]) -> Tuple[List[Tuple[str, int, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[Tuple[str, int, Future]]) -> None:
+        try:
+            queries = [q for q, _, _ in batch]
+            max_k = max(k for _, k, _ in batch)
+            vectors = self.search_engine.embed_queries(queries)
+            distances, indices = self.search_engine.search_batch(vectors, top_k=max_k)
+            logger.debug(f"Served batch of {len(batch)} queries")
+            for (_, k, fut), dist_row, idx_row in zip(batch, distances, indices):
+                fut.set_result((dist_row[:k], idx_row[:k]))
+        except Exception as e:
+            logger.exception("Batched search failed")
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
@@ -1,9 +1,22 @@
 """Query preprocessing and normalization."""
 import logging
+import re
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# a single token of letters/digits (and - _ . /) containing at least one digit
+CODE_PATTERN = re.compile(r"^(?=[^\d]*\d)\w[\w\-./]{1,39}$")
+# letters/digits a code needs besides the separators: short tokens such as
+# "M8", "A4" or "1/2" are sizes, not product codes
+MIN_CODE_CHARS = 4
+# purely numeric codes (EAN, numeric SKUs) must be longer still ("2024" is a year/model)
+MIN_NUMERIC_CODE_CHARS = 6
+
+
+class InvalidQuery(ValueError):
+    """The query itself is unusable (e.g. blank); a client error, not a server one."""
+
 
 class QueryProcessor:
     """Handles query text preprocessing."""
@@ -20,9 +33,12 @@ class QueryProcessor:
             
         Returns:
             Processed query string
+
+        Raises:
+            InvalidQuery: Empty or whitespace-only query
         """
-        if not query:
-            raise ValueError("Query cannot be empty")
+        if not query or not query.strip():
+            raise InvalidQuery("Query cannot be empty")
         
         processed = query
         
@@ -33,4 +49,28 @@ class QueryProcessor:
             processed = processed.lower()
         
         logger.debug(f"Processed query: '{query}' -> '{processed}'")
-        return processed
\ No newline at end of file
+        return processed
+
+    def code_candidate(self, query: str) -> Optional[str]:
+        """Return the query as a product code if it is code-shaped.
+
+        Code-shaped means one token of up to 40 characters with at least
+        MIN_CODE_CHARS letters/digits that mixes letters and digits
+        (e.g. "SKU-10023", "ρκ-12/3"), or a number of at least
+        MIN_NUMERIC_CODE_CHARS digits (e.g. "4006381333931"). Sizes such as
+        "M8" or "1/2" are not codes. Surrounding quotes and a leading "#"
+        are ignored.
+
+        Args:
+            query: Raw user query
+
+        Returns:
+            The code, or None for free-text queries
+        """
+        candidate = (query or "").strip().strip("\"'").lstrip("#")
+        if not CODE_PATTERN.match(candidate):
+            return None
+        chars = [c for c in candidate if c.isalnum()]
+        if chars and all(c.isdigit() for c in chars):
+            return candidate if len(chars) >= MIN_NUMERIC_CODE_CHARS else None
+        return candidate if len(chars) >= MIN_CODE_CHARS else None
\ No newline at end of file
@@ -1,21 +1,26 @@
 """Format search results."""
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import logging
 
+from backend.core.retrieval.metadata_store import MetadataStore, ListMetadataStore
+
 logger = logging.getLogger(__name__)
 
 
 class ResultFormatter:
     """Formats raw search results into structured output."""
     
-    def __init__(self, metadata_entries: List[Dict]):
+    def __init__(self, metadata_entries: Union[MetadataStore, List[Dict]]):
+        if not isinstance(metadata_entries, MetadataStore):
+            metadata_entries = ListMetadataStore(metadata_entries)
         self.metadata_entries = metadata_entries
     
     def format_results(
         self, 
         distances: List[float], 
         indices: List[int],
-        include_distance: bool = True
+        include_distance: bool = True,
+        score_kind: Optional[str] = None,
     ) -> List[Dict]:
         """Map search results to metadata entries.
         
@@ -23,27 +28,38 @@ class ResultFormatter:
             distances: Similarity distances
             indices: Metadata indices
             include_distance: Whether to include distance in output
+            score_kind: What `distances` holds ("cosine", "rrf", "code"),
+                added to each result when given; `similarity` is only
+                emitted for "cosine", where it is the score itself
             
         Returns:
             List of formatted result dictionaries
         """
-        results = []
-        
+        n_entries = len(self.metadata_entries)
+        valid = []
         for dist, idx in zip(distances, indices):
-            if 0 <= idx < len(self.metadata_entries):
-                entry = self.metadata_entries[idx]
-                
-                result = {
-                    "index": idx,
-                    "metadata": entry
-                }
-                
-                if include_distance:
-                    result["distance"] = float(dist)
-                    result["similarity"] = float(1 - dist)  # Convert distance to similarity
-                
-                results.append(result)
+            if 0 <= idx < n_entries:
+                valid.append((dist, idx))
             else:
-                logger.warning(f"Invalid index {idx} (max: {len(self.metadata_entries)})")
+                logger.warning(f"Invalid index {idx} (max: {n_entries})")
+
+        entries = self.metadata_entries.get_many([idx for _, idx in valid])
+
+        results = []
+        for (dist, idx), entry in zip(valid, entries):
+            result = {
+                "index": idx,
+                "metadata": entry
+            }
+
+            if include_distance:
+                result["distance"] = float(dist)
+                if score_kind == "cosine":
+                    # inner product of unit vectors: already a similarity
+                    result["similarity"] = float(dist)
+            if score_kind is not None:
+                result["score_kind"] = score_kind
+
+            results.append(result)
         
-        return results
\ No newline at end of file
+        return results
@@ -2,20 +2,54 @@
 import logging
 import numpy as np
 import faiss
-from typing import Tuple, List
-from sentence_transformers import SentenceTransformer
+from typing import TYPE_CHECKING, Any, Dict, Tuple, List, Optional, Union
+from backend.core.encoders.base_encoder import BaseEncoder
+from backend.core.metrics import stage
 from backend import app_settings
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
 logger = logging.getLogger(__name__)
 
 
+def apply_search_params(index: faiss.Index, search_params: Optional[Dict[str, Any]]) -> None:
+    """Set search-time parameters such as nprobe/efSearch.
+
+    Goes through faiss.ParameterSpace so wrapped indexes (OPQ, IDMap) work.
+    """
+    if not search_params:
+        return
+    ps = faiss.ParameterSpace()
+    for name, value in search_params.items():
+        ps.set_index_parameter(index, name, value)
+
+
 class VectorSearchEngine:
-    """Handles embedding and FAISS search operations."""
+    """Handles embedding and FAISS search operations.
+
+    `model` is any encoder with SentenceTransformer's encode(): the torch
+    model or a BaseEncoder backend such as OnnxEncoder.
+    """
     
-    def __init__(self, model: SentenceTransformer, index: faiss.Index):
+    def __init__(
+        self,
+        model: Union["SentenceTransformer", BaseEncoder],
+        index: faiss.Index,
+        search_params: Optional[Dict[str, Any]] = None,
+        embeddings: Optional[np.ndarray] = None,
+        exact_filter_max: int = 20000
+    ):
         self.model = model
         self.index = index
         self._dimension = index.d
+        self.search_params = search_params or {}
+        # row-aligned embeddings (e.g. mmapped embeddings.npy): selective filters are scored exactly
+        self.embeddings = embeddings
+        self.exact_filter_max = exact_filter_max
+        apply_search_params(index, self.search_params)
+        if self.search_params:
+            logger.info(f"Applied search params: {self.search_params}")
     
     def embed_query(self, query: str) -> np.ndarray:
         """Convert text query to embedding vector.
@@ -26,20 +60,47 @@ class VectorSearchEngine:
         Returns:
             Normalized embedding vector
         """
-        embedding = self.model.encode(
-            query,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
+        with stage("embed"):
+            embedding = self.model.encode(
+                query,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
         logger.debug(f"Embedded query to {embedding.shape} vector")
         return embedding
+
+    def embed_queries(self, queries: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Embed several queries with a single encode call.
+
+        Args:
+            queries: Texts to embed
+            batch_size: Forward-pass batch size (defaults to all queries at once)
+
+        Returns:
+            (n, d) matrix of normalized embeddings
+        """
+        with stage("embed"):
+            embeddings = self.model.encode(
+                queries,
+                batch_size=batch_size or max(len(queries), 1),
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        logger.debug(f"Embedded {len(queries)} queries to {embeddings.shape} matrix")
+        return embeddings
     
-    def search(self, query_vector: np.ndarray, top_k: int) -> Tuple[List[float], List[int]]:
+    def search(
+        self,
+        query_vector: np.ndarray,
+        top_k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[List[float], List[int]]:
         """Search FAISS index for nearest neighbors.
         
         Args:
             query_vector: Query embedding
             top_k: Number of results to return (resolved at API layer)
+            allowed: Optional sorted row ids to restrict the search to
             
         Returns:
             Tuple of (distances, indices)
@@ -48,9 +109,114 @@ class VectorSearchEngine:
             query_vector = query_vector.reshape(1, -1)
         
         query_vector = query_vector.astype('float32')
+
+        if allowed is not None:
+            with stage("faiss"):
+                distances, indices = self._search_filtered(query_vector, top_k, allowed)
+            return distances[0], indices[0]
         
-        distances, indices = self.index.search(query_vector, top_k)
-        print(f"Search results distances: {distances}, indices: {indices}")
+        with stage("faiss"):
+            distances, indices = self.index.search(query_vector, top_k)
+        logger.debug("Search results distances: %s, indices: %s", distances, indices)
         
         logger.debug(f"Found {len(indices[0])} results")
-        return distances[0].tolist(), indices[0].tolist()
\ No newline at end of file
+        return distances[0].tolist(), indices[0].tolist()
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[List[List[float]], List[List[int]]]:
+        """Search FAISS index for several query vectors in one call.
+
+        Args:
+            query_vectors: (n, d) matrix of query embeddings
+            top_k: Number of results per query
+            allowed: Optional sorted row ids to restrict the search to
+
+        Returns:
+            Tuple of (distances, indices), one row per query
+        """
+        query_vectors = np.ascontiguousarray(query_vectors, dtype='float32')
+        if query_vectors.ndim == 1:
+            query_vectors = query_vectors.reshape(1, -1)
+
+        with stage("faiss"):
+            if allowed is not None:
+                return self._search_filtered(query_vectors, top_k, allowed)
+            distances, indices = self.index.search(query_vectors, top_k)
+        logger.debug(f"Batch search over {len(indices)} queries")
+        return distances.tolist(), indices.tolist()
+
+    def _search_filtered(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int,
+        allowed: np.ndarray
+    ) -> Tuple[List[List[float]], List[List[int]]]:
+        """Search restricted to `allowed` row ids, inside the search itself.
+
+        Small id sets are scored exactly against the stored embeddings
+        (a few thousand dot products beat probing an IVF/HNSW graph that
+        mostly holds excluded rows). Larger sets become a FAISS IDSelector.
+        Rows padded with -1 by FAISS are dropped.
+        """
+        n_queries = len(query_vectors)
+        if len(allowed) == 0:
+            return [[] for _ in range(n_queries)], [[] for _ in range(n_queries)]
+
+        if (
+            self.embeddings is not None
+            and len(allowed) <= self.exact_filter_max
+            and self.index.metric_type == faiss.METRIC_INNER_PRODUCT
+        ):
+            candidates = np.asarray(self.embeddings[allowed], dtype='float32')
+            scores = query_vectors @ candidates.T
+            k = min(top_k, len(allowed))
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            logger.debug(f"Exact filtered search over {len(allowed)} rows")
+            return np.take_along_axis(top_scores, order, axis=1).tolist(), allowed[top].tolist()
+
+        selector, keep_alive = self._selector(allowed)
+        distances, indices = self.index.search(query_vectors, top_k, params=self._filter_params(selector))
+        del keep_alive
+        logger.debug(f"IDSelector search over {len(allowed)} allowed rows")
+        out_d, out_i = [], []
+        for d_row, i_row in zip(distances, indices):
+            valid = i_row >= 0
+            out_d.append(d_row[valid].tolist())
+            out_i.append(i_row[valid].tolist())
+        return out_d, out_i
+
+    def _selector(self, allowed: np.ndarray):
+        """IDSelectorBitmap for large id sets, IDSelectorBatch (hash set) for small ones.
+
+        Returns the selector and the numpy buffer it points into, which must
+        outlive the search.
+        """
+        if len(allowed) * 64 > self.index.ntotal:
+            mask = np.zeros(int(allowed[-1]) + 1, dtype=bool)
+            mask[allowed] = True
+            bits = np.packbits(mask, bitorder='little')
+            # size is in bytes; ids past the end of the bitmap are rejected
+            return faiss.IDSelectorBitmap(len(bits), faiss.swig_ptr(bits)), bits
+        ids = np.ascontiguousarray(allowed, dtype='int64')
+        return faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids)), ids
+
+    def _filter_params(self, selector) -> faiss.SearchParameters:
+        """Search parameters carrying the selector and the index's current nprobe/efSearch."""
+        try:
+            ivf = faiss.extract_index_ivf(self.index)
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        except RuntimeError:
+            pass
+        inner = faiss.downcast_index(self.index)
+        while isinstance(inner, (faiss.IndexIDMap, faiss.IndexIDMap2, faiss.IndexPreTransform)):
+            inner = faiss.downcast_index(inner.index)
+        if isinstance(inner, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+        return faiss.SearchParameters(sel=selector)
@@ -0,0 +1,75 @@
+"""
+Throughput / p99 of query embedding + FAISS search with micro-batching on and off.
+
+Loads the configured model and index, then drives `--clients` concurrent
+threads through VectorSearchEngine directly (unbatched) and through
+QueryBatcher (batched), printing both runs side by side.
+
+    python -m backend.scripts.bench_batching --clients 32 --requests 50 --max-wait-ms 5
+"""
+
+from __future__ import annotations
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+import backend.app_settings as cfg
+from backend.core.resource_loader import load_model, load_index
+from backend.core.retrieval.vector_search import VectorSearchEngine
+from backend.core.retrieval.query_batcher import QueryBatcher
+
+QUERIES = ["παλέτες", "rakor 1/2", "φίλτρο λαδιού", "σωλήνας 3/8", "seal kit", "ράφι a12", "liebherr", "βάνα"]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _drive(fn: Callable[[str], object], clients: int, requests: int) -> Tuple[float, float, float]:
+    def worker(c: int) -> List[float]:
+        lat = []
+        for i in range(requests):
+            t0 = time.perf_counter()
+            fn(QUERIES[(c + i) % len(QUERIES)])
+            lat.append(time.perf_counter() - t0)
+        return lat
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [x for lat in pool.map(worker, range(clients)) for x in lat]
+    wall = time.perf_counter() - t0
+    return len(latencies) / wall, _percentile(latencies, 50) * 1000, _percentile(latencies, 99) * 1000
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark query micro-batching")
+    p.add_argument("--clients", type=int, default=32)
+    p.add_argument("--requests", type=int, default=50, help="Requests per client")
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--max-batch-size", type=int, default=32)
+    p.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = p.parse_args()
+
+    engine = VectorSearchEngine(model=load_model(cfg.DEFAULT_EMBEDDING_MODEL), index=load_index(cfg.FAISS_INDEX_FILE))
+
+    def unbatched(q: str):
+        return engine.search(engine.embed_query(q), top_k=args.top_k)
+
+    batcher = QueryBatcher(engine, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    def batched(q: str):
+        return batcher.search(q, args.top_k)
+
+    unbatched(QUERIES[0])  # warm up
+    print(f"{'mode':<10} {'qps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, fn in (("off", unbatched), ("on", batched)):
+        qps, p50, p99 = _drive(fn, args.clients, args.requests)
+        print(f"{name:<10} {qps:>8.1f} {p50:>8.1f} {p99:>8.1f}")
+    batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Query-encoding latency: PyTorch vs ONNX Runtime fp32 vs ONNX int8.
+
+Single-query latency (p50/p95/p99, the per-request cost on the server) and
+batch throughput (texts/s, the build cost) per backend, plus the cosine
+similarity of each ONNX variant to PyTorch. Needs an export_onnx directory.
+
+    python -m backend.scripts.bench_encoder --threads 1 2 4 --queries 300
+"""
+
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+import backend.app_settings as cfg
+from backend.core.encoders.onnx_encoder import OnnxEncoder, embedding_agreement
+from backend.scripts.export_onnx import sample_texts
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _bench(encoder, queries: List[str], batch_texts: List[str], batch_size: int) -> str:
+    encoder.encode(queries[0], normalize_embeddings=True)  # warm up
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        encoder.encode(q, normalize_embeddings=True)
+        lat.append((time.perf_counter() - t0) * 1000)
+    t0 = time.perf_counter()
+    encoder.encode(batch_texts, batch_size=batch_size, normalize_embeddings=True)
+    rate = len(batch_texts) / (time.perf_counter() - t0)
+    return f"{_percentile(lat, 50):>8.2f} {_percentile(lat, 95):>8.2f} {_percentile(lat, 99):>8.2f} {rate:>9.0f}"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark query encoding backends")
+    p.add_argument("--embedding-model", type=str, default=getattr(cfg, "DEFAULT_EMBEDDING_MODEL", None))
+    p.add_argument("--onnx-dir", type=str, default=str(getattr(cfg, "ONNX_MODEL_DIR", None) or cfg.EXPORT_DIR / "onnx_model"))
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 4], help="Intra-op threads to compare")
+    p.add_argument("--queries", type=int, default=300)
+    p.add_argument("--batch", type=int, default=1024, help="Texts for the throughput run")
+    p.add_argument("--batch-size", type=int, default=64)
+    p.add_argument("--corpus", type=str, default=str(cfg.EXPORT_DIR / "corpus.jsonl"))
+    args = p.parse_args()
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    texts = sample_texts(Path(args.corpus), max(args.queries, args.batch))
+    queries = (texts * (args.queries // len(texts) + 1))[:args.queries]
+    batch_texts = (texts * (args.batch // len(texts) + 1))[:args.batch]
+    reference = SentenceTransformer(args.embedding_model, device="cpu")
+
+    print(f"{len(queries)} single queries, {len(batch_texts)} texts for throughput (batch {args.batch_size})")
+    print(f"{'backend':<14} {'threads':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'texts/s':>9} {'min cos':>8}")
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        print(f"{'torch':<14} {threads:>7} {_bench(reference, queries, batch_texts, args.batch_size)} {1.0:>8.4f}")
+        for quantized in (False, True):
+            encoder = OnnxEncoder(Path(args.onnx_dir), quantized=quantized, threads=threads)
+            cos = embedding_agreement(reference, encoder, texts[:500])
+            name = f"onnx-{encoder.variant}"
+            print(f"{name:<14} {threads:>7} {_bench(encoder, queries, batch_texts, args.batch_size)} {cos['min']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Latency of filtered vector search vs filter selectivity.
+
+Uses the configured build (index.faiss, embeddings.npy next to it). For each
+selectivity a random id set of that size is searched three ways:
+
+    selector   FAISS search with an IDSelector (bitmap or batch) in the params
+    exact      dot products against the allowed rows of embeddings.npy
+    postfilter unfiltered search with over-fetch, results filtered afterwards
+               (the baseline the push-down replaces)
+
+and p50/p95 latency plus the mean number of results returned are printed.
+Post-filtering loses results once the filter is more selective than the
+over-fetch factor; the pushed-down paths always fill top_k when they can.
+
+    python -m backend.scripts.bench_filters --queries 200 --top-k 5
+"""
+
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+import backend.app_settings as cfg
+from backend.core.resource_loader import load_embeddings, load_index, load_metadata_store, load_search_params
+from backend.core.retrieval.vector_search import VectorSearchEngine
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _time(fn: Callable[[np.ndarray], Tuple[List[float], List[int]]], queries: np.ndarray) -> str:
+    fn(queries[0])  # warm up
+    lat, found = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        _, ids = fn(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+        found.append(len(ids))
+    return f"{_percentile(lat, 50):>8.2f} {_percentile(lat, 95):>8.2f} {np.mean(found):>7.1f}"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark filtered FAISS search vs selectivity")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--selectivity", type=float, nargs="+", default=[50, 10, 1, 0.1, 0.01],
+                   help="Percent of rows passing the filter")
+    p.add_argument("--overfetch", type=int, default=10, help="Post-filter baseline fetches top_k * overfetch")
+    args = p.parse_args()
+
+    index_path = Path(cfg.FAISS_INDEX_FILE)
+    index = load_index(index_path)
+    slots = len(load_metadata_store(Path(cfg.META_DATA_FILE), mmap=True))
+    embeddings = load_embeddings(index_path, expected_rows=slots)
+    if embeddings is None:
+        raise SystemExit(f"embeddings.npy next to {index_path} is required")
+    # the model is not needed: queries are perturbed stored vectors
+    engine = VectorSearchEngine(model=None, index=index, search_params=load_search_params(index_path),
+                                embeddings=embeddings, exact_filter_max=0)
+    exact = VectorSearchEngine(model=None, index=index, embeddings=embeddings, exact_filter_max=index.ntotal)
+
+    rnd = np.random.default_rng(0)
+    n = index.ntotal
+    queries = np.asarray(embeddings[rnd.integers(0, n, args.queries)], dtype="float32")
+    queries += rnd.normal(0, 0.05, queries.shape).astype("float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"{n} vectors, {len(queries)} queries, top_k={args.top_k}")
+    print(f"{'select %':>9} {'rows':>9}  {'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'found':>7}")
+    for pct in args.selectivity:
+        size = max(1, int(n * pct / 100))
+        allowed = np.sort(rnd.choice(n, size, replace=False)).astype(np.int64)
+        fetch = args.top_k * args.overfetch
+
+        def postfilter(q):
+            _, ids = engine.search_batch(q.reshape(1, -1), top_k=fetch)
+            ids = ids[0]
+            hits = [i for i, ok in zip(ids, np.isin(ids, allowed)) if ok][:args.top_k]
+            return [], hits
+
+        modes = [
+            ("selector", lambda q: engine.search(q, top_k=args.top_k, allowed=allowed)),
+            ("exact", lambda q: exact.search(q, top_k=args.top_k, allowed=allowed)),
+            ("postfilter", postfilter),
+        ]
+        for name, fn in modes:
+            print(f"{pct:>9g} {size:>9}  {name:<10} {_time(fn, queries)}")
+
+
+if __name__ == "__main__":
+    main()
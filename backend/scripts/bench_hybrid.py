@@ -0,0 +1,104 @@
+"""
+Size and latency of the BM25 lexical index, and of hybrid vs dense retrieval.
+
+Uses the configured build (index.faiss, metadata.jsonl, lexical.bm25 next
+to them). Prints on-disk sizes, BM25 build and load time, then p50/p95/p99
+latency per query for BM25 alone, dense retrieval (embed + FAISS) and
+hybrid retrieval (both in parallel + RRF) through QueryPipeline with caches
+off. Queries are sampled from metadata values unless --queries is given.
+
+    python -m backend.scripts.bench_hybrid --queries 300 --top-k 5
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import backend.app_settings as cfg
+from backend.core.pipeline import QueryPipeline
+from backend.core.resource_loader import LEXICAL_INDEX_DIR, load_index, load_metadata_store, load_model
+from backend.core.retrieval.lexical_index import BM25Index, tokenize
+from backend.core.retrieval.query_processor import QueryProcessor
+from backend.core.retrieval.result_formatter import ResultFormatter
+from backend.core.retrieval.vector_search import VectorSearchEngine
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _size_mb(path: Path) -> float:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir()) / 1e6
+    return path.stat().st_size / 1e6 if path.exists() else 0.0
+
+
+def _sample_queries(metadata_path: Path, n: int) -> List[str]:
+    """Two to three terms taken from random metadata entries."""
+    rnd = random.Random(0)
+    with metadata_path.open("r", encoding="utf-8") as f:
+        entries = [json.loads(line) for _, line in zip(range(50_000), f)]
+    queries = []
+    while len(queries) < n:
+        values = " ".join(str(v) for v in rnd.choice(entries).get("metadata", {}).values())
+        terms = tokenize(values)
+        if terms:
+            queries.append(" ".join(rnd.sample(terms, min(len(terms), rnd.randint(2, 3)))))
+    return queries
+
+
+def _time(fn: Callable[[str], object], queries: List[str]) -> str:
+    fn(queries[0])  # warm up
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+    return f"{_percentile(lat, 50):>8.2f} {_percentile(lat, 95):>8.2f} {_percentile(lat, 99):>8.2f}"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the BM25 index and hybrid retrieval")
+    p.add_argument("--queries", type=int, default=300)
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--candidates", type=int, default=50, help="Per-retriever depth before fusion")
+    p.add_argument("--rebuild", action="store_true", help="Time a fresh BM25 build from metadata.jsonl")
+    args = p.parse_args()
+
+    index_path = Path(cfg.FAISS_INDEX_FILE)
+    metadata_path = Path(cfg.META_DATA_FILE)
+    lexical_dir = index_path.parent / LEXICAL_INDEX_DIR
+
+    if args.rebuild or not lexical_dir.exists():
+        t0 = time.perf_counter()
+        BM25Index.from_jsonl(metadata_path).save(lexical_dir)
+        print(f"BM25 build: {time.perf_counter() - t0:.2f}s")
+    t0 = time.perf_counter()
+    lexical = BM25Index.load(lexical_dir)
+    print(f"BM25 load (mmap): {(time.perf_counter() - t0) * 1000:.1f} ms, "
+          f"{len(lexical.terms)} terms, {len(lexical)} docs")
+    print(f"Size on disk: lexical.bm25 {_size_mb(lexical_dir):.1f} MB, index.faiss {_size_mb(index_path):.1f} MB, "
+          f"metadata.jsonl {_size_mb(metadata_path):.1f} MB")
+
+    engine = VectorSearchEngine(model=load_model(cfg.DEFAULT_EMBEDDING_MODEL), index=load_index(index_path))
+    formatter = ResultFormatter(load_metadata_store(metadata_path))
+    dense = QueryPipeline(QueryProcessor(), engine, formatter)
+    hybrid = QueryPipeline(QueryProcessor(), engine, formatter, lexical_index=lexical, hybrid_candidates=args.candidates)
+
+    queries = _sample_queries(metadata_path, args.queries)
+    print(f"\n{len(queries)} queries, top_k={args.top_k}")
+    print(f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print(f"{'bm25':<8} {_time(lambda q: lexical.search(q, args.candidates), queries)}")
+    print(f"{'dense':<8} {_time(lambda q: dense.search(q, args.top_k), queries)}")
+    print(f"{'hybrid':<8} {_time(lambda q: hybrid.search(q, args.top_k), queries)}")
+    hybrid.lexical_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
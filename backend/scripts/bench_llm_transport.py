@@ -0,0 +1,172 @@
+"""
+Check the LLM transport against the fake OpenAI-compatible server.
+
+Starts backend.scripts.fake_llm_server in-process and runs OpenAIClient
+through four scenarios, each with and without the feature under test:
+
+    pooling    sequential calls: one pooled client vs a new client per call
+               (connections opened, as counted by the fake server)
+    errors     --error-rate of the requests fail with 503: success rate
+               without retries vs with LLM_MAX_RETRIES-style retries
+    tail       --slow-rate of the requests take --slow-ms longer:
+               p50/p95/p99 without and with hedging
+    deadline   the upstream is slower than the request budget: the call
+               must fail with LLMTimeoutError once the budget is spent
+
+    python -m backend.scripts.bench_llm_transport --requests 200 --concurrency 16
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from backend.clients.openai_client import OpenAIClient
+from backend.clients.transport import LLM_HEDGES, LLM_RETRIES, LLMTimeoutError, LLMTransport
+from backend.scripts import fake_llm_server
+
+
+def _serve(port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(fake_llm_server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Fake LLM server failed to start")
+        time.sleep(0.02)
+    return server, thread
+
+
+def _client(base_url: str, **transport) -> OpenAIClient:
+    return OpenAIClient(api_key="fake", model="fake-model", base_url=base_url, transport=LLMTransport(seed=0, **transport))
+
+
+def _upstream(base_url: str) -> Dict[str, int]:
+    return httpx.get(base_url.replace("/v1", "/stats")).json()
+
+
+async def _run(client: OpenAIClient, requests: int, concurrency: int):
+    """Fire `requests` agenerate calls; returns (latencies of successes, failures)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await client.agenerate(f"question {i}")
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, failures
+
+
+async def _tail_run(client: OpenAIClient, requests: int, concurrency: int, reseed):
+    """Warm the client's latency window (so the p95 hedge delay is known), then measure."""
+    await _run(client, 40, concurrency)
+    reseed()
+    return await _run(client, requests, concurrency)
+
+
+def _pct(latencies: List[float]) -> str:
+    if not latencies:
+        return "n/a"
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return f"p50 {p50:.0f}ms  p95 {p95:.0f}ms  p99 {p99:.0f}ms"
+
+
+def main():
+    p = argparse.ArgumentParser(description="LLM transport checks against the fake LLM server")
+    p.add_argument("--port", type=int, default=8011)
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--latency-ms", type=float, default=100.0)
+    p.add_argument("--error-rate", type=float, default=0.2)
+    p.add_argument("--slow-rate", type=float, default=0.05)
+    p.add_argument("--slow-ms", type=float, default=2000.0)
+    args = p.parse_args()
+    # one warning per retry would bury the results
+    logging.getLogger("backend.clients.transport").setLevel(logging.ERROR)
+
+    server, thread = _serve(args.port)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    ok = True
+    try:
+        print("pooling")
+        n = min(args.requests, 50)
+        fake_llm_server.configure(latency_ms=0)
+        pooled = _client(base_url)
+        for i in range(n):
+            pooled.generate(f"question {i}")
+        pooled_conns = _upstream(base_url)["connections"]
+        fake_llm_server.configure(latency_ms=0)
+        for i in range(n):
+            _client(base_url).generate(f"question {i}")
+        fresh_conns = _upstream(base_url)["connections"]
+        print(f"  {n} calls: pooled client {pooled_conns} connection(s), client per call {fresh_conns}")
+        ok &= pooled_conns < fresh_conns
+
+        print(f"errors ({args.error_rate:.0%} injected 503s)")
+        rates = {}
+        for retries in (0, 2):
+            fake_llm_server.configure(latency_ms=args.latency_ms, error_rate=args.error_rate)
+            before = LLM_RETRIES.total()
+            latencies, failures = asyncio.run(_run(_client(base_url, max_retries=retries), args.requests, args.concurrency))
+            rates[retries] = len(latencies) / args.requests
+            print(f"  retries={retries}: success {rates[retries]:.1%}, "
+                  f"{LLM_RETRIES.total() - before:.0f} retries, {_pct(latencies)}")
+        ok &= rates[2] > rates[0]
+
+        print(f"tail ({args.slow_rate:.0%} of requests +{args.slow_ms:.0f}ms)")
+        p99 = {}
+        for hedge in (False, True):
+            tail = dict(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5,
+                        slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+            fake_llm_server.configure(**tail)
+            client = _client(base_url, hedge=hedge, hedge_min_samples=20)
+            before = LLM_HEDGES.total()
+            latencies, failures = asyncio.run(_tail_run(
+                client, args.requests, args.concurrency, lambda: fake_llm_server.configure(**tail, seed=1)
+            ))
+            p99[hedge] = float(np.percentile(latencies, 99)) if latencies else float("inf")
+            delay = client.transport.hedge_delay_s()
+            print(f"  hedge={hedge}: {_pct(latencies)}, {LLM_HEDGES.total() - before:.0f} hedged, "
+                  f"upstream requests {_upstream(base_url)['requests']}"
+                  + (f", hedge delay {delay * 1000:.0f}ms" if delay else ""))
+        ok &= p99[True] < p99[False]
+
+        print("deadline (upstream 3s, request budget 1s)")
+        fake_llm_server.configure(latency_ms=3000)
+        client = _client(base_url, request_budget_s=1.0)
+        t0 = time.perf_counter()
+        try:
+            client.generate("slow question")
+            outcome = "answered"
+        except LLMTimeoutError:
+            outcome = "LLMTimeoutError"
+        elapsed = time.perf_counter() - t0
+        print(f"  {outcome} after {elapsed:.2f}s")
+        ok &= outcome == "LLMTimeoutError" and elapsed < 1.5
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    print("✔ Transport checks passed" if ok else "✗ Some transport checks failed")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Memory and lookup benchmark: list-of-dicts metadata vs ColumnarMetadataStore.
+
+Uses an existing metadata.jsonl, or generates a synthetic Greek catalog
+with --rows when no file is given.
+
+    python -m backend.scripts.bench_metadata --metadata backend/storage/embeddings/metadata.jsonl
+    python -m backend.scripts.bench_metadata --rows 300000
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from backend.core.resource_loader import load_metadata
+from backend.core.retrieval.metadata_store import ColumnarMetadataStore, ListMetadataStore
+
+CATEGORIES = ["Ρακόρ", "Σωλήνες", "Φίλτρα", "Βάνες", "Παλέτες", "Τσιμούχες"]
+SHELVES = [f"Α{i:02d}" for i in range(40)] + [f"Β{i:02d}" for i in range(40)]
+
+
+def _synthetic(path: Path, rows: int) -> None:
+    rnd = random.Random(0)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(rows):
+            code = f"SKU{i:07d}"
+            meta = {
+                "Κωδικός": code,
+                "Περιγραφή": f"{rnd.choice(CATEGORIES)} {rnd.randint(1, 64)}/{rnd.choice([8, 16, 32])}\" {rnd.randint(100, 700)} bar",
+                "Κατηγορία": rnd.choice(CATEGORIES),
+                "Ράφι": rnd.choice(SHELVES),
+                "Απόθεμα": str(rnd.randint(0, 500)),
+                "Τιμή": f"{rnd.uniform(1, 900):.2f}",
+            }
+            f.write(json.dumps({"id": code, "metadata": meta}, ensure_ascii=False) + "\n")
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+
+def _lookup_us(store, n: int, k: int) -> float:
+    rnd = random.Random(1)
+    batches = [[rnd.randrange(n) for _ in range(k)] for _ in range(2000)]
+    t0 = time.perf_counter()
+    for idxs in batches:
+        store.get_many(idxs)
+    return (time.perf_counter() - t0) / len(batches) * 1e6
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark metadata stores")
+    p.add_argument("--metadata", type=str, default=None, help="metadata.jsonl to load")
+    p.add_argument("--rows", type=int, default=300_000, help="Synthetic rows when --metadata is not given")
+    p.add_argument("--top-k", type=int, default=5)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.metadata) if args.metadata else Path(tmp) / "metadata.jsonl"
+        if not args.metadata:
+            _synthetic(path, args.rows)
+
+        entries, list_bytes, list_s = _measure(lambda: load_metadata(path))
+        list_store = ListMetadataStore(entries)
+        n = len(entries)
+        list_lookup = _lookup_us(list_store, n, args.top_k)
+        del entries, list_store
+
+        store, col_bytes, col_s = _measure(lambda: ColumnarMetadataStore.from_jsonl(path))
+        col_lookup = _lookup_us(store, n, args.top_k)
+
+    print(f"rows: {n}")
+    print(f"{'store':<10} {'memory MB':>10} {'load s':>8} {'top-' + str(args.top_k) + ' gather us':>16}")
+    print(f"{'list':<10} {list_bytes / 2**20:>10.1f} {list_s:>8.2f} {list_lookup:>16.1f}")
+    print(f"{'columnar':<10} {col_bytes / 2**20:>10.1f} {col_s:>8.2f} {col_lookup:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Embedding throughput vs number of encode worker processes.
+
+Encodes the same texts (an existing corpus.jsonl, or synthetic Greek
+product lines) with the single-process model and then with
+ParallelEncoder for each worker count, and prints docs/s and speedup
+over the single process. Threads per worker default to cores / workers,
+so every run uses the whole machine.
+
+    python -m backend.scripts.bench_parallel_encode --workers 2 4 8 --docs 20000
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+import backend.app_settings as cfg
+from backend.build_index.parallel_encode import ParallelEncoder
+
+CATEGORIES = ["Ρακόρ", "Σωλήνες", "Φίλτρα", "Βάνες", "Παλέτες", "Τσιμούχες"]
+
+
+def _texts(corpus: Optional[Path], n: int) -> List[str]:
+    if corpus and corpus.exists():
+        with corpus.open("r", encoding="utf-8") as f:
+            texts = [json.loads(line)["text"] for line in f if line.strip()]
+        return texts[:n]
+    rnd = random.Random(0)
+    return [
+        f"Κωδικός: SKU{i:07d}|Περιγραφή: {rnd.choice(CATEGORIES)} {rnd.randint(1, 64)}/{rnd.choice([8, 16, 32])}\" "
+        f"{rnd.randint(100, 700)} bar|Ράφι: Α{rnd.randint(0, 39):02d}"
+        for i in range(n)
+    ]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure parallel embedding speedup per worker count")
+    p.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    p.add_argument("--docs", type=int, default=10_000)
+    p.add_argument("--corpus", type=str, default=None, help="corpus.jsonl to take texts from (default: synthetic)")
+    p.add_argument("--model", type=str, default=getattr(cfg, "DEFAULT_EMBEDDING_MODEL", None))
+    p.add_argument("--batch-size", type=int, default=32)
+    p.add_argument("--shard-size", type=int, default=512)
+    args = p.parse_args()
+
+    texts = _texts(Path(args.corpus) if args.corpus else None, args.docs)
+    print(f"Encoding {len(texts)} texts with {args.model}")
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model, device="cpu")
+    model.encode(texts[:64], batch_size=args.batch_size)  # warmup
+    t0 = time.perf_counter()
+    baseline = model.encode(texts, batch_size=args.batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    base_s = time.perf_counter() - t0
+    del model
+
+    print(f"\n{'workers':>7} {'threads/w':>9} {'seconds':>8} {'docs/s':>9} {'speedup':>8} {'max |diff|':>10}")
+    print(f"{1:>7} {'-':>9} {base_s:>8.1f} {len(texts) / base_s:>9.0f} {1.0:>8.2f} {0.0:>10.1e}")
+    for n in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            enc = ParallelEncoder(args.model, n, shard_size=args.shard_size, checkpoint_dir=Path(tmp))
+            try:
+                # start the pool and load the worker models outside the timed run
+                enc.encode(texts[:args.shard_size * n], batch_size=args.batch_size)
+                t0 = time.perf_counter()
+                embs = enc.encode(texts, batch_size=args.batch_size)
+                secs = time.perf_counter() - t0
+            finally:
+                enc.close()
+        diff = float(np.abs(embs - baseline).max())
+        print(f"{n:>7} {enc.threads_per_worker:>9} {secs:>8.1f} {len(texts) / secs:>9.0f} {base_s / secs:>8.2f} {diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
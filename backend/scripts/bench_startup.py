@@ -0,0 +1,97 @@
+"""
+Cold start: time until the server listens, is ready, and serves its first query.
+
+Starts `uvicorn backend.server:app` (one worker) per run and polls:
+
+    listening     first 200 from GET /health (port bound, resources may be loading)
+    ready         first 200 from GET /ready
+    first query   first 200 from POST /query/batch (retrieval only, no LLM call)
+
+It also prints the latency of the first query and of a second, different
+one (different, so the retrieval cache does not answer it); warmup should
+make them close. Per-resource load times come from /ready.
+Compare runs with WARMUP_QUERIES = [] and STARTUP_BACKGROUND = False in
+backend/app_settings.py.
+
+    python -m backend.scripts.bench_startup --runs 3
+"""
+
+from __future__ import annotations
+import argparse
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+
+def _poll(client: httpx.Client, method: str, url: str, deadline: float, **kwargs) -> float:
+    """Retry until a 200 response; returns the time it arrived (perf_counter)."""
+    while time.perf_counter() < deadline:
+        try:
+            if client.request(method, url, **kwargs).status_code == 200:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{method} {url} not 200 before the timeout")
+
+
+def _run(port: int, timeout: float, query: str, second_query: str) -> Dict[str, float]:
+    base = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, "-m", "uvicorn", "backend.server:app", "--host", "127.0.0.1", "--port", str(port)]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = t0 + timeout
+    try:
+        with httpx.Client(timeout=60.0) as client:
+            listening = _poll(client, "GET", f"{base}/health", deadline)
+            ready = _poll(client, "GET", f"{base}/ready", deadline)
+            # sent right after /ready answered, so first - ready is the first query's latency
+            first = _poll(client, "POST", f"{base}/query/batch", deadline, json={"queries": [query], "top_k": 5})
+            q0 = time.perf_counter()
+            client.post(f"{base}/query/batch", json={"queries": [second_query], "top_k": 5}).raise_for_status()
+            second_ms = (time.perf_counter() - q0) * 1000
+            status = client.get(f"{base}/ready").json()
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    out = {
+        "listening_s": listening - t0,
+        "ready_s": ready - t0,
+        "first_query_s": first - t0,
+        "first_query_ms": (first - ready) * 1000,
+        "second_query_ms": second_ms,
+    }
+    out.update({f"load_{name}_s": r["seconds"] or 0.0 for name, r in status["resources"].items()})
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure cold start to first served query")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--port", type=int, default=8110)
+    p.add_argument("--timeout", type=float, default=600.0)
+    p.add_argument("--query", type=str, default="βίδα inox M8")
+    p.add_argument("--second-query", type=str, default="ρακόρ ορειχάλκινο 3/4")
+    args = p.parse_args()
+
+    runs: List[Dict[str, float]] = []
+    for i in range(args.runs):
+        runs.append(_run(args.port, args.timeout, args.query, args.second_query))
+        print(f"run {i + 1}: ready {runs[-1]['ready_s']:.2f}s, first query {runs[-1]['first_query_s']:.2f}s")
+
+    print(f"\n{'metric':<22} {'median':>10} {'min':>10} {'max':>10}")
+    for key in runs[0]:
+        values = [r.get(key, 0.0) for r in runs]
+        print(f"{key:<22} {statistics.median(values):>10.3f} {min(values):>10.3f} {max(values):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Time-to-first-byte of /query/stream versus total latency of /query.
+
+Run against a server whose LLM points at the fake server
+(backend.scripts.fake_llm_server) so numbers are reproducible:
+
+    python -m backend.scripts.fake_llm_server --latency-ms 500 --token-ms 20 &
+    uvicorn backend.server:app --port 8000 &
+    python -m backend.scripts.bench_ttfb --requests 20
+
+Use distinct queries (or disable the answer cache) so every request hits the LLM.
+"""
+
+from __future__ import annotations
+import argparse
+import statistics
+import time
+
+import httpx
+
+
+def _stream_once(client: httpx.Client, base_url: str, query: str, top_k: int):
+    t0 = time.perf_counter()
+    first_byte = first_delta = None
+    with client.stream("POST", f"{base_url}/query/stream", json={"query": query, "top_k": top_k}) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            now = time.perf_counter()
+            if first_byte is None:
+                first_byte = now - t0
+            if first_delta is None and line.startswith("event: delta"):
+                first_delta = now - t0
+    return first_byte, first_delta, time.perf_counter() - t0
+
+
+def _blocking_once(client: httpx.Client, base_url: str, query: str, top_k: int) -> float:
+    t0 = time.perf_counter()
+    client.post(f"{base_url}/query", json={"query": query, "top_k": top_k}).raise_for_status()
+    return time.perf_counter() - t0
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure streaming TTFB vs blocking /query latency")
+    p.add_argument("--base-url", type=str, default="http://127.0.0.1:8000")
+    p.add_argument("--requests", type=int, default=20)
+    p.add_argument("--query", type=str, default="rakor")
+    p.add_argument("--top-k", type=int, default=5)
+    args = p.parse_args()
+
+    ttfb, ttfd, stream_total, blocking = [], [], [], []
+    with httpx.Client(timeout=300.0) as client:
+        for i in range(args.requests):
+            fb, fd, total = _stream_once(client, args.base_url, f"{args.query} {i}", args.top_k)
+            ttfb.append(fb)
+            ttfd.append(fd or total)
+            stream_total.append(total)
+            blocking.append(_blocking_once(client, args.base_url, f"{args.query} b{i}", args.top_k))
+
+    ms = lambda xs: f"{statistics.median(xs) * 1000:.0f} ms"
+    print(f"/query/stream first byte (results): {ms(ttfb)}")
+    print(f"/query/stream first token:          {ms(ttfd)}")
+    print(f"/query/stream complete:             {ms(stream_total)}")
+    print(f"/query complete:                    {ms(blocking)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-worker memory and cold-start time as the uvicorn worker count grows.
+
+For each worker count, starts `uvicorn backend.server:app --workers N`,
+waits until every worker logs "Application startup complete" and GET /ready
+answers 200 repeatedly (resources load in the background), then reads
+RSS and PSS (proportional set size: shared pages split across the
+processes mapping them) of each worker from /proc. Compare runs with
+MMAP_RESOURCES off and on in backend/app_settings.py. Linux only.
+
+    python -m backend.scripts.bench_workers --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+
+def _children(pid: int) -> List[int]:
+    out: List[int] = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        text = (task / "children").read_text().split()
+        out += [int(c) for c in text]
+    return out
+
+
+def _mem_kb(pid: int) -> Dict[str, int]:
+    mem = {"rss": 0, "pss": 0}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("Rss", "Pss"):
+            mem[key.lower()] = int(rest.split()[0])
+    return mem
+
+
+def _wait_ready(url: str, workers: int, deadline: float) -> None:
+    """Poll /ready until it answers 200 often enough in a row that every worker has likely loaded."""
+    streak = 0
+    with httpx.Client(timeout=10.0) as client:
+        while streak < 3 * workers:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{url} not ready before the timeout")
+            streak = streak + 1 if client.get(url).status_code == 200 else 0
+            time.sleep(0.01)
+
+
+def _run(workers: int, port: int, timeout: float) -> Dict[str, float]:
+    cmd = [sys.executable, "-m", "uvicorn", "backend.server:app",
+           "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True)
+    ready = 0
+    try:
+        while ready < workers:
+            line = proc.stderr.readline()
+            if not line:
+                raise RuntimeError("uvicorn exited before all workers were ready")
+            if "Application startup complete" in line:
+                ready += 1
+            if time.perf_counter() - t0 > timeout:
+                raise TimeoutError(f"{workers} workers not ready after {timeout}s")
+        _wait_ready(f"http://127.0.0.1:{port}/ready", workers, t0 + timeout)
+        cold_start = time.perf_counter() - t0
+        pids = _children(proc.pid)
+        # uvicorn's supervisor may spawn a resource tracker; workers are the ones holding the app
+        mems = [_mem_kb(p) for p in pids]
+        mems = sorted(mems, key=lambda m: m["rss"], reverse=True)[:workers]
+        return {
+            "cold_start_s": cold_start,
+            "rss_mb_per_worker": sum(m["rss"] for m in mems) / len(mems) / 1024,
+            "pss_mb_per_worker": sum(m["pss"] for m in mems) / len(mems) / 1024,
+            "pss_mb_total": sum(m["pss"] for m in mems) / 1024,
+        }
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure RSS/PSS per worker and cold start vs worker count")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    p.add_argument("--port", type=int, default=8100)
+    p.add_argument("--timeout", type=float, default=600.0)
+    args = p.parse_args()
+
+    print(f"{'workers':>7} {'cold start s':>12} {'RSS MB/worker':>14} {'PSS MB/worker':>14} {'PSS MB total':>13}")
+    for n in args.workers:
+        r = _run(n, args.port, args.timeout)
+        print(f"{n:>7} {r['cold_start_s']:>12.1f} {r['rss_mb_per_worker']:>14.0f} "
+              f"{r['pss_mb_per_worker']:>14.0f} {r['pss_mb_total']:>13.0f}")
+
+
+if __name__ == "__main__":
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("bench_workers needs Linux /proc/<pid>/smaps_rollup")
+    main()
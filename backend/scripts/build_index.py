@@ -3,19 +3,36 @@ Builds the warehouse vector index:
 - Read Excel
 - Build corpus
 - Encode embeddings
-- Save embeddings.npy, metadata.jsonl, index.faiss
+- Save embeddings.npy, metadata.jsonl, index.faiss (+ search_params.json)
+- Precompute the per-row LLM context strings (context.cols)
 - Export rows.jsonl, corpus.jsonl
+
+With --stream the file is processed in fixed-size chunks end to end
+(read -> corpus -> encode -> index add -> write), keeping memory flat.
+
+With --publish the finished build is copied into a new version directory
+under INDEX_VERSIONS_DIR and activated; running servers hot-reload it.
 """
 
 from __future__ import annotations
 import argparse
+import json
+import os
+import time
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
 import backend.app_settings as cfg
 from backend.build_index.reader import ExcelReader
 from backend.build_index.corpus import SimpleCorpusBuilder
-from backend.build_index.embeddings import EmbeddingManager
+from backend.build_index.embeddings import (
+    EmbeddingManager, doc_keys, save_build_state, write_context_cols, write_index, write_lexical_index,
+    write_metadata_cols,
+)
+from backend.build_index.faiss_index import INDEX_TYPES, save_search_params
+from backend.build_index.incremental import IncrementalIndexUpdater
+from backend.build_index.streaming import NpyWriter, StageStats, StreamingIndexWriter, peak_rss_mb
+from backend.core.index_versions import publish_version
 from backend.scripts.env_check import check_and_install_packages
 
 
@@ -28,6 +45,20 @@ class IndexBuilder:
         out_dir: Optional[Path] = None,
         embedding_model: Optional[str] = None,
         batch_size: int = 32,
+        index_type: str = "auto",
+        index_params: Optional[Dict[str, Any]] = None,
+        incremental: bool = False,
+        embedding_cache_dir: Optional[Path] = None,
+        stream: bool = False,
+        chunk_size: int = 10_000,
+        train_points: int = 100_000,
+        encode_workers: int = 1,
+        threads_per_worker: Optional[int] = None,
+        shard_size: int = 2048,
+        encoder: str = "torch",
+        onnx_dir: Optional[Path] = None,
+        onnx_quantized: bool = True,
+        onnx_threads: Optional[int] = None,
     ):
         if not excel_path.exists():
             raise FileNotFoundError(f"Excel not found: {excel_path}")
@@ -38,6 +69,22 @@ class IndexBuilder:
         self.out_dir = Path(out_dir) if out_dir else (cfg.EXPORT_DIR / "embeddings")
         self.embedding_model = embedding_model or getattr(cfg, "DEFAULT_EMBEDDING_MODEL", None)
         self.batch_size = batch_size
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.incremental = incremental
+        self.embedding_cache_dir = embedding_cache_dir
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.train_points = train_points
+        self.encode_workers = encode_workers
+        self.threads_per_worker = threads_per_worker
+        self.shard_size = shard_size
+        self.encoder = encoder
+        self.onnx_dir = onnx_dir
+        self.onnx_quantized = onnx_quantized
+        self.onnx_threads = onnx_threads
+        self.update_report: Optional[Dict[str, Any]] = None
+        self.stream_report: Optional[Dict[str, Any]] = None
 
         # runtime state
         self.reader = ExcelReader()
@@ -73,12 +120,38 @@ class IndexBuilder:
         builder.export_corpus_jsonl(self.corpus_path)
         print(f"✔ Saved corpus: {self.corpus_path.resolve()} ({len(self.docs)} docs)")
 
-    def encode_and_save(self) -> None:
-        emb_mgr = EmbeddingManager(model_name=self.embedding_model) if self.embedding_model else EmbeddingManager()
-        self.embeddings = emb_mgr.encode_from_corpus_or_rows(
-            corpus_path=self.corpus_path, rows=self.rows, batch_size=self.batch_size
+    def _embedding_manager(self) -> EmbeddingManager:
+        model_kwargs = {"model_name": self.embedding_model} if self.embedding_model else {}
+        return EmbeddingManager(
+            cache_dir=self.embedding_cache_dir,
+            workers=self.encode_workers,
+            threads_per_worker=self.threads_per_worker,
+            shard_size=self.shard_size,
+            # finished shards survive an interrupted build and are skipped on re-run
+            checkpoint_dir=self.out_dir / "encode_shards",
+            encoder=self.encoder,
+            onnx_dir=self.onnx_dir,
+            onnx_quantized=self.onnx_quantized,
+            onnx_threads=self.onnx_threads,
+            **model_kwargs,
         )
-        self.saved_dir = emb_mgr.save(self.out_dir)
+
+    def encode_and_save(self) -> None:
+        emb_mgr = self._embedding_manager()
+        try:
+            if self.incremental:
+                updater = IncrementalIndexUpdater(emb_mgr, self.out_dir)
+                if updater.can_update(self.index_type):
+                    self.update_report = updater.run(self.docs, batch_size=self.batch_size)
+                    self.saved_dir = self.out_dir
+                    return
+                print("No compatible previous build (model/index type), doing a full build")
+            self.embeddings = emb_mgr.encode_from_corpus_or_rows(
+                corpus_path=self.corpus_path, rows=self.rows, batch_size=self.batch_size
+            )
+        finally:
+            emb_mgr.close()
+        self.saved_dir = emb_mgr.save(self.out_dir, index_type=self.index_type, index_params=self.index_params)
         print(f"✔ Saved embeddings dir: {self.saved_dir.resolve()}")
 
     def summary(self) -> Dict[str, Any]:
@@ -89,8 +162,8 @@ class IndexBuilder:
         info = {
             "excel_path": str(self.excel_path),
             "sheet": self.sheet,
-            "rows": len(self.rows),
-            "docs": len(self.docs),
+            "rows": self.stream_report["rows"] if self.stream_report else len(self.rows),
+            "docs": self.stream_report["docs"] if self.stream_report else len(self.docs),
             "embeddings_shape": tuple(self.embeddings.shape) if self.embeddings is not None else None,
             "rows_path": str(self.rows_path),
             "corpus_path": str(self.corpus_path),
@@ -98,13 +171,121 @@ class IndexBuilder:
             "embeddings_file": str(emb_path),
             "metadata_file": str(meta_path),
             "faiss_index_file": str(index_path) if index_path.exists() else None,
+            "index_type": self.index_type,
+            "incremental_update": self.update_report,
+            "stream": self.stream_report,
         }
         print("\nSummary:")
         for k, v in info.items():
             print(f"- {k}: {v}")
         return info
 
+    def stream_build(self) -> None:
+        """Full build in fixed-size chunks; only the current chunk and the
+        IVF/PQ training sample are held in memory."""
+        emb_mgr = self._embedding_manager()
+        stats = StageStats()
+        corpus_builder = SimpleCorpusBuilder()
+        index_writer = StreamingIndexWriter(self.index_type, self.index_params, train_points=self.train_points)
+        vectors = NpyWriter(self.out_dir / "embeddings.npy")
+        seen_ids: Dict[str, int] = {}
+        docs_state: Dict[str, List] = {}
+        n_rows = n_docs = 0
+        t_start = time.perf_counter()
+
+        # failures anywhere (read, metadata, index, BM25) stop the encode workers
+        # and leave no embeddings.npy.part / metadata.jsonl.tmp behind
+        tmp_meta = self.out_dir / "metadata.jsonl.tmp"
+        try:
+            chunks = self.reader.iter_chunks(self.excel_path, sheet=self.sheet, chunk_size=self.chunk_size)
+            with self.rows_path.open("w", encoding="utf-8") as rows_f, \
+                    self.corpus_path.open("w", encoding="utf-8") as corpus_f, \
+                    tmp_meta.open("w", encoding="utf-8") as meta_f:
+                while True:
+                    t = time.perf_counter()
+                    rows = next(chunks, None)
+                    if rows is None:
+                        break
+                    stats.add("read", t, len(rows))
+                    if n_rows == 0 and self.preview_rows > 0:
+                        print("\nPreview:")
+                        print(self.reader.preview(rows, n=self.preview_rows))
+
+                    t = time.perf_counter()
+                    docs = corpus_builder.build(rows, start=n_rows)
+                    for row, doc in zip(rows, docs):
+                        rows_f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                        corpus_f.write(json.dumps({"id": doc.id, "text": doc.text, "metadata": doc.metadata}, ensure_ascii=False) + "\n")
+                        meta_f.write(json.dumps({"id": doc.id, "metadata": doc.metadata}, ensure_ascii=False) + "\n")
+                    for slot, (key, doc) in enumerate(zip(doc_keys(docs, seen=seen_ids), docs), n_docs):
+                        docs_state[key] = [slot, doc.content_hash()]
+                    stats.add("corpus", t, len(docs))
+
+                    t = time.perf_counter()
+                    embs = emb_mgr.encode_docs(docs, batch_size=self.batch_size, verbose=False)
+                    stats.add("encode", t, len(docs))
+
+                    t = time.perf_counter()
+                    index_writer.add(embs)
+                    stats.add("index", t, len(docs))
+
+                    t = time.perf_counter()
+                    vectors.append(embs)
+                    stats.add("write", t, len(docs))
+
+                    n_rows += len(rows)
+                    n_docs += len(docs)
+                    print(f"  {n_rows} rows processed ({n_rows / (time.perf_counter() - t_start):.0f} rows/s)")
+            # free the encode workers before the index is finalized
+            emb_mgr.close()
+            os.replace(tmp_meta, self.out_dir / "metadata.jsonl")
+            print(f"✔ Read {n_rows} rows from sheet '{self.sheet}' in chunks of {self.chunk_size}")
+
+            t = time.perf_counter()
+            index, search_params = index_writer.finish()
+            write_index(self.out_dir, index)
+            save_search_params(self.out_dir, search_params)
+            stats.add("index", t, 0)
+            print(f"✓ Built {type(index).__name__} with {index.ntotal} vectors (search params: {search_params})")
+
+            t = time.perf_counter()
+            vectors.close()
+            write_metadata_cols(self.out_dir)
+            write_lexical_index(self.out_dir)
+            write_context_cols(self.out_dir)
+            save_build_state(self.out_dir, {
+                "model": emb_mgr.model_id,
+                "index_type": self.index_type,
+                "index_params": self.index_params,
+                "docs": docs_state,
+                "free_slots": [],
+            })
+            stats.add("write", t, 0)
+        except BaseException:
+            vectors.abort()
+            tmp_meta.unlink(missing_ok=True)
+            raise
+        finally:
+            emb_mgr.close()
+
+        stats.print_report()
+        self.saved_dir = self.out_dir
+        self.stream_report = {
+            "rows": n_rows,
+            "docs": n_docs,
+            "chunk_size": self.chunk_size,
+            "seconds": round(time.perf_counter() - t_start, 2),
+            "stages": stats.report(),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        print(f"✔ Saved rows: {self.rows_path.resolve()}")
+        print(f"✔ Saved corpus: {self.corpus_path.resolve()} ({n_docs} docs)")
+        print(f"✔ Saved embeddings dir: {self.saved_dir.resolve()}")
+
     def run(self) -> Dict[str, Any]:
+        if self.stream and not self.incremental:
+            self.stream_build()
+            return self.summary()
         self.read_rows()
         self.show_preview()
         self.export_rows()
@@ -121,9 +302,40 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("--out-dir", type=str, default=str(cfg.EXPORT_DIR / "embeddings"), help="Output dir for embeddings/index")
     p.add_argument("--embedding-model", type=str, default=getattr(cfg, "DEFAULT_EMBEDDING_MODEL", None), help="SentenceTransformer model name")
     p.add_argument("--batch-size", type=int, default=32, help="Embedding batch size")
+    p.add_argument("--index-type", type=str, default="auto", choices=INDEX_TYPES, help="FAISS index type")
+    p.add_argument("--nlist", type=int, default=None, help="IVF lists (default ~4*sqrt(n))")
+    p.add_argument("--nprobe", type=int, default=None, help="IVF lists probed at search time")
+    p.add_argument("--hnsw-m", type=int, default=None, help="HNSW neighbours per node")
+    p.add_argument("--ef-construction", type=int, default=None, help="HNSW efConstruction")
+    p.add_argument("--ef-search", type=int, default=None, help="HNSW efSearch")
+    p.add_argument("--pq-m", type=int, default=None, help="PQ sub-quantizers (must divide the dimension)")
+    p.add_argument("--pq-nbits", type=int, default=None, help="Bits per PQ code")
+    p.add_argument("--incremental", action="store_true", help="Only embed added/changed docs and patch the previous build")
+    p.add_argument("--embedding-cache-dir", type=str, default=None, help="Persistent embedding cache dir (opt-in, e.g. export/embedding_cache; off by default)")
+    p.add_argument("--no-embedding-cache", action="store_true", help="Encode every text, ignoring --embedding-cache-dir")
+    p.add_argument("--stream", action="store_true", help="Bounded-memory build: process the file in chunks end to end")
+    p.add_argument("--chunk-size", type=int, default=10_000, help="Rows per chunk with --stream")
+    p.add_argument("--encode-workers", type=int, default=1, help="Embedding worker processes (CPU builds)")
+    p.add_argument("--threads-per-worker", type=int, default=None, help="Torch threads per encode worker (default: cores / workers)")
+    p.add_argument("--shard-size", type=int, default=2048, help="Docs per encode shard / checkpoint")
+    p.add_argument("--train-points", type=int, default=100_000, help="IVF/PQ training sample buffered with --stream")
+    p.add_argument("--encoder", type=str, default="torch", choices=("torch", "onnx"), help="Embedding backend")
+    p.add_argument("--onnx-dir", type=str, default=str(getattr(cfg, "ONNX_MODEL_DIR", None) or cfg.EXPORT_DIR / "onnx_model"), help="export_onnx output used with --encoder onnx")
+    p.add_argument("--onnx-fp32", action="store_true", help="Use the fp32 ONNX model instead of int8")
+    p.add_argument("--onnx-threads", type=int, default=None, help="ONNX Runtime intra-op threads")
+    p.add_argument("--publish", action="store_true", help="Publish the build as a new index version and activate it")
+    p.add_argument("--versions-dir", type=str, default=str(getattr(cfg, "INDEX_VERSIONS_DIR", None) or cfg.EXPORT_DIR / "index_versions"), help="Root of the versioned index dirs")
+    p.add_argument("--version", type=str, default=None, help="Version name for --publish (default: UTC timestamp)")
+    p.add_argument("--keep-versions", type=int, default=3, help="Versions kept on disk after --publish (0 = all)")
     return p.parse_args()
 
 
+def index_params_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Collect the index build/search options that were set on the command line."""
+    names = ("nlist", "nprobe", "hnsw_m", "ef_construction", "ef_search", "pq_m", "pq_nbits")
+    return {n: getattr(args, n) for n in names if getattr(args, n) is not None}
+
+
 def main():
     check_and_install_packages()
     args = _parse_args()
@@ -141,9 +353,27 @@ def main():
         out_dir=Path(args.out_dir),
         embedding_model=args.embedding_model,
         batch_size=args.batch_size,
+        index_type=args.index_type,
+        index_params=index_params_from_args(args),
+        incremental=args.incremental,
+        embedding_cache_dir=None if args.no_embedding_cache or not args.embedding_cache_dir else Path(args.embedding_cache_dir),
+        stream=args.stream,
+        chunk_size=args.chunk_size,
+        train_points=args.train_points,
+        encode_workers=args.encode_workers,
+        threads_per_worker=args.threads_per_worker,
+        shard_size=args.shard_size,
+        encoder=args.encoder,
+        onnx_dir=Path(args.onnx_dir),
+        onnx_quantized=not args.onnx_fp32,
+        onnx_threads=args.onnx_threads,
     )
     builder.run()
 
+    if args.publish:
+        target = publish_version(builder.out_dir, Path(args.versions_dir), version=args.version, keep=args.keep_versions)
+        print(f"✔ Published and activated index version: {target.resolve()}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Build, delete, reload: an incremental build with deleted rows must still load.
+
+Runs a full build of a small synthetic catalog, deletes and adds docs with
+the incremental updater, then loads the directory the way the server does
+(validate_loaded, metadata store, embeddings.npy for exact filtered search)
+and checks that every remaining doc finds its own row. Vectors come from a
+hashing encoder, so no model is needed.
+
+    python -m backend.scripts.check_incremental --rows 50 --delete 3 --index-type flat
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+
+from backend.build_index.corpus import Doc
+from backend.build_index.embeddings import EmbeddingManager
+from backend.build_index.faiss_index import INDEX_TYPES
+from backend.build_index.incremental import IncrementalIndexUpdater
+from backend.core.index_versions import IndexValidationError, validate_loaded
+from backend.core.resource_loader import load_embeddings, load_index, load_metadata_store
+
+
+class HashingEmbeddingManager(EmbeddingManager):
+    """EmbeddingManager whose 'model' maps each text to a seeded random unit vector."""
+
+    def __init__(self, dim: int = 32):
+        self.model_name = self.model_id = f"hashing-{dim}"
+        self.model = SimpleNamespace(device="cpu")
+        self.dim = dim
+        self.cache = None
+        self.parallel = None
+        self.docs: List = []
+        self.embeddings = None
+
+    def _encode_texts(self, texts: List[str], batch_size: int, verbose: bool = True) -> np.ndarray:
+        out = np.empty((len(texts), self.dim), dtype="float32")
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+            v = np.random.default_rng(seed).standard_normal(self.dim)
+            out[i] = v / np.linalg.norm(v)
+        return out
+
+
+def _docs(ids: range) -> List[Doc]:
+    return [Doc(id=f"SKU{i}", text=f"προϊόν {i}", metadata={"Κωδικός": f"SKU{i}", "Περιγραφή": f"προϊόν {i}"}) for i in ids]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Check that incremental builds with deletions load and search")
+    p.add_argument("--rows", type=int, default=50)
+    p.add_argument("--delete", type=int, default=3, help="Docs removed by the incremental update")
+    p.add_argument("--add", type=int, default=1, help="Docs added by the same update (reuse freed slots)")
+    p.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    args = p.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        mgr = HashingEmbeddingManager()
+        mgr.encode_docs(_docs(range(args.rows)), verbose=False)
+        mgr.save(out_dir, index_type=args.index_type)
+
+        remaining = _docs(range(args.delete, args.rows + args.add))
+        IncrementalIndexUpdater(mgr, out_dir).run(remaining)
+
+        index = load_index(out_dir / "index.faiss", mmap=True)
+        metadata = load_metadata_store(out_dir / "metadata.jsonl", mmap=True)
+        print(f"index: {index.ntotal} vectors, metadata: {len(metadata)} rows")
+        try:
+            validate_loaded(out_dir, index, len(metadata), mgr.dim)
+            print("✔ validate_loaded accepts the build")
+        except IndexValidationError as e:
+            print(f"✗ validate_loaded: {e}")
+            ok = False
+
+        embeddings = load_embeddings(out_dir / "index.faiss", expected_rows=len(metadata))
+        if embeddings is None:
+            print("✗ embeddings.npy rejected (exact filtered search would be off)")
+            ok = False
+        else:
+            print(f"✔ embeddings.npy loaded ({len(embeddings)} rows)")
+
+        vectors = mgr._encode_texts([d.text for d in remaining], batch_size=len(remaining))
+        _, ids = index.search(vectors, 1)
+        found = [metadata.get(int(row))["id"] if row >= 0 else None for row in ids[:, 0]]
+        misses = sum(f != d.id for f, d in zip(found, remaining))
+        print(("✔" if not misses else "✗") + f" {len(remaining) - misses}/{len(remaining)} docs find their own row")
+        ok &= misses == 0
+
+    print("✔ Incremental build checks passed" if ok else "✗ Some incremental build checks failed")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Export the embedding model to ONNX (+ int8) and check it against PyTorch.
+
+Loads the locally cached SentenceTransformer, writes model.onnx and (unless
+--no-quantize) model.int8.onnx with the tokenizer into --out-dir, then
+embeds sample texts with PyTorch and with each ONNX variant. The script
+exits with status 1 when the minimum cosine similarity falls below
+--min-cosine, so it can gate a deploy. Sample texts come from corpus.jsonl
+of the last build, or from a few built-in queries.
+
+    python -m backend.scripts.export_onnx --out-dir backend/storage/onnx_model
+    # then: EMBEDDING_BACKEND = "onnx", ONNX_MODEL_DIR = <out-dir>
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+import backend.app_settings as cfg
+from backend.core.encoders.onnx_encoder import OnnxEncoder, embedding_agreement, export_onnx
+
+_SAMPLE_QUERIES = [
+    "βίδα inox M8x40", "rakor 1/2", "παλέτες ξύλινες", "σωλήνας PVC 32mm", "Liebherr ανταλλακτικά",
+    "ηλεκτρικό καλώδιο 3x1.5", "γάντια εργασίας", "φίλτρο λαδιού", "ρουλεμάν 6204", "κόλλα σιλικόνης",
+]
+
+
+def sample_texts(corpus_path: Path, n: int) -> List[str]:
+    texts = list(_SAMPLE_QUERIES)
+    if corpus_path.exists():
+        with corpus_path.open("r", encoding="utf-8") as f:
+            for _, line in zip(range(n), f):
+                if line.strip():
+                    texts.append(json.loads(line).get("text", ""))
+    return [t for t in texts if t]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Export the embedding model to ONNX and validate it")
+    p.add_argument("--embedding-model", type=str, default=getattr(cfg, "DEFAULT_EMBEDDING_MODEL", None))
+    p.add_argument("--out-dir", type=str, default=str(getattr(cfg, "ONNX_MODEL_DIR", None) or cfg.EXPORT_DIR / "onnx_model"))
+    p.add_argument("--no-quantize", action="store_true", help="Skip the int8 model")
+    p.add_argument("--opset", type=int, default=17)
+    p.add_argument("--corpus", type=str, default=str(cfg.EXPORT_DIR / "corpus.jsonl"), help="Texts for the cosine check")
+    p.add_argument("--samples", type=int, default=500)
+    p.add_argument("--min-cosine", type=float, default=0.98, help="Fail below this minimum cosine similarity")
+    p.add_argument("--skip-export", action="store_true", help="Only run the check on an existing export")
+    args = p.parse_args()
+
+    out_dir = Path(args.out_dir)
+    if not args.skip_export:
+        export_onnx(args.embedding_model, out_dir, quantize=not args.no_quantize, opset=args.opset)
+        print(f"✔ Exported to: {out_dir.resolve()}")
+
+    from sentence_transformers import SentenceTransformer
+    reference = SentenceTransformer(args.embedding_model, device="cpu")
+    texts = sample_texts(Path(args.corpus), args.samples)
+    ok = True
+    for quantized in ([False] if args.no_quantize else [False, True]):
+        encoder = OnnxEncoder(out_dir, quantized=quantized)
+        cos = embedding_agreement(reference, encoder, texts)
+        passed = cos["min"] >= args.min_cosine
+        ok = ok and passed
+        print(f"{'✔' if passed else '✗'} {encoder.variant}: cosine vs PyTorch over {len(texts)} texts "
+              f"min={cos['min']:.4f} p01={cos['p01']:.4f} mean={cos['mean']:.4f} (threshold {args.min_cosine})")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
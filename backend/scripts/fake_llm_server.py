@@ -0,0 +1,191 @@
+"""
+Local stand-in for the OpenAI Responses API, for tests and load runs.
+
+Answers POST /v1/responses after a configurable delay without calling any
+upstream, so the backend can be exercised with OPENAI_BASE_URL pointed here.
+Requests with "stream": true get Responses-API SSE events: the first delta
+after --latency-ms, then one word every --token-ms.
+
+Faults for testing the LLM transport (timeouts, retries, hedging):
+--jitter-ms spreads the latency, --slow-rate of the requests wait an extra
+--slow-ms (a latency tail) and --error-rate of them fail with
+--error-status. GET /stats counts requests, errors and the client
+connections seen (keep-alive reuse shows as few connections).
+
+    python -m backend.scripts.fake_llm_server --port 8001 --latency-ms 1000 --token-ms 20
+    python -m backend.scripts.fake_llm_server --latency-ms 300 --slow-rate 0.05 --slow-ms 3000 --error-rate 0.1
+    # app_settings.OPENAI_BASE_URL = "http://127.0.0.1:8001/v1"
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import time
+import json
+import uuid
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake LLM server")
+app.state.latency_ms = 0.0
+app.state.token_ms = 20.0
+app.state.answer_words = 60
+app.state.jitter_ms = 0.0
+app.state.slow_rate = 0.0
+app.state.slow_ms = 0.0
+app.state.error_rate = 0.0
+app.state.error_status = 503
+app.state.rnd = random.Random(0)
+app.state.stats = {"requests": 0, "errors": 0, "slow": 0}
+app.state.connections = set()
+
+
+def _response_body(model: str, text: str) -> Dict[str, Any]:
+    """Minimal Responses API payload that the openai SDK can parse."""
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": "completed",
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+    }
+
+
+def _answer_text(prompt: str) -> str:
+    filler = " ".join(f"w{i}" for i in range(app.state.answer_words))
+    return f"[fake] {len(prompt)} chars of context received. {filler}"
+
+
+def _latency_s() -> float:
+    """Configured latency plus jitter, plus the tail delay for --slow-rate of requests."""
+    rnd = app.state.rnd
+    ms = app.state.latency_ms + (rnd.uniform(-app.state.jitter_ms, app.state.jitter_ms) if app.state.jitter_ms else 0.0)
+    if app.state.slow_rate and rnd.random() < app.state.slow_rate:
+        app.state.stats["slow"] += 1
+        ms += app.state.slow_ms
+    return max(ms, 0.0) / 1000.0
+
+
+async def _stream_events(model: str, text: str, latency_s: float) -> AsyncIterator[str]:
+    item_id = f"msg_{uuid.uuid4().hex}"
+    seq = 0
+    await asyncio.sleep(latency_s)
+    for i, word in enumerate(text.split(" ")):
+        if i:
+            await asyncio.sleep(app.state.token_ms / 1000.0)
+        event = {
+            "type": "response.output_text.delta",
+            "item_id": item_id,
+            "output_index": 0,
+            "content_index": 0,
+            "delta": word if i == 0 else " " + word,
+            "sequence_number": seq,
+        }
+        seq += 1
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    done = {"type": "response.completed", "response": _response_body(model, text), "sequence_number": seq}
+    yield f"event: {done['type']}\ndata: {json.dumps(done)}\n\n"
+
+
+@app.post("/v1/responses")
+async def create_response(request: Request):
+    body = await request.json()
+    app.state.stats["requests"] += 1
+    if request.client is not None:
+        app.state.connections.add((request.client.host, request.client.port))
+    if app.state.error_rate and app.state.rnd.random() < app.state.error_rate:
+        app.state.stats["errors"] += 1
+        return JSONResponse(
+            status_code=app.state.error_status,
+            content={"error": {"message": "injected failure", "type": "server_error", "code": None}},
+        )
+    model = body.get("model", "fake-model")
+    text = _answer_text(str(body.get("input", "")))
+    latency_s = _latency_s()
+    if body.get("stream"):
+        return StreamingResponse(_stream_events(model, text, latency_s), media_type="text/event-stream")
+    await asyncio.sleep(latency_s)
+    return _response_body(model, text)
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    return {**app.state.stats, "connections": len(app.state.connections)}
+
+
+def configure(
+    latency_ms: float = 0.0,
+    token_ms: float = 20.0,
+    answer_words: int = 60,
+    jitter_ms: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_ms: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    seed: int = 0,
+) -> None:
+    """Set the simulated behaviour and reset the counters (also for in-process use)."""
+    app.state.latency_ms = latency_ms
+    app.state.token_ms = token_ms
+    app.state.answer_words = answer_words
+    app.state.jitter_ms = jitter_ms
+    app.state.slow_rate = slow_rate
+    app.state.slow_ms = slow_ms
+    app.state.error_rate = error_rate
+    app.state.error_status = error_status
+    app.state.rnd = random.Random(seed)
+    app.state.stats = {"requests": 0, "errors": 0, "slow": 0}
+    app.state.connections = set()
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server")
+    p.add_argument("--host", type=str, default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8001)
+    p.add_argument("--latency-ms", type=float, default=1000.0, help="Delay before each response (or first streamed token)")
+    p.add_argument("--token-ms", type=float, default=20.0, help="Delay between streamed words")
+    p.add_argument("--answer-words", type=int, default=60, help="Filler words appended to each answer")
+    p.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency")
+    p.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests delayed by --slow-ms")
+    p.add_argument("--slow-ms", type=float, default=0.0, help="Extra delay of slow requests (latency tail)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    p.add_argument("--error-status", type=int, default=503, help="HTTP status of injected errors")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def main():
+    import uvicorn
+
+    args = _parse_args()
+    configure(
+        latency_ms=args.latency_ms,
+        token_ms=args.token_ms,
+        answer_words=args.answer_words,
+        jitter_ms=args.jitter_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
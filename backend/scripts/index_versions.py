@@ -0,0 +1,56 @@
+"""
+Manage the versioned index directories served with hot reload.
+
+    python -m backend.scripts.index_versions list
+    python -m backend.scripts.index_versions publish --build-dir export/embeddings
+    python -m backend.scripts.index_versions activate 20260101-120000   # e.g. roll back
+
+Activating only rewrites CURRENT; servers watching INDEX_VERSIONS_DIR load,
+validate and swap to the version without a restart (or call
+POST /admin/reload to switch immediately).
+"""
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+import backend.app_settings as cfg
+from backend.core.index_versions import (
+    current_version, list_versions, publish_version, read_manifest, set_current, verify_checksums,
+)
+
+
+def main():
+    default_root = getattr(cfg, "INDEX_VERSIONS_DIR", None) or cfg.EXPORT_DIR / "index_versions"
+    p = argparse.ArgumentParser(description="List, publish and activate index versions")
+    p.add_argument("--versions-dir", type=str, default=str(default_root))
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show published versions")
+    pub = sub.add_parser("publish", help="Copy a build into a new version")
+    pub.add_argument("--build-dir", type=str, default=str(cfg.EXPORT_DIR / "embeddings"))
+    pub.add_argument("--version", type=str, default=None)
+    pub.add_argument("--no-activate", action="store_true", help="Publish without pointing CURRENT at it")
+    pub.add_argument("--keep", type=int, default=3, help="Versions kept on disk (0 = all)")
+    act = sub.add_parser("activate", help="Point CURRENT at a version (checksums verified first)")
+    act.add_argument("version")
+    args = p.parse_args()
+
+    root = Path(args.versions_dir)
+    if args.command == "list":
+        active = current_version(root)
+        for name in list_versions(root):
+            m = read_manifest(root / name) or {}
+            mark = "*" if name == active else " "
+            print(f"{mark} {name}  {m.get('created', '?')}  dim={m.get('dim')} ntotal={m.get('ntotal')}")
+    elif args.command == "publish":
+        target = publish_version(Path(args.build_dir), root, version=args.version,
+                                 activate=not args.no_activate, keep=args.keep)
+        print(f"✔ Published index version: {target.resolve()}")
+    else:
+        verify_checksums(root / args.version)
+        set_current(root, args.version)
+        print(f"✔ Active index version: {args.version}")
+
+
+if __name__ == "__main__":
+    main()
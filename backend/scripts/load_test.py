@@ -0,0 +1,75 @@
+"""
+Concurrency load test for POST /query.
+
+Fires `--concurrency` simultaneous requests at a running server and reports
+latency percentiles plus the observed concurrency (sum of request latencies
+divided by wall time). With the server's LLM pointed at the fake server
+(backend.scripts.fake_llm_server), a sync endpoint tops out at Starlette's
+threadpool size (40 by default); the async endpoint should track the
+requested concurrency instead.
+
+    python -m backend.scripts.fake_llm_server --latency-ms 1000 &
+    uvicorn backend.server:app --port 8000 &
+    python -m backend.scripts.load_test --concurrency 200
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+async def _one(client: httpx.AsyncClient, url: str, query: str, top_k: int) -> float:
+    t0 = time.perf_counter()
+    r = await client.post(url, json={"query": query, "top_k": top_k})
+    r.raise_for_status()
+    return time.perf_counter() - t0
+
+
+async def run(url: str, concurrency: int, rounds: int, query: str, top_k: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=300.0, limits=limits) as client:
+        latencies: List[float] = []
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            latencies += await asyncio.gather(
+                *(_one(client, url, query, top_k) for _ in range(concurrency))
+            )
+        wall = time.perf_counter() - t0
+
+    print(f"requests:             {len(latencies)}")
+    print(f"wall time:            {wall:.2f}s")
+    print(f"throughput:           {len(latencies) / wall:.1f} req/s")
+    print(f"p50 / p95 / p99:      {_percentile(latencies, 50) * 1000:.0f} / "
+          f"{_percentile(latencies, 95) * 1000:.0f} / {_percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"observed concurrency: {sum(latencies) / wall:.1f} (requested {concurrency})")
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Concurrent load test for /query")
+    p.add_argument("--url", type=str, default="http://127.0.0.1:8000/query")
+    p.add_argument("--concurrency", type=int, default=200)
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--query", type=str, default="rakor")
+    p.add_argument("--top-k", type=int, default=5)
+    return p.parse_args()
+
+
+def main():
+    args = _parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.rounds, args.query, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
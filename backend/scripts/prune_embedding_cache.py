@@ -0,0 +1,49 @@
+"""
+Prune the persistent build-time embedding cache.
+
+Keeps only embeddings for texts in the current corpus (corpus.jsonl from
+the last build) and optionally drops the namespaces of other models /
+normalization settings.
+
+    python -m backend.scripts.prune_embedding_cache --drop-other-models
+"""
+
+from __future__ import annotations
+import argparse
+import json
+from pathlib import Path
+from typing import Iterator
+
+import backend.app_settings as cfg
+from backend.build_index.embedding_cache import EmbeddingCache, drop_other_namespaces, namespace
+
+
+def _corpus_texts(corpus_path: Path) -> Iterator[str]:
+    with corpus_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line).get("text", "")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Prune the embedding cache")
+    p.add_argument("--cache-dir", type=str, default=str(cfg.EXPORT_DIR / "embedding_cache"))
+    p.add_argument("--embedding-model", type=str, default=getattr(cfg, "DEFAULT_EMBEDDING_MODEL", None))
+    p.add_argument("--corpus", type=str, default=str(cfg.EXPORT_DIR / "corpus.jsonl"), help="Texts to keep")
+    p.add_argument("--drop-other-models", action="store_true", help="Delete caches of other models")
+    args = p.parse_args()
+
+    cache_dir = Path(args.cache_dir)
+    if args.drop_other_models and cache_dir.exists():
+        for name in drop_other_namespaces(cache_dir, keep=namespace(args.embedding_model, True)):
+            print(f"✔ Dropped cache namespace: {name}")
+
+    cache = EmbeddingCache(cache_dir, args.embedding_model, normalize=True)
+    before = cache.nbytes()
+    kept, removed = cache.prune(_corpus_texts(Path(args.corpus)))
+    print(f"✔ Kept {kept} embeddings, removed {removed} ({before / 2**20:.1f} MB -> {cache.nbytes() / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Recall/latency tuner for FAISS index types.
+
+Holds out `--queries` vectors from embeddings.npy, computes exact top-k
+ground truth with IndexFlatIP, then for every index type x build-grid x
+search-grid combination reports recall@k, QPS, single-query latency and
+serialized index size.
+
+    python -m backend.scripts.tune_index --index-type hnsw \\
+        --build-grid "hnsw_m=16,32" --search-grid "efSearch=16,32,64,128"
+    python -m backend.scripts.tune_index --index-type ivf-pq ivf-sq8 \\
+        --build-grid "nlist=256,1024" --search-grid "nprobe=4,16,64" \\
+        --target-recall 0.95 --apply
+
+With --apply, the fastest configuration reaching --target-recall is rebuilt
+on all vectors and written to index.faiss + search_params.json (the
+server applies them at load).
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import faiss
+
+import backend.app_settings as cfg
+from backend.build_index.faiss_index import INDEX_TYPES, build_index, save_search_params
+from backend.core.retrieval.vector_search import apply_search_params
+
+
+def _parse_grid(spec: str) -> List[Dict[str, Any]]:
+    """'a=1,2 b=3' -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]"""
+    if not spec:
+        return [{}]
+    keys, values = [], []
+    for part in spec.split():
+        key, _, vals = part.partition("=")
+        keys.append(key)
+        values.append([int(v) for v in vals.split(",")])
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def tune(
+    embeddings: np.ndarray,
+    index_types: List[str],
+    build_grid: List[Dict[str, Any]],
+    search_grid: List[Dict[str, Any]],
+    n_queries: int,
+    k: int,
+) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(0)
+    perm = rng.permutation(len(embeddings))
+    queries = np.ascontiguousarray(embeddings[perm[:n_queries]])
+    base = np.ascontiguousarray(embeddings[perm[n_queries:]])
+
+    exact = faiss.IndexFlatIP(base.shape[1])
+    exact.add(base)
+    _, truth = exact.search(queries, k)
+
+    rows: List[Dict[str, Any]] = []
+    for index_type in index_types:
+        for build_params in build_grid:
+            t0 = time.perf_counter()
+            index, default_search = build_index(base, index_type=index_type, params=build_params)
+            build_s = time.perf_counter() - t0
+            size_mb = len(faiss.serialize_index(index)) / 2**20
+            for search_params in (search_grid if search_grid != [{}] else [default_search]):
+                try:
+                    apply_search_params(index, search_params)
+                except RuntimeError:
+                    continue  # parameter does not apply to this index type
+                t0 = time.perf_counter()
+                _, found = index.search(queries, k)
+                batch_s = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                for q in queries[:100]:
+                    index.search(q.reshape(1, -1), k)
+                single_ms = (time.perf_counter() - t0) / min(100, len(queries)) * 1000
+                row = {
+                    "index_type": index_type,
+                    "build_params": build_params,
+                    "search_params": search_params,
+                    f"recall@{k}": round(_recall(found, truth), 4),
+                    "qps": round(len(queries) / batch_s, 1),
+                    "latency_ms": round(single_ms, 3),
+                    "size_mb": round(size_mb, 2),
+                    "build_s": round(build_s, 2),
+                }
+                rows.append(row)
+                print(json.dumps(row, ensure_ascii=False))
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser(description="Tune FAISS index type and parameters (recall@k vs QPS vs memory)")
+    p.add_argument("--embeddings-dir", type=str, default=str(cfg.EXPORT_DIR / "embeddings"))
+    p.add_argument("--index-type", type=str, nargs="+", default=["hnsw"], choices=INDEX_TYPES)
+    p.add_argument("--build-grid", type=str, default="", help="e.g. 'nlist=256,1024 pq_m=32,64'")
+    p.add_argument("--search-grid", type=str, default="", help="e.g. 'nprobe=4,16,64' or 'efSearch=32,64'")
+    p.add_argument("--queries", type=int, default=1000, help="Held-out query vectors")
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads")
+    p.add_argument("--target-recall", type=float, default=0.95)
+    p.add_argument("--apply", action="store_true", help="Rebuild and save the fastest config meeting --target-recall")
+    p.add_argument("--json", type=str, default=None, help="Write all results to this file")
+    args = p.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+    emb_dir = Path(args.embeddings_dir)
+    embeddings = np.load(emb_dir / "embeddings.npy").astype("float32")
+
+    rows = tune(
+        embeddings,
+        args.index_type,
+        _parse_grid(args.build_grid),
+        _parse_grid(args.search_grid),
+        n_queries=min(args.queries, len(embeddings) // 10 or 1),
+        k=args.k,
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    ok = [r for r in rows if r[f"recall@{args.k}"] >= args.target_recall]
+    if not ok:
+        print(f"No configuration reached recall@{args.k} >= {args.target_recall}")
+        return
+    best = max(ok, key=lambda r: r["qps"])
+    print(f"Best: {json.dumps(best, ensure_ascii=False)}")
+
+    if args.apply:
+        index, _ = build_index(embeddings, index_type=best["index_type"], params=best["build_params"])
+        apply_search_params(index, best["search_params"])
+        tmp_index = emb_dir / "index.faiss.tmp"
+        faiss.write_index(index, str(tmp_index))
+        os.replace(tmp_index, emb_dir / "index.faiss")
+        save_search_params(emb_dir, best["search_params"])
+        print(f"✓ Saved index.faiss and search_params.json to {emb_dir}")
+
+
+if __name__ == "__main__":
+    main()
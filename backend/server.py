@@ -1,13 +1,29 @@
+import time
+
+# cold-start reference point: ready / first-query times are measured from here
+BOOT_T0 = time.perf_counter()
+
+import asyncio
+import logging
 import os
-from typing import Dict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from backend import app_settings
-from backend.apis import route_query
-from backend.core.resource_loader import load_resources  
+from backend.apis import route_admin, route_metrics, route_query
+from backend.core.readiness import Readiness
+
+# faiss, torch/sentence_transformers and openai are imported by the loader
+# threads, so the server binds its port and answers /health and /ready at once
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMUP_QUERIES = ["βίδα inox M8", "ρακόρ 1/2", "παλέτα ξύλινη", "φίλτρο νερού", "Liebherr"]
 
 app = FastAPI(title="AI Warehouse Assistant API", version="0.1.0")
 
@@ -17,48 +33,332 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(route_metrics.TimingMiddleware)
 
 app.include_router(route_query.router, prefix="", tags=["query"])
+app.include_router(route_admin.router, prefix="/admin", tags=["admin"])
+app.include_router(route_metrics.router, prefix="", tags=["metrics"])
 
-@app.on_event("startup")
-def startup_event() -> None:
-    """Load resources and build the query pipeline."""
-    # Load heavy resources (model, FAISS index, metadata)
-    model, index, meta_entries = load_resources(
-        model_name=app_settings.DEFAULT_EMBEDDING_MODEL,
-        index_path=app_settings.FAISS_INDEX_FILE,
-        metadata_path=app_settings.META_DATA_FILE,
-    )
 
-    # Build pipeline components
+def _index_location(version: Optional[str] = None) -> Tuple[Path, Path, str]:
+    """(index path, metadata path, version label) to serve.
+
+    With INDEX_VERSIONS_DIR set, `version` (default: CURRENT) is resolved
+    inside it; otherwise FAISS_INDEX_FILE / META_DATA_FILE are used as is.
+    """
+    from backend.core.index_versions import current_version, read_manifest, version_paths
+
+    root = getattr(app_settings, "INDEX_VERSIONS_DIR", None)
+    if root:
+        version = version or current_version(root)
+        if version:
+            index_path, metadata_path = version_paths(root, version)
+            if not index_path.exists():
+                raise FileNotFoundError(f"Index version not found: {index_path.parent}")
+            return index_path, metadata_path, version
+    elif version:
+        raise ValueError("INDEX_VERSIONS_DIR is not configured, only the default index can be reloaded")
+    index_path = Path(app_settings.FAISS_INDEX_FILE)
+    manifest = read_manifest(index_path.parent)
+    label = manifest["version"] if manifest else f"unversioned-{int(index_path.stat().st_mtime)}"
+    return index_path, Path(app_settings.META_DATA_FILE), label
+
+
+def _build_pipeline(
+    model, index, meta_entries, index_path: Path, shared: Dict[str, Any], version: Optional[str] = None
+):
+    """Wire a QueryPipeline around one loaded index version.
+
+    `shared` holds the objects that outlive a version: search executor,
+    LLM client and answer cache. Answer keys include `version`, since the
+    same row ids may carry new stock or locations after a reload; the old
+    version's entries age out of the LRU. The prompt builder is per
+    version, it reads that build's precomputed context strings.
+    """
     from backend.core.retrieval.query_processor import QueryProcessor
     from backend.core.retrieval.vector_search import VectorSearchEngine
+    from backend.core.retrieval.query_batcher import QueryBatcher
+    from backend.core.retrieval.cache import RetrievalCache
+    from backend.core.retrieval.code_index import CodeIndex
+    from backend.core.retrieval.attribute_index import AttributeIndex, detect_stock_column
     from backend.core.retrieval.result_formatter import ResultFormatter
     from backend.core.generation.prompt_builder import PromptBuilder
-    from backend.clients.openai_client import OpenAIClient
     from backend.core.pipeline import QueryPipeline
+    from backend.core.resource_loader import (
+        load_context_store, load_embeddings, load_lexical_index, load_search_params,
+    )
 
     query_processor = QueryProcessor()
-    search_engine = VectorSearchEngine(model=model, index=index)
+    search_engine = VectorSearchEngine(
+        model=model,
+        index=index,
+        search_params=load_search_params(index_path),
+        # one row per slot, tombstones included (not index.ntotal)
+        embeddings=load_embeddings(index_path, expected_rows=len(meta_entries)),
+        exact_filter_max=getattr(app_settings, "FILTER_EXACT_MAX", 20000),
+    )
     result_formatter = ResultFormatter(metadata_entries=meta_entries)
-    prompt_builder = PromptBuilder()
-    llm_client = OpenAIClient()
+    batcher = None
+    if getattr(app_settings, "QUERY_BATCHING", False):
+        batcher = QueryBatcher(
+            search_engine,
+            max_batch_size=getattr(app_settings, "QUERY_BATCH_MAX_SIZE", 32),
+            max_wait_ms=getattr(app_settings, "QUERY_BATCH_MAX_WAIT_MS", 5.0),
+        )
 
-    pipeline = QueryPipeline(
+    cache = None
+    cache_size = getattr(app_settings, "RETRIEVAL_CACHE_SIZE", 1024)
+    if cache_size > 0:
+        cache = RetrievalCache(
+            max_size=cache_size,
+            ttl_seconds=getattr(app_settings, "RETRIEVAL_CACHE_TTL_S", 300.0),
+        )
+
+    code_index = None
+    if getattr(app_settings, "CODE_FAST_PATH", True):
+        code_index = CodeIndex.from_metadata(
+            result_formatter.metadata_entries,
+            columns=getattr(app_settings, "CODE_INDEX_COLUMNS", None),
+        )
+
+    lexical_index = None
+    if getattr(app_settings, "HYBRID_SEARCH", True):
+        lexical_index = load_lexical_index(index_path)
+
+    attribute_index = None
+    if getattr(app_settings, "FILTER_COLUMNS", None) != []:
+        # unset: detect the catalog's stock column (e.g. "Απόθεμα"); "" turns in_stock off
+        stock_column = getattr(app_settings, "STOCK_COLUMN", None)
+        if stock_column is None:
+            stock_column = detect_stock_column(result_formatter.metadata_entries)
+            logger.info(f"Stock column for in_stock: {stock_column or 'none found (set STOCK_COLUMN)'}")
+        attribute_index = AttributeIndex.from_metadata(
+            result_formatter.metadata_entries,
+            columns=getattr(app_settings, "FILTER_COLUMNS", None),
+            max_values=getattr(app_settings, "FILTER_MAX_VALUES", 4096),
+            stock_column=stock_column,
+        )
+
+    prompt_builder = PromptBuilder(
+        contexts=load_context_store(index_path),
+        token_budget=getattr(app_settings, "PROMPT_TOKEN_BUDGET", 2000),
+        full_items=getattr(app_settings, "PROMPT_FULL_ITEMS", 3),
+    )
+
+    return QueryPipeline(
         query_processor=query_processor,
         search_engine=search_engine,
         result_formatter=result_formatter,
         prompt_builder=prompt_builder,
-        llm_client=llm_client,
+        llm_client=shared["llm_client"],
+        executor=shared["executor"],
+        batcher=batcher,
+        cache=cache,
+        answer_cache=shared["answer_cache"],
+        code_index=code_index,
+        lexical_index=lexical_index,
+        hybrid_candidates=getattr(app_settings, "HYBRID_CANDIDATES", 50),
+        rrf_k=getattr(app_settings, "RRF_K", 60),
+        attribute_index=attribute_index,
+        admission=shared["admission"],
+        index_version=version,
+    )
+
+
+class _VersionFiles(NamedTuple):
+    index: Any
+    meta_entries: Any
+    index_path: Path
+    label: str
+
+
+def _read_version(pool: Executor, readiness: Readiness, version: Optional[str] = None) -> _VersionFiles:
+    """Load one version's index and metadata in parallel on `pool`, checksums alongside.
+
+    Raises:
+        IndexValidationError: Checksum mismatch
+    """
+    from backend.core.index_versions import verify_checksums
+    from backend.core.resource_loader import load_index, load_metadata, load_metadata_store
+
+    index_path, metadata_path, label = _index_location(version)
+    mmap = getattr(app_settings, "MMAP_RESOURCES", False)
+    checksums = None
+    if getattr(app_settings, "INDEX_VERIFY_CHECKSUMS", True):
+        checksums = pool.submit(readiness.run, "checksums", lambda: verify_checksums(index_path.parent))
+    index = pool.submit(readiness.run, "index", lambda: load_index(index_path, mmap=mmap))
+    if getattr(app_settings, "METADATA_STORE", "columnar") == "columnar" or mmap:
+        meta = pool.submit(readiness.run, "metadata", lambda: load_metadata_store(metadata_path, mmap=mmap))
+    else:
+        meta = pool.submit(readiness.run, "metadata", lambda: load_metadata(metadata_path))
+    if checksums is not None:
+        checksums.result()
+    return _VersionFiles(index.result(), meta.result(), index_path, label)
+
+
+def _assemble(model, files: _VersionFiles, shared: Dict[str, Any], readiness: Readiness):
+    """Validate loaded files against the model, build the pipeline and warm it up.
+
+    Raises:
+        IndexValidationError: Dimension or count mismatch
+    """
+    from backend.core.index_versions import validate_loaded
+
+    get_dim = getattr(model, "get_sentence_embedding_dimension", None)
+    validate_loaded(files.index_path.parent, files.index, len(files.meta_entries), get_dim() if get_dim else None)
+    logger.info(f"Loaded index version {files.label} from {files.index_path.parent}")
+    with readiness.track("pipeline"):
+        pipeline = _build_pipeline(model, files.index, files.meta_entries, files.index_path, shared, files.label)
+    queries = getattr(app_settings, "WARMUP_QUERIES", None)
+    with readiness.track("warmup"):
+        pipeline.warmup(DEFAULT_WARMUP_QUERIES if queries is None else queries)
+    return pipeline, files.label
+
+
+def _load_version(model, shared: Dict[str, Any], version: Optional[str] = None):
+    """Load, validate and warm up one index version (hot reloads).
+
+    Raises:
+        IndexValidationError: Checksum, dimension or count mismatch
+    """
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="index-load") as pool:
+        readiness = Readiness()
+        return _assemble(model, _read_version(pool, readiness, version), shared, readiness)
+
+
+def _load_model():
+    from backend.core.resource_loader import load_model
+
+    return load_model(
+        app_settings.DEFAULT_EMBEDDING_MODEL,
+        backend=getattr(app_settings, "EMBEDDING_BACKEND", "torch"),
+        onnx_dir=getattr(app_settings, "ONNX_MODEL_DIR", None),
+        quantized=getattr(app_settings, "ONNX_QUANTIZED", True),
+        threads=getattr(app_settings, "ONNX_THREADS", None),
     )
 
-    app.state.pipeline = pipeline
+
+def _shared_resources() -> Dict[str, Any]:
+    """Objects that outlive index versions (see _build_pipeline)."""
+    from backend.core.generation.admission import AdmissionController
+    from backend.core.generation.answer_cache import AnswerCache
+    from backend.clients.openai_client import OpenAIClient
+    from backend.core.pipeline import make_search_executor
+
+    answer_cache = None
+    answer_cache_size = getattr(app_settings, "ANSWER_CACHE_SIZE", 512)
+    if answer_cache_size > 0:
+        answer_cache = AnswerCache(
+            max_size=answer_cache_size,
+            ttl_seconds=getattr(app_settings, "ANSWER_CACHE_TTL_S", 600.0),
+        )
+    # one controller for all index versions: the limit protects the LLM, not an index
+    admission = None
+    max_concurrency = getattr(app_settings, "LLM_MAX_CONCURRENCY", 32)
+    if max_concurrency:
+        admission = AdmissionController(
+            max_concurrency=max_concurrency,
+            max_queue=getattr(app_settings, "LLM_MAX_QUEUE", 64),
+            max_wait_ms=getattr(app_settings, "LLM_MAX_QUEUE_WAIT_MS", 250.0),
+        )
+    return {
+        "executor": make_search_executor(),
+        "llm_client": OpenAIClient(),
+        "answer_cache": answer_cache,
+        "admission": admission,
+    }
+
+
+def _load_resources(readiness: Readiness):
+    """Load model, index, metadata and LLM client concurrently, then build and warm the pipeline."""
+    from backend.core.reloader import PipelineManager
+
+    with ThreadPoolExecutor(max_workers=5, thread_name_prefix="startup") as pool:
+        model = pool.submit(readiness.run, "model", _load_model)
+        shared = pool.submit(readiness.run, "llm_client", _shared_resources)
+        files = _read_version(pool, readiness)
+        model, shared = model.result(), shared.result()
+    pipeline, version = _assemble(model, files, shared, readiness)
+
+    # The model is loaded once; index versions are swapped around it
+    manager = PipelineManager(pipeline, version, loader=lambda v: _load_version(model, shared, v))
+    manager.on_swap.append(lambda p: setattr(app.state, "pipeline", p))
+    return manager, shared["executor"]
+
+
+async def _start(readiness: Readiness) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        manager, executor = await loop.run_in_executor(None, _load_resources, readiness)
+    except Exception as e:
+        readiness.mark_failed(e)
+        logger.exception("Failed to load serving resources")
+        return
+    app.state.pipelines = manager
+    app.state.pipeline = manager.pipeline
+    app.state.search_executor = executor
+    readiness.mark_ready()
+    start_index_watcher()
+
+
+@app.on_event("startup")
+async def startup_event() -> None:
+    """Start loading resources; query endpoints answer 503 until /ready says ready.
+
+    With STARTUP_BACKGROUND = False startup blocks until loading is done
+    (the pre-/ready behaviour, e.g. for process managers that wait on it).
+    """
+    readiness = Readiness(BOOT_T0)
+    readiness.declare("model", "llm_client", "index", "metadata", "pipeline", "warmup")
+    app.state.readiness = readiness
+    app.state.index_watcher = None
+    app.state.loader = asyncio.create_task(_start(readiness))
+    if not getattr(app_settings, "STARTUP_BACKGROUND", True):
+        await app.state.loader
+
+
+def start_index_watcher() -> None:
+    """Poll INDEX_VERSIONS_DIR/CURRENT and hot-reload new versions."""
+    root = getattr(app_settings, "INDEX_VERSIONS_DIR", None)
+    interval = getattr(app_settings, "INDEX_RELOAD_POLL_S", 10.0)
+    if root and interval and interval > 0:
+        app.state.index_watcher = asyncio.create_task(app.state.pipelines.watch(Path(root), interval))
+
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    """Stop the loader and watcher and release the search executor threads."""
+    for task in (getattr(app.state, "loader", None), getattr(app.state, "index_watcher", None)):
+        if task is not None:
+            task.cancel()
+    pipeline = getattr(app.state, "pipeline", None)
+    if pipeline is None:
+        return
+    pipeline.close()
+    executor = getattr(app.state, "search_executor", None)
+    if executor is not None:
+        executor.shutdown(wait=False)
 
 @app.get("/health")
 def health() -> Dict[str, str]:
+    """Liveness: the process is up (resources may still be loading, see /ready)."""
     return {"status": "ok"}
 
+
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """Readiness: 200 once the pipeline serves queries, 503 before (or after a failed load).
+
+    The body lists every resource with its status and load time.
+    """
+    readiness: Optional[Readiness] = getattr(app.state, "readiness", None)
+    if readiness is None:
+        return JSONResponse({"ready": False, "resources": {}}, status_code=503)
+    status = readiness.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("backend.server:app", host="127.0.0.1", port=8000, reload=True)
@@ -26,7 +26,7 @@ export default function ChatPage() {
 
     try {
       const res = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL ?? "http://localhost:8000"}/query`,
+        `${process.env.NEXT_PUBLIC_API_URL ?? "http://localhost:8000"}/query/stream`,
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
@@ -37,20 +37,43 @@ export default function ChatPage() {
         }
       );
 
-      let data: any = null;
-      try { data = await res.json(); } catch { /* ignore */ }
-
-      if (!res.ok) {
-        const detail = data?.detail;
-        throw new Error(detail ?? `HTTP ${res.status}`);
+      if (!res.ok || !res.body) {
+        let data: any = null;
+        try { data = await res.json(); } catch { /* ignore */ }
+        throw new Error(data?.detail ?? `HTTP ${res.status}`);
       }
 
-      setAnswer(
-        data.natural_language_response ??
-        data.nl_response ??
-        data.answer ??
-        JSON.stringify(data)
-      );
+      // SSE: κάθε event χωρίζεται με κενή γραμμή ("event: ...\ndata: {...}")
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let sep: number;
+        while ((sep = buffer.indexOf("\n\n")) !== -1) {
+          const raw = buffer.slice(0, sep);
+          buffer = buffer.slice(sep + 2);
+
+          let event = "message";
+          let data = "";
+          for (const line of raw.split("\n")) {
+            if (line.startsWith("event:")) event = line.slice(6).trim();
+            else if (line.startsWith("data:")) data += line.slice(5).trim();
+          }
+          const payload = data ? JSON.parse(data) : null;
+
+          if (event === "delta") {
+            // προσθέτουμε κάθε κομμάτι της απάντησης μόλις φτάσει
+            setAnswer((prev) => prev + (payload?.text ?? ""));
+          } else if (event === "error") {
+            throw new Error(payload?.detail ?? "Stream error");
+          }
+        }
+      }
     } catch (err: any) {
       setError(err?.message ?? "Unknown error");
     } finally {
@@ -343,7 +366,7 @@ export default function ChatPage() {
                       </span>
                     )}
 
-                    {!loading && !error && answer && <>{answer}</>}
+                    {!error && answer && <>{answer}</>}
                   </div>
                 </div>
               )}